@@ -5,13 +5,89 @@ import json
 from datetime import datetime, timezone
 
 from app.background_tasks import background_tasks
-from app.models import FilesModel
+from app.config import settings
+from app.models import FileChunksModel, FilesModel
 from app.services.sse.notifications import NotificationsService
 from app.utils.audio_manager import AudioManager
+from app.utils.chunk_manager import ChunkManager
 from app.utils.db_client import db_client
+from app.utils.ffmpeg_manager import FFmpegManager
 from app.utils.file_manager import file_manager
 from app.utils.shared import Channels, NotificationType, Status, Task
-from app.utils.video_manager import VideoManager
+
+
+def _split_audio(
+    file_id: str, audio: AudioManager, parts_count: int | None
+) -> list[FileChunksModel]:
+    """
+    Split the optimized audio in silence, in the planned parts count unless given,
+    write the manifest and record the whole audio and its parts with their exact offsets
+    :param -> file_id: str, audio: AudioManager, parts_count: int | None
+    :return -> list[FileChunksModel]
+    """
+
+    parts_count = parts_count or ChunkManager.plan(
+        duration=audio.get_duration(), overlap=settings.chunk_overlap
+    )
+
+    parts: list[dict] = audio.split_audio(
+        parts_count=parts_count,
+        delete_original_file=False,
+        overlap=settings.chunk_overlap,
+    )
+
+    file_manager.write_manifest(
+        file_id=file_id,
+        manifest={
+            "duration": audio.get_duration(),
+            "sample_rate": audio.sample_rate,
+            "overlap": settings.chunk_overlap,
+            "parts": parts,
+        },
+    )
+
+    return [
+        FileChunksModel(
+            index=0,
+            name=file_manager.filename,
+            offset=0.0,
+            duration=audio.get_duration(),
+            keep_start=0.0,
+            keep_end=audio.get_duration(),
+        )
+    ] + [
+        FileChunksModel(
+            index=index,
+            name=part["name"],
+            offset=part["offset"],
+            duration=part["duration"],
+            keep_start=part["keep_start"],
+            keep_end=part["keep_end"],
+        )
+        for index, part in enumerate(parts, start=1)
+    ]
+
+
+def _get_optimized_media(data: dict) -> dict | None:
+    """
+    Inspect the wav header of the upload, returns its media info if already mono
+    pcm_s16le at the target sample rate
+    :param -> data: dict
+    :return -> dict | None
+    """
+
+    if data["current_format"] != "wav":
+        return None
+
+    try:
+        with AudioManager(path=data["current_path"], format="wav") as audio:
+            if audio.is_optimized(sample_rate=data["sample_rate"]):
+                return audio.get_media_info()
+
+    except Exception as _:
+        pass
+
+    return None
 
 
 @background_tasks.task(
@@ -20,7 +96,7 @@ from app.utils.video_manager import VideoManager
     default_retry_delay=60,
     queue="optimization_task_queue",
 )
-def convert_video_to_audio(data: dict) -> None:
+def optimize_media(data: dict) -> None:
     try:
         session = next(db_client.get_db_session())
 
@@ -38,79 +114,68 @@ def convert_video_to_audio(data: dict) -> None:
                     "id": data["id"],
                     "status": Status.PROCESSING,
                     "type": NotificationType.INFO,
-                    "task": Task.CONVERSION,
-                    "message": "video to audio conversion in process",
+                    "task": (
+                        Task.CONVERSION
+                        if file_manager.is_video_file_extension(data["current_format"])
+                        else Task.OPTIMIZATION
+                    ),
+                    "message": "media optimization in process",
                     "completed_at": None,
                 }
             ),
         )
 
-        VideoManager(
-            path=data["current_path"],
-            format=data["current_format"],
-        ).convert_to_audio(
-            output_path=data["output_path"],
-            output_format=data["output_format"],
-            delete_original_file=data["delete_original_file"],
-        )
+        media: dict | None = _get_optimized_media(data=data)
 
-        NotificationsService().publish(
-            channel=Channels.NOTIFICATIONS,
-            message=json.dumps(
-                {
-                    "id": data["id"],
-                    "status": Status.PROCESSING,
-                    "type": NotificationType.SUCCESS,
-                    "task": Task.CONVERSION,
-                    "message": "successfully converted video to audio",
-                    "completed_at": None,
-                }
-            ),
-        )
+        # Already conformant, rename it into place and go straight to splitting
+        if media is not None:
+            if data["current_path"] != data["output_path"]:
+                file_manager.move_file(data["current_path"], data["output_path"])
 
-        data["current_path"] = data["output_path"]
-        data["current_format"] = data["output_format"]
-        change_audio_sample_rate.delay(data=data)
+        else:
+            input_path: str = data["current_path"]
 
-    except Exception as _:
-        session = next(db_client.get_db_session())
+            # ffmpeg can't read and write the same file, move the upload aside first
+            if input_path == data["output_path"]:
+                input_path = file_manager.get_partial_file_path(
+                    file_id=data["id"], file_extension="." + data["current_format"]
+                )
+                file_manager.move_file(data["current_path"], input_path)
 
-        file: FilesModel = session.query(FilesModel).filter_by(id=data["id"]).first()
-        file.status = Status.ERROR
-        completed_at = datetime.now(timezone.utc)
-        file.completed_at = completed_at
+            media = FFmpegManager.get_media_info(FFmpegManager.probe(path=input_path))
 
-        session.commit()
-        session.refresh(file)
-        session.close()
+            FFmpegManager.optimize(
+                input_path=input_path,
+                output_path=data["output_path"],
+                sample_rate=data["sample_rate"],
+            )
 
-        NotificationsService().publish(
-            channel=Channels.NOTIFICATIONS,
-            message=json.dumps(
-                {
-                    "id": data["id"],
-                    "status": Status.ERROR,
-                    "type": NotificationType.ERROR,
-                    "task": Task.CONVERSION,
-                    "message": "video to audio conversion failed",
-                    "completed_at": completed_at.isoformat(),
-                }
-            ),
-        )
+            if data["delete_original_file"] or input_path != data["current_path"]:
+                file_manager.delete_file(input_path)
 
+        # Cut the pcm in silence, the parts are byte range copies
+        with AudioManager(
+            path=data["output_path"],
+            format=data["output_format"],
+        ) as audio:
+            chunks: list[FileChunksModel] = _split_audio(
+                file_id=data["id"], audio=audio, parts_count=data["parts_count"]
+            )
+            duration: float = audio.get_duration()
 
-@background_tasks.task(
-    acks_late=True,
-    max_retries=1,
-    default_retry_delay=60,
-    queue="optimization_task_queue",
-)
-def change_audio_sample_rate(data: dict) -> None:
-    try:
         session = next(db_client.get_db_session())
 
         file: FilesModel = session.query(FilesModel).filter_by(id=data["id"]).first()
-        file.status = Status.PROCESSING
+        file.duration = media["duration"] or duration
+        file.sample_rate = media["sample_rate"]
+        file.channels = media["channels"]
+        file.codec = media["codec"]
+        file.size = media["size"]
+        file.chunks = chunks
+        file.path = file_manager.get_folder_path(file_id=data["id"])
+        file.status = Status.DONE
+        completed_at = datetime.now(timezone.utc)
+        file.completed_at = completed_at
 
         session.commit()
         session.refresh(file)
@@ -121,43 +186,15 @@ def change_audio_sample_rate(data: dict) -> None:
             message=json.dumps(
                 {
                     "id": data["id"],
-                    "status": Status.PROCESSING,
-                    "type": NotificationType.INFO,
-                    "task": Task.OPTIMIZATION,
-                    "message": "audio sample rate optimization in process",
-                    "completed_at": None,
-                }
-            ),
-        )
-
-        AudioManager(
-            path=data["current_path"],
-            format=data["current_format"],
-        ).change_sample_rate(
-            sample_rate=data["sample_rate"],
-            output_path=data["output_path"],
-            output_format=data["output_format"],
-            delete_original_file=data["delete_original_file"],
-        )
-
-        NotificationsService().publish(
-            channel=Channels.NOTIFICATIONS,
-            message=json.dumps(
-                {
-                    "id": data["id"],
-                    "status": Status.PROCESSING,
+                    "status": Status.DONE,
                     "type": NotificationType.SUCCESS,
                     "task": Task.OPTIMIZATION,
-                    "message": "successfully optimized audio sample rate",
-                    "completed_at": None,
+                    "message": "successfully optimized and split audio",
+                    "completed_at": completed_at.isoformat(),
                 }
             ),
         )
 
-        data["current_path"] = data["output_path"]
-        data["current_format"] = data["output_format"]
-        split_audio_into_parts.delay(data=data)
-
     except Exception as _:
         session = next(db_client.get_db_session())
 
@@ -178,7 +215,7 @@ def change_audio_sample_rate(data: dict) -> None:
                     "status": Status.ERROR,
                     "type": NotificationType.ERROR,
                     "task": Task.OPTIMIZATION,
-                    "message": "audio optimization failed",
+                    "message": "media optimization failed",
                     "completed_at": completed_at.isoformat(),
                 }
             ),
@@ -215,15 +252,22 @@ def split_audio_into_parts(data: dict) -> None:
             ),
         )
 
-        AudioManager(
+        with AudioManager(
             path=data["current_path"],
             format=data["current_format"],
-        ).split_audio(
-            parts_count=data["parts_count"],
-            delete_original_file=False,
-        )
+        ) as audio:
+            chunks: list[FileChunksModel] = _split_audio(
+                file_id=data["id"], audio=audio, parts_count=data["parts_count"]
+            )
+            media: dict = audio.get_media_info()
 
         file: FilesModel = session.query(FilesModel).filter_by(id=data["id"]).first()
+        file.duration = media["duration"]
+        file.sample_rate = media["sample_rate"]
+        file.channels = media["channels"]
+        file.codec = media["codec"]
+        file.size = media["size"]
+        file.chunks = chunks
         file.path = file_manager.get_folder_path(file_id=data["id"])
         file.status = Status.DONE
         completed_at = datetime.now(timezone.utc)
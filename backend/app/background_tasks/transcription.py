@@ -2,27 +2,816 @@
 # Path: backend\app\background_tasks\transcription.py
 
 import json
+import os
 import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable
 from uuid import uuid4
 
+from fastapi import status
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
 from app.background_tasks import background_tasks
-from app.models import TranscriptionsModel
+from app.config import settings
+from app.models import FileChunksModel, TranscriptionChunksModel, TranscriptionsModel
+from app.schemas import TranscriptionBackgroundJobPayloadSchema
 from app.services.sse.notifications import NotificationsService
-from app.utils.audio_manager import AudioManager
+from app.utils.chunk_manager import ChunkManager
+from app.utils.cpu_manager import CpuManager
 from app.utils.db_client import db_client
-from app.utils.docker_client import docker_client
+from app.utils.executors import executor
 from app.utils.file_manager import file_manager
-from app.utils.shared import Channels, NotificationType, Status, Task
+from app.utils.job_manager import JobManager
+from app.utils.model_manager import ModelManager
+from app.utils.node_manager import NodeManager
+from app.utils.pool_manager import PoolManager
+from app.utils.shared import (
+    Channels,
+    Language,
+    Model,
+    NotificationType,
+    Priority,
+    Speed,
+    Status,
+    Task,
+)
 from app.utils.subtitle_manager import SubtitleManager
+from app.utils.whisper_manager import WhisperManager
+
+# Postgres advisory lock key held while admitting queued transcriptions
+SCHEDULER_LOCK_KEY: int = 7301
+
+# Broker message priorities of the transcription tasks
+TASK_PRIORITIES: dict[Priority, int] = {
+    Priority.LOW: 0,
+    Priority.MEDIUM: 5,
+    Priority.HIGH: 9,
+}
+
+# Seconds before a failed chunk is retried
+CHUNK_RETRY_DELAY: int = 30
+
+# Seconds to wait before reconnecting to the docker events stream or the commands
+RECONNECT_DELAY: int = 5
+
+# Seconds to wait for a command before renewing the node registration
+COMMAND_TIMEOUT: int = 20
+
+# Process running the commands loop of the jobs this worker process starts
+control_pid: int | None = None
+control_lock: threading.Lock = threading.Lock()
+
+
+def follow_output(file_id: str, indices: list[int], output: Iterable[bytes]) -> None:
+    """
+    Parse the whisper output of a running job into progress reports of the chunk
+    it is transcribing
+    :param -> file_id: str, indices: list[int], output: Iterable[bytes]
+    :return -> None
+    """
+
+    data: dict | None = JobManager.get(file_id=file_id)
+
+    # Drafts do not move the progress of the transcription
+    if data is None or data["draft"]:
+        return
+
+    index: int = indices[0]
+    buffer: bytes = b""
+
+    for chunk in output:
+        buffer += chunk
+        *lines, buffer = buffer.replace(b"\r", b"\n").split(b"\n")
+
+        for line in map(lambda line: line.decode(errors="ignore"), lines):
+            name: str | None = WhisperManager.parse_input(line=line)
+
+            # A batched job announces each of its chunks before transcribing it
+            if name in data["files"] and data["files"].index(name) in indices:
+                index = data["files"].index(name)
+                continue
+
+            # Segment timestamps are relative to the chunk, which starts at its
+            # offset
+            keep_start, keep_end = data["windows"][index]
+            fraction: float | None = WhisperManager.parse_progress(
+                line=line,
+                start=keep_start - data["offsets"][index],
+                duration=keep_end - keep_start,
+            )
+
+            if fraction is not None:
+                report_progress(file_id=file_id, index=index, fraction=fraction)
+
+
+def _supervise(data: dict, indices: list[int], container_id: str) -> None:
+    """
+    Follow a chunk job nobody watches until it exits and report its chunks
+    :param -> data: dict, indices: list[int], container_id: str
+    :return -> None
+    """
+
+    try:
+        output: Iterable[bytes] = executor.get_output(container_id)
+
+        try:
+            follow_output(file_id=data["id"], indices=indices, output=output)
+        except Exception as _:
+            pass
+
+        # The rest of the output is drained so the job never blocks on it
+        for _ in output:
+            pass
+
+        exit_code: int = executor.wait(container_id)
+
+    except Exception as _:
+        exit_code = 1
+
+    for index in indices:
+        report_chunk(
+            file_id=data["id"],
+            index=index,
+            success=exit_code == 0,
+            container_id=container_id,
+        )
+
+    try:
+        executor.remove(container_id)
+    except Exception as _:
+        pass
+
+
+def _apply_command(container_id: str, action: str) -> None:
+    """
+    Stop, pause or resume a job of this node
+    :param -> container_id: str, action: str
+    :return -> None
+    """
+
+    try:
+        getattr(executor, action)(container_id)
+    except Exception as _:
+        pass
+
+
+def control_jobs() -> None:
+    """
+    Announce the whisper threads of this node and apply the commands queued for
+    the jobs this process controls, only it can stop or pause them
+    :return -> None
+    """
+
+    host_id: str = executor.get_host_id()
+    control_id: str = executor.get_control_id()
+
+    while True:
+        try:
+            NodeManager.register(
+                host_id=host_id, capacity=ChunkManager.get_threads_capacity()
+            )
+
+            command: dict | None = NodeManager.receive(
+                host_id=control_id, timeout=COMMAND_TIMEOUT
+            )
+
+            if command is None or command["action"] not in ("stop", "pause", "resume"):
+                continue
+
+            # A stop waits for the job to exit, the next commands do not, pauses
+            # and resumes are applied in turn to keep their order
+            if command["action"] == "stop":
+                threading.Thread(
+                    target=_apply_command,
+                    args=(command["container_id"], command["action"]),
+                    daemon=True,
+                ).start()
+                continue
+
+            _apply_command(
+                container_id=command["container_id"], action=command["action"]
+            )
+
+        except Exception as e:
+            logger.critical("Error: Job commands could not be received ", e)
+            time.sleep(RECONNECT_DELAY)
+
+
+def _start_control() -> None:
+    """
+    Run the commands loop of the jobs nobody watches in this worker process, the
+    only one able to signal and reap them, once per forked process
+    :return -> None
+    """
+
+    global control_pid
+
+    with control_lock:
+        if control_pid == os.getpid():
+            return
+
+        control_pid = os.getpid()
+
+    threading.Thread(target=control_jobs, daemon=True).start()
+
+
+def _get_command(data: dict, indices: list[int], threads: int) -> str:
+    """
+    Get the whisper command of a job, chunks of a batch share one invocation
+    :param -> data: dict, indices: list[int], threads: int
+    :return -> str
+    """
+
+    return WhisperManager.get_batch_command(
+        langauge=Language(data["language"]),
+        threads=threads,
+        file_names=[data["files"][index] for index in indices],
+        output_names=[data["outputs"][index] for index in indices],
+        model=data["model"],
+        decoding=data["decoding"],
+    )
+
+
+def _run_container(data: dict, indices: list[int], container_id: str) -> None:
+    """
+    Start a detached one-shot job for chunks pinned to idle cores of this node,
+    the watcher or this worker reports its exit
+    :param -> data: dict, indices: list[int], container_id: str
+    :return -> None
+    """
+
+    # Only the watcher of this node, or this worker process for the jobs nobody
+    # watches, can stop or pause the job, which is known before it starts so no
+    # command sent meanwhile is dropped
+    if not executor.watched:
+        _start_control()
+
+    NodeManager.set_host(container_id=container_id, host_id=executor.get_control_id())
+
+    # The planned threads are capped by the budget of this node, and the job runs
+    # as many threads as cores were reserved for it
+    threads: int = min(data["threads"], ChunkManager.get_threads_capacity())
+
+    with CpuManager.reserve(threads=threads) as resources:
+        executor.run(
+            config=data["container_config"],
+            command=_get_command(
+                data=data,
+                indices=indices,
+                threads=CpuManager.get_threads(resources=resources, threads=threads),
+            ),
+            name=container_id,
+            labels=JobManager.get_labels(file_id=data["id"], indices=indices),
+            resources=resources,
+        )
+
+    # A stop applied before the job existed missed it, its exit is still reported
+    if not JobManager.is_tracked(file_id=data["id"]):
+        executor.stop(container_id)
+
+    if not executor.watched:
+        threading.Thread(
+            target=_supervise, args=(data, indices, container_id), daemon=True
+        ).start()
+
+
+def _get_chunk(
+    session: Session, file_id: str, index: int
+) -> TranscriptionChunksModel | None:
+    """
+    Get the chunk state of a transcription
+    :param -> session: Session, file_id: str, index: int
+    :return -> TranscriptionChunksModel | None
+    """
+
+    return (
+        session.query(TranscriptionChunksModel)
+        .join(
+            TranscriptionsModel,
+            TranscriptionsModel.id == TranscriptionChunksModel.transcription_id,
+        )
+        .filter(
+            TranscriptionsModel.file_id == file_id,
+            TranscriptionChunksModel.index == index,
+        )
+        .first()
+    )
+
+
+def _get_output_hash(file_id: str, name: str) -> str | None:
+    """
+    Get the sha256 of a chunk transcript, None when it is missing
+    :param -> file_id: str, name: str
+    :return -> str | None
+    """
+
+    try:
+        return file_manager.get_file_hash(
+            file_manager.get_folder_path(file_id=file_id) + f"/{name}.srt"
+        )
+    except OSError:
+        return None
+
+
+def report_progress(file_id: str, index: int, fraction: float) -> None:
+    """
+    Record the progress of a chunk, storing and publishing the transcription
+    progress at most once per progress interval
+    :param -> file_id: str, index: int, fraction: float
+    :return -> None
+    """
+
+    progress: float | None = JobManager.set_progress(
+        file_id=file_id, index=index, fraction=fraction
+    )
+
+    if progress is None:
+        return
+
+    session = next(db_client.get_db_session())
+
+    try:
+        transcription: TranscriptionsModel | None = (
+            session.query(TranscriptionsModel).filter_by(file_id=file_id).first()
+        )
+
+        if transcription is None or transcription.status != Status.PROCESSING:
+            return
+
+        transcription.progress = progress
+        session.commit()
+
+    finally:
+        session.close()
+
+    NotificationsService().publish(
+        channel=Channels.NOTIFICATIONS,
+        message=json.dumps(
+            {
+                "id": file_id,
+                "status": Status.PROCESSING,
+                "type": NotificationType.INFO,
+                "task": Task.TRANSCRIPTION,
+                "message": "transcription in process",
+                "progress": progress,
+                "completed_at": None,
+            }
+        ),
+    )
+
+
+def _publish_segments(data: dict, index: int) -> None:
+    """
+    Store the segments of a finished chunk, shifted to the whole audio, and publish
+    them so they are available before the transcription is merged
+    :param -> data: dict, index: int
+    :return -> None
+    """
+
+    try:
+        output_file: str = file_manager.get_segments_path(
+            file_id=data["id"], index=index
+        )
+        file_manager.make_directory(str(Path(output_file).parent))
+
+        # Written aside and moved so partial downloads never read a half file
+        segments: list[dict] = SubtitleManager(
+            input_files=[
+                Path(
+                    file_manager.get_folder_path(file_id=data["id"])
+                    + f"/{data['outputs'][index]}.srt"
+                )
+            ]
+        ).generate_segments(
+            output_file=output_file + file_manager.partial_file_extension,
+            offset=data["offsets"][index],
+            window=tuple(data["windows"][index]),
+            is_last=index == len(data["outputs"]) - 1,
+        )
+        file_manager.move_file(
+            output_file + file_manager.partial_file_extension, output_file
+        )
+
+    except Exception as e:
+        logger.info(
+            f"Info: Segments of chunk {index} of {data['id']} not published ", e
+        )
+        return
+
+    NotificationsService().publish(
+        channel=Channels.NOTIFICATIONS,
+        message=json.dumps(
+            {
+                "id": data["id"],
+                "status": Status.PROCESSING,
+                "type": NotificationType.INFO,
+                "task": Task.TRANSCRIPTION,
+                "message": "transcription segments generated",
+                "chunk": index,
+                "segments": segments,
+                "completed_at": None,
+            }
+        ),
+    )
+
+
+def _stop_containers(container_ids: list[str]) -> None:
+    """
+    Ask the watchers of the nodes running chunk containers to stop them,
+    containers never started are skipped
+    :param -> container_ids: list[str]
+    :return -> None
+    """
+
+    for container_id in container_ids:
+        try:
+            NodeManager.send(container_id=container_id, action="stop")
+        except Exception as _:
+            pass
+
+
+def _report_draft_chunk(data: dict, index: int, success: bool) -> None:
+    """
+    Count an exited chunk of a draft pass, drafts are best effort so failed chunks
+    are neither checkpointed nor retried
+    :param -> data: dict, index: int, success: bool
+    :return -> None
+    """
+
+    success = (
+        success
+        and _get_output_hash(file_id=data["id"], name=data["outputs"][index])
+        is not None
+    )
+
+    data = JobManager.complete(file_id=data["id"], index=index, success=success)
+
+    if data is not None:
+        finalize_transcription.apply_async(
+            kwargs={"data": data, "failed": not success},
+            priority=TASK_PRIORITIES[data["priority"]],
+        )
+
+
+def report_chunk(
+    file_id: str, index: int, success: bool, container_id: str | None
+) -> None:
+    """
+    Checkpoint an exited chunk, retry it within the retry budget when it failed and
+    finalize its transcription once it is decided, only the container of the
+    running attempt reports it, checkpointed chunks report without one
+    :param -> file_id: str, index: int, success: bool, container_id: str | None
+    :return -> None
+    """
+
+    payload: dict | None = JobManager.get(file_id=file_id)
+
+    # Draft containers only report to their own pass, the exits of the ones left
+    # running when the final pass started are ignored below
+    if payload is not None and payload["draft"]:
+        if container_id not in payload["container_ids"]:
+            return
+
+        return _report_draft_chunk(data=payload, index=index, success=success)
+
+    session = next(db_client.get_db_session())
+    retry: dict | None = None
+
+    try:
+        chunk: TranscriptionChunksModel | None = _get_chunk(
+            session=session, file_id=file_id, index=index
+        )
+
+        if chunk is None:
+            return
+
+        if container_id is None:
+            if chunk.status != Status.DONE:
+                return
+
+        # Exits reported twice or by the container of an earlier attempt are stale
+        elif chunk.status != Status.PROCESSING or chunk.container_id != container_id:
+            return
+
+        else:
+            # A chunk is only done once its transcript is on disk
+            output_hash: str | None = (
+                _get_output_hash(file_id=file_id, name=chunk.name) if success else None
+            )
+            success = output_hash is not None
+
+            chunk.status = Status.DONE if success else Status.ERROR
+            chunk.output_hash = output_hash
+
+            if not success and chunk.attempts <= settings.transcription_chunk_retries:
+                retry = payload
+
+            session.commit()
+
+    finally:
+        session.close()
+
+    if success:
+        report_progress(file_id=file_id, index=index, fraction=1.0)
+
+        if payload is not None:
+            _publish_segments(data=payload, index=index)
+
+    if retry is not None:
+        logger.info(f"Info: Chunk {index} of {file_id} failed, retrying")
+        transcribe_chunk.apply_async(
+            kwargs={"data": retry, "index": index, "container_id": str(uuid4())},
+            priority=TASK_PRIORITIES[retry["priority"]],
+            countdown=CHUNK_RETRY_DELAY,
+        )
+        return
+
+    data: dict | None = JobManager.complete(
+        file_id=file_id, index=index, success=success
+    )
+
+    if data is not None:
+        finalize_transcription.apply_async(
+            kwargs={"data": data, "failed": not success},
+            priority=TASK_PRIORITIES[data["priority"]],
+        )
+
+
+def _get_payload(
+    transcription: TranscriptionsModel,
+    chunks: list[FileChunksModel],
+    threads: int,
+    batches: list[list[int]] | None = None,
+    draft: bool = False,
+) -> dict:
+    """
+    Build the transcription job payload, a draft pass runs the draft model and
+    writes its transcripts next to the final ones
+    :param -> transcription: TranscriptionsModel, chunks: list[FileChunksModel], threads: int, batches: list[list[int]] | None, draft: bool
+    :return -> dict
+    """
+
+    model: Model = WhisperManager.draft_model if draft else transcription.model
+    speed: Speed = WhisperManager.draft_speed if draft else transcription.speed
+    outputs: list[str] = [
+        chunk.name + (WhisperManager.draft_suffix if draft else "") for chunk in chunks
+    ]
+
+    return TranscriptionBackgroundJobPayloadSchema(
+        id=transcription.file_id,
+        container_config=WhisperManager.get_container_config(
+            file_id=transcription.file_id
+        ),
+        priority=transcription.priority,
+        threads=threads,
+        model=model,
+        decoding=WhisperManager.get_decoding(speed=speed),
+        draft=draft,
+        language=WhisperManager.get_spoken_language(langauge=transcription.language),
+        commands=[
+            WhisperManager.get_command(
+                langauge=transcription.language,
+                threads=threads,
+                file_name=chunk.name,
+                model=model,
+                speed=speed,
+                output_name=output,
+            )
+            for chunk, output in zip(chunks, outputs)
+        ],
+        files=[chunk.name for chunk in chunks],
+        outputs=outputs,
+        batches=batches or [[index] for index in range(len(chunks))],
+        offsets=[chunk.offset for chunk in chunks],
+        windows=[(chunk.keep_start, chunk.keep_end) for chunk in chunks],
+    ).model_dump()
+
+
+def _set_paused(transcription: TranscriptionsModel, paused: bool) -> None:
+    """
+    Freeze or resume the containers of a running transcription through the
+    watchers of their nodes, chunks on the warm workers keep running and chunks
+    not started yet are deferred until it resumes
+    :param -> transcription: TranscriptionsModel, paused: bool
+    :return -> None
+    """
+
+    container_ids: set[str] = {
+        chunk.container_id
+        for chunk in transcription.chunks
+        if chunk.status == Status.PROCESSING and chunk.container_id is not None
+    }
+
+    # Containers of a running draft pass are not recorded on the chunks
+    payload: dict | None = JobManager.get(file_id=str(transcription.file_id))
+
+    if payload is not None and payload["draft"]:
+        container_ids.update(payload["container_ids"])
+
+    for container_id in container_ids:
+        try:
+            NodeManager.send(
+                container_id=container_id, action="pause" if paused else "resume"
+            )
+        except Exception as _:
+            pass
+
+    transcription.paused = paused
+
+    NotificationsService().publish(
+        channel=Channels.NOTIFICATIONS,
+        message=json.dumps(
+            {
+                "id": str(transcription.file_id),
+                "status": Status.PROCESSING,
+                "type": NotificationType.INFO,
+                "task": Task.TRANSCRIPTION,
+                "message": f"transcription {'paused' if paused else 'resumed'}",
+                "completed_at": None,
+            }
+        ),
+    )
+
+
+def _preempt(running: list[TranscriptionsModel], needed: int) -> int:
+    """
+    Pause the most recent LOW transcriptions until they free the needed threads,
+    nothing is paused when they cannot
+    :param -> running: list[TranscriptionsModel], needed: int
+    :return -> int
+    """
+
+    candidates: list[TranscriptionsModel] = sorted(
+        [
+            transcription
+            for transcription in running
+            if transcription.priority == Priority.LOW
+        ],
+        key=lambda transcription: transcription.created_at,
+        reverse=True,
+    )
+
+    if sum(transcription.threads or 0 for transcription in candidates) < needed:
+        return 0
+
+    freed: int = 0
+    for transcription in candidates:
+        if freed >= needed:
+            break
+
+        _set_paused(transcription=transcription, paused=True)
+        running.remove(transcription)
+        freed += transcription.threads or 0
+
+    return freed
 
 
 @background_tasks.task(
     acks_late=True,
     max_retries=1,
     default_retry_delay=60,
-    queue="transcription_task_queue",
+    queue="default",
+)
+def schedule_transcriptions() -> None:
+    session = next(db_client.get_db_session())
+    payloads: list[dict] = []
+
+    try:
+        # Serialize schedulers, the lock is released with the transaction
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEDULER_LOCK_KEY}
+        )
+
+        processing: list[TranscriptionsModel] = (
+            session.query(TranscriptionsModel)
+            .filter(TranscriptionsModel.status == Status.PROCESSING)
+            .order_by(TranscriptionsModel.created_at.asc())
+            .all()
+        )
+        running: list[TranscriptionsModel] = [
+            transcription for transcription in processing if not transcription.paused
+        ]
+        capacity: int = ChunkManager.get_cluster_capacity()
+        idle_threads: int = capacity - sum(
+            transcription.threads or 0 for transcription in running
+        )
+
+        queued: list[TranscriptionsModel] = (
+            session.query(TranscriptionsModel)
+            .filter(TranscriptionsModel.status == Status.QUEUE)
+            .order_by(
+                TranscriptionsModel.priority.desc(),
+                TranscriptionsModel.created_at.asc(),
+            )
+            .all()
+        )
+
+        # Paused transcriptions get their threads back, oldest first, once no HIGH
+        # transcription is running or waiting
+        if not any(
+            transcription.priority == Priority.HIGH
+            for transcription in running + queued
+        ):
+            for transcription in processing:
+                if not transcription.paused:
+                    continue
+
+                if (transcription.threads or 0) > idle_threads and len(running) > 0:
+                    break
+
+                _set_paused(transcription=transcription, paused=False)
+                idle_threads -= transcription.threads or 0
+                running.append(transcription)
+
+        for transcription in queued:
+            # Threads a HIGH transcription may take from the running LOW ones
+            preemptible: int = (
+                sum(
+                    running_transcription.threads or 0
+                    for running_transcription in running
+                    if running_transcription.priority == Priority.LOW
+                )
+                if transcription.priority == Priority.HIGH
+                and settings.transcription_preemption
+                else 0
+            )
+
+            if idle_threads + preemptible <= 0 and len(running) > 0:
+                break
+
+            # Transcribe either the whole audio or its parts, whichever is expected
+            # to finish first within the priority share of the idle threads
+            layouts: list[list[FileChunksModel]] = [
+                layout
+                for layout in [
+                    [chunk for chunk in transcription.file.chunks if chunk.index == 0],
+                    [chunk for chunk in transcription.file.chunks if chunk.index > 0],
+                ]
+                if len(layout) > 0
+            ]
+
+            threads_budget: int = ChunkManager.get_threads_budget(
+                priority=transcription.priority,
+                idle_threads=idle_threads + preemptible,
+            )
+            layout, threads = ChunkManager.select(
+                layouts=[[chunk.duration for chunk in layout] for layout in layouts],
+                threads_budget=threads_budget,
+            )
+            batches: list[list[int]] = ChunkManager.batch(
+                durations=[chunk.duration for chunk in layouts[layout]],
+                threads=threads,
+                threads_budget=threads_budget,
+                batch_size=settings.transcription_batch_size,
+            )
+            reserved: int = min(len(batches) * threads, capacity)
+
+            if reserved > idle_threads and preemptible > 0:
+                idle_threads += _preempt(
+                    running=running, needed=reserved - idle_threads
+                )
+
+            # Admit strictly in order, a job larger than the idle threads waits for
+            # running ones to finish instead of being overtaken
+            if reserved > idle_threads and len(running) > 0:
+                break
+
+            transcription.status = Status.PROCESSING
+            transcription.threads = reserved
+            idle_threads -= reserved
+            running.append(transcription)
+
+            payloads.append(
+                _get_payload(
+                    transcription=transcription,
+                    chunks=layouts[layout],
+                    threads=threads,
+                    batches=batches,
+                    draft=transcription.draft
+                    and transcription.model != WhisperManager.draft_model,
+                )
+            )
+
+        session.commit()
+
+    finally:
+        session.close()
+
+    for payload in payloads:
+        generate_transcription.apply_async(
+            kwargs={"data": payload}, priority=TASK_PRIORITIES[payload["priority"]]
+        )
+
+
+@background_tasks.task(
+    acks_late=True,
+    max_retries=1,
+    default_retry_delay=60,
+    queue="transcription_priority_task_queue",
 )
 def generate_transcription(data: dict) -> None:
     try:
@@ -31,7 +820,67 @@ def generate_transcription(data: dict) -> None:
         transcription: TranscriptionsModel = (
             session.query(TranscriptionsModel).filter_by(file_id=data["id"]).first()
         )
+        # Models of running transcriptions, and the small draft model, are never
+        # evicted from the registry
+        if not WhisperManager.is_bundled(model=data["model"]):
+            ModelManager.ensure(
+                model=data["model"],
+                in_use={
+                    WhisperManager.draft_model,
+                    *(
+                        model
+                        for (model,) in session.query(TranscriptionsModel.model)
+                        .filter(TranscriptionsModel.status == Status.PROCESSING)
+                        .distinct()
+                    ),
+                },
+            )
+
         transcription.status = Status.PROCESSING
+        transcription.progress = 0.0
+        transcription.task_ids = [str(uuid4()) for _ in data["commands"]]
+        container_ids: list[str] = list(transcription.task_ids)
+        checkpointed: list[int] = []
+
+        # The draft pass leaves the chunk states to the final pass
+        if not data["draft"]:
+            transcription.decoding = data["decoding"]
+
+            # Segments are published again as the chunks of this run finish
+            segments_directory: str = (
+                file_manager.get_folder_path(file_id=data["id"])
+                + "/"
+                + file_manager.segment_files
+            )
+            if file_manager.validate_file_path(segments_directory):
+                file_manager.delete_folder(segments_directory)
+
+            # Chunk states of an earlier run survive while the layout is unchanged
+            if [chunk.name for chunk in transcription.chunks] != data["files"]:
+                transcription.chunks = [
+                    TranscriptionChunksModel(index=index, name=name)
+                    for index, name in enumerate(data["files"])
+                ]
+
+            # Chunks whose transcript still matches its checkpoint are not rerun
+            for chunk in transcription.chunks:
+                if (
+                    chunk.status == Status.DONE
+                    and chunk.output_hash is not None
+                    and chunk.output_hash
+                    == _get_output_hash(file_id=data["id"], name=chunk.name)
+                ):
+                    checkpointed.append(chunk.index)
+                    continue
+
+                chunk.status = Status.QUEUE
+                chunk.attempts = 0
+                chunk.container_id = None
+                chunk.output_hash = None
+
+        session.commit()
+        session.refresh(transcription)
+        session.close()
 
         NotificationsService().publish(
             channel=Channels.NOTIFICATIONS,
@@ -47,48 +896,292 @@ def generate_transcription(data: dict) -> None:
             ),
         )
 
-        tasks = []
-        for command in data["commands"]:
-            container_id: str = str(uuid4())
-            task = threading.Thread(
-                target=docker_client.run_container,
-                args=(
-                    data["container_config"],
-                    command,
-                    data["detach"],
-                    data["remove"],
-                    container_id,
+        # Exits are matched against the containers of this pass
+        data["container_ids"] = container_ids
+        JobManager.start(data=data)
+
+    except Exception as _:
+        finalize_transcription.apply_async(
+            kwargs={"data": data, "failed": True},
+            priority=TASK_PRIORITIES[data["priority"]],
+        )
+        return
+
+    for index in checkpointed:
+        report_chunk(file_id=data["id"], index=index, success=True, container_id=None)
+
+    # Fan the batches out as tasks any worker node may pick up, the completions
+    # are counted per chunk in redis and the last one queues the merge, like a
+    # chord callback without a result backend
+    for batch in data["batches"]:
+        pending: list[int] = [index for index in batch if index not in checkpointed]
+
+        if len(pending) == 0:
+            continue
+
+        transcribe_chunk.apply_async(
+            kwargs={
+                "data": data,
+                "index": pending[0],
+                "container_id": container_ids[pending[0]],
+                "batch": pending,
+            },
+            priority=TASK_PRIORITIES[data["priority"]],
+        )
+
+
+@background_tasks.task(
+    acks_late=True,
+    max_retries=1,
+    default_retry_delay=60,
+    queue="transcription_priority_task_queue",
+)
+def transcribe_chunk(
+    data: dict, index: int, container_id: str, batch: list[int] | None = None
+) -> None:
+    # Chunks of terminated or already failed transcriptions are dropped
+    if not JobManager.is_tracked(file_id=data["id"]):
+        return
+
+    # The chunks one invocation transcribes in turn, retries run alone
+    indices: list[int] = batch or [index]
+
+    session = next(db_client.get_db_session())
+
+    try:
+        transcription: TranscriptionsModel | None = (
+            session.query(TranscriptionsModel).filter_by(file_id=data["id"]).first()
+        )
+
+        # Chunks of a paused transcription wait until it resumes
+        paused: bool = transcription is not None and transcription.paused
+
+        # Chunks of a draft pass are not checkpointed
+        if not paused and not data["draft"]:
+            chunks: list[TranscriptionChunksModel] = [
+                chunk
+                for chunk in (
+                    _get_chunk(session=session, file_id=data["id"], index=index)
+                    for index in indices
+                )
+                if chunk is not None and chunk.status != Status.DONE
+            ]
+
+            for chunk in chunks:
+                chunk.status = Status.PROCESSING
+                chunk.attempts += 1
+                chunk.container_id = container_id
+
+            session.commit()
+            indices = [chunk.index for chunk in chunks]
+
+    finally:
+        session.close()
+
+    if paused:
+        transcribe_chunk.apply_async(
+            kwargs={
+                "data": data,
+                "index": index,
+                "container_id": container_id,
+                "batch": batch,
+            },
+            priority=TASK_PRIORITIES[data["priority"]],
+            countdown=CHUNK_RETRY_DELAY,
+        )
+        return
+
+    if len(indices) == 0:
+        return
+
+    folder: str = file_manager.get_folder_path(file_id=data["id"])
+
+    # The warm workers only serve the bundled model
+    lease: tuple[str, str] | None = (
+        PoolManager.acquire()
+        if WhisperManager.is_bundled(model=data["model"])
+        else None
+    )
+
+    # Without an idle warm worker the chunks run detached on this node, and the
+    # watcher of the node reports their exit
+    if lease is None:
+        try:
+            _run_container(data=data, indices=indices, container_id=container_id)
+
+        except Exception as _:
+            for index in indices:
+                report_chunk(
+                    file_id=data["id"],
+                    index=index,
+                    success=False,
+                    container_id=container_id,
+                )
+
+        return
+
+    # A warm worker keeps its model loaded, the chunks are sent to it in turn
+    transcribed: list[int] = []
+
+    try:
+        for index in indices:
+            PoolManager.transcribe(
+                url=lease[0],
+                input_path=f"{folder}/{data['files'][index]}.wav",
+                output_path=f"{folder}/{data['outputs'][index]}.srt",
+                language=data["language"],
+                decoding=data["decoding"],
+            )
+            transcribed.append(index)
+
+    except Exception as _:
+        logger.info(f"Info: Worker {lease[0]} failed, running a one-shot container")
+
+    finally:
+        PoolManager.release(url=lease[0], token=lease[1])
+
+    for index in transcribed:
+        report_chunk(
+            file_id=data["id"], index=index, success=True, container_id=container_id
+        )
+
+    remaining: list[int] = [index for index in indices if index not in transcribed]
+
+    if len(remaining) == 0:
+        return
+
+    try:
+        _run_container(data=data, indices=remaining, container_id=container_id)
+
+    except Exception as _:
+        for index in remaining:
+            report_chunk(
+                file_id=data["id"],
+                index=index,
+                success=False,
+                container_id=container_id,
+            )
+
+
+def _merge_transcripts(data: dict) -> None:
+    """
+    Merge the chunk transcripts of a job into the transcriptions of its file, the
+    merged files are staged and swapped in so a download never sees partial ones
+    :param -> data: dict
+    :return -> None
+    """
+
+    folder: str = file_manager.get_folder_path(file_id=data["id"])
+
+    # Transcripts follow the order of the inputs, shifted by their recorded offsets
+    files: list[Path] = [Path(f"{folder}/{name}.srt") for name in data["outputs"]]
+    staging_directory: str = (
+        f"{folder}/{file_manager.transcripted_files}{file_manager.partial_file_extension}"
+    )
+    file_manager.make_directory(staging_directory)
+    SubtitleManager(input_files=files).generate_files(
+        output_folder=staging_directory,
+        offsets=data["offsets"],
+        windows=data["windows"],
+    )
+    file_manager.replace_transcriptions(
+        file_id=data["id"], source_folder=staging_directory
+    )
+
+
+def _refine_transcription(data: dict, failed: bool) -> None:
+    """
+    Publish the transcriptions of a finished draft pass and queue the final pass
+    on the threads the draft held
+    :param -> data: dict, failed: bool
+    :return -> None
+    """
+
+    try:
+        if not failed:
+            _merge_transcripts(data=data)
+
+            NotificationsService().publish(
+                channel=Channels.NOTIFICATIONS,
+                message=json.dumps(
+                    {
+                        "id": data["id"],
+                        "status": Status.PROCESSING,
+                        "type": NotificationType.INFO,
+                        "task": Task.TRANSCRIPTION,
+                        "message": "draft transcription generated",
+                        "draft": True,
+                        "completed_at": None,
+                    }
                 ),
             )
-            tasks.append(task)
-            transcription.task_ids = list(transcription.task_ids or []) + [container_id]
 
-        session.commit()
-        session.refresh(transcription)
-        session.close()
+    except Exception as e:
+        logger.info(f"Info: Draft transcription of {data['id']} failed ", e)
+
+    # The draft containers still running would hold the threads of the final pass
+    if failed:
+        _stop_containers(container_ids=data["container_ids"])
 
-        [task.start() for task in tasks]
-        [task.join() for task in tasks]
+    JobManager.clear(file_id=data["id"])
 
-        files: list[Path] = file_manager.get_transcripted_files(file_id=data["id"])
-        offset: float = AudioManager(
-            path=file_manager.get_file_path(file_id=data["id"], file_extension=".wav"),
-            format="wav",
-        ).get_audio_split_offset(parts_count=len(data["commands"]))
-        output_directory: str = (
-            file_manager.get_folder_path(file_id=data["id"]) + "/transcriptions"
+    session = next(db_client.get_db_session())
+
+    try:
+        transcription: TranscriptionsModel | None = (
+            session.query(TranscriptionsModel).filter_by(file_id=data["id"]).first()
         )
-        file_manager.make_directory(output_directory)
-        SubtitleManager(input_files=files).generate_files(
-            output_folder=output_directory,
-            offset=offset,
+
+        # Terminated while drafting
+        if transcription is None or transcription.status != Status.PROCESSING:
+            return
+
+        chunks: dict[str, FileChunksModel] = {
+            chunk.name: chunk for chunk in transcription.file.chunks
+        }
+        payload: dict = _get_payload(
+            transcription=transcription,
+            chunks=[chunks[name] for name in data["files"]],
+            threads=data["threads"],
+            batches=data["batches"],
         )
 
+    finally:
+        session.close()
+
+    generate_transcription.apply_async(
+        kwargs={"data": payload}, priority=TASK_PRIORITIES[payload["priority"]]
+    )
+
+
+@background_tasks.task(
+    acks_late=True,
+    max_retries=1,
+    default_retry_delay=60,
+    queue="transcription_priority_task_queue",
+)
+def finalize_transcription(data: dict, failed: bool) -> None:
+    # The threads stay reserved for the final pass
+    if data["draft"]:
+        return _refine_transcription(data=data, failed=failed)
+
+    try:
+        if failed:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "detail": "Error: Transcription chunk failed",
+                }
+            )
+
+        _merge_transcripts(data=data)
+
         session = next(db_client.get_db_session())
         transcription: TranscriptionsModel = (
             session.query(TranscriptionsModel).filter_by(file_id=data["id"]).first()
         )
         transcription.status = Status.DONE
+        transcription.progress = 100.0
         completed_at = datetime.now(timezone.utc)
         transcription.completed_at = completed_at
 
@@ -120,6 +1213,15 @@ def generate_transcription(data: dict) -> None:
         if not transcription:
             return
 
+        # Chunks still running can no longer make the transcription succeed
+        _stop_containers(
+            container_ids=[
+                chunk.container_id
+                for chunk in transcription.chunks
+                if chunk.status == Status.PROCESSING and chunk.container_id is not None
+            ]
+        )
+
         transcription.status = Status.ERROR
         completed_at = datetime.now(timezone.utc)
         transcription.completed_at = completed_at
@@ -142,26 +1244,27 @@ def generate_transcription(data: dict) -> None:
             ),
         )
 
+    finally:
+        JobManager.clear(file_id=data["id"])
+
+        # Hand the released threads to the queued transcriptions
+        schedule_transcriptions.delay()
+
 
 @background_tasks.task(
     acks_late=True,
     max_retries=1,
     default_retry_delay=60,
-    queue="transcription_task_queue",
+    queue="transcription_priority_task_queue",
 )
 def terminate_transcription(file_id: str, container_ids: list[str]):
     try:
         session = next(db_client.get_db_session())
 
-        tasks = []
-        for container_id in container_ids:
-            task = threading.Thread(
-                target=docker_client.stop_container, args=(container_id,)
-            )
-            tasks.append(task)
+        # The watcher ignores the exits of untracked containers
+        JobManager.clear(file_id=file_id)
 
-        [task.start() for task in tasks]
-        [task.join() for task in tasks]
+        _stop_containers(container_ids=container_ids)
 
         session.query(TranscriptionsModel).filter_by(file_id=file_id).delete()
         session.commit()
@@ -210,3 +1313,7 @@ def terminate_transcription(file_id: str, container_ids: list[str]):
                 }
             ),
         )
+
+    finally:
+        # Hand the released threads to the queued transcriptions
+        schedule_transcriptions.delay()
@@ -0,0 +1,137 @@
+# Purpose: Watcher reporting the exits of detached transcription containers and applying
+# the commands queued for them on its node.
+# Path: backend\app\background_tasks\watcher.py
+
+import threading
+import time
+
+from loguru import logger
+
+from app.background_tasks.transcription import (
+    RECONNECT_DELAY,
+    control_jobs,
+    follow_output,
+    report_chunk,
+)
+from app.utils.executors import executor
+from app.utils.job_manager import JobManager
+
+# Containers whose output is being followed
+followed: set[str] = set()
+followed_lock: threading.Lock = threading.Lock()
+
+
+def _follow_logs(container_id: str, labels: dict) -> None:
+    """
+    Parse the whisper output of a running chunk container into progress reports
+    :param -> container_id: str, labels: dict
+    :return -> None
+    """
+
+    try:
+        follow_output(
+            file_id=labels[JobManager.file_label],
+            indices=JobManager.get_indices(labels=labels),
+            output=executor.get_output(container_id),
+        )
+
+    except Exception as _:
+        pass
+
+    finally:
+        with followed_lock:
+            followed.discard(container_id)
+
+
+def _handle_start(container_id: str, labels: dict) -> None:
+    """
+    Follow the output of a started chunk container in a background thread
+    :param -> container_id: str, labels: dict
+    :return -> None
+    """
+
+    with followed_lock:
+        if container_id in followed:
+            return
+
+        followed.add(container_id)
+
+    threading.Thread(
+        target=_follow_logs, args=(container_id, labels), daemon=True
+    ).start()
+
+
+def _handle_exit(container_id: str, labels: dict, exit_code: int) -> None:
+    """
+    Report the chunks of an exited container and remove it
+    :param -> container_id: str, labels: dict, exit_code: int
+    :return -> None
+    """
+
+    try:
+        for index in JobManager.get_indices(labels=labels):
+            report_chunk(
+                file_id=labels[JobManager.file_label],
+                index=index,
+                success=exit_code == 0,
+                container_id=container_id,
+            )
+
+    except Exception as e:
+        logger.critical(
+            f"Error: Container {container_id} exit could not be reported ", e
+        )
+        return
+
+    try:
+        executor.remove(container_id)
+    except Exception as _:
+        pass
+
+
+def watch() -> None:
+    """
+    Follow the docker events stream, a single process supervises every chunk
+    container and its output while the celery workers stay free
+    :return -> None
+    """
+
+    while True:
+        since: int = int(time.time())
+
+        try:
+            for name, labels, _ in executor.get_jobs(
+                label=JobManager.file_label, state="running"
+            ):
+                _handle_start(container_id=name, labels=labels)
+
+            # Containers which exited while the stream was down
+            for name, labels, exit_code in executor.get_jobs(
+                label=JobManager.file_label, state="exited"
+            ):
+                _handle_exit(container_id=name, labels=labels, exit_code=exit_code)
+
+            for action, name, labels, exit_code in executor.get_events(
+                label=JobManager.file_label, events=["start", "die"], since=since
+            ):
+                if action == "start":
+                    _handle_start(container_id=name, labels=labels)
+                    continue
+
+                _handle_exit(container_id=name, labels=labels, exit_code=exit_code)
+
+        except Exception as e:
+            logger.critical("Error: Docker events stream interrupted ", e)
+            time.sleep(RECONNECT_DELAY)
+
+
+if __name__ == "__main__":
+    # The worker which started a job supervises and controls it when its exit is
+    # not watched, this process has nothing to follow
+    if not executor.watched:
+        logger.info("Info: Transcription workers supervise their own processes")
+        threading.Event().wait()
+
+    logger.info("Success: Transcription watcher started")
+    threading.Thread(target=control_jobs, daemon=True).start()
+    watch()
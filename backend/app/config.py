@@ -16,6 +16,46 @@ class Settings(BaseSettings):
     postgres_password: str
     postgres_port: int
 
+    # Streaming uploads, chunk size in bytes and bounded queue length
+    upload_chunk_size: int = 1024 * 1024
+    upload_queue_size: int = 8
+
+    # Seconds of audio shared by adjacent parts, 0 disables overlapping chunks
+    chunk_overlap: float = 0.0
+
+    # Warm whisper server urls, transcriptions run in one-shot containers when
+    # none are idle, and the lease expiry in seconds
+    transcription_workers: list[str] = []
+    transcription_worker_timeout: int = 3600
+
+    # Whisper threads the scheduler may hand out, 0 uses every logical core
+    transcription_threads: int = 0
+
+    # Pause the containers of running LOW transcriptions while a HIGH one needs
+    # their threads, and resume them afterwards
+    transcription_preemption: bool = False
+
+    # Attempts a failed chunk gets on top of its first run before the
+    # transcription fails
+    transcription_chunk_retries: int = 2
+
+    # Whisper models are downloaded on demand into the registry, the least
+    # recently used ones are evicted beyond the size limit in bytes
+    model_registry_size: int = 8 * 1024 * 1024 * 1024
+    model_registry_url: str = (
+        "https://huggingface.co/ggerganov/whisper.cpp/resolve/main"
+    )
+
+    # Chunks a single whisper invocation may transcribe in turn, sharing one model
+    # load, when a transcription has more chunks than its threads run at once
+    transcription_batch_size: int = 1
+
+    # Runs the whisper jobs in docker containers, or with "subprocess" as local
+    # processes of the workers, the binary and bundled models of the host
+    transcription_executor: str = "docker"
+    whisper_binary: str = "whisper"
+    whisper_models_path: str = "/root/models"
+
     class Config:
         env_file = ".env"
 
@@ -4,12 +4,22 @@
 import uuid
 from typing import List
 
-from sqlalchemy import ARRAY, TIMESTAMP, ForeignKey, String, text
+from sqlalchemy import (
+    ARRAY,
+    TIMESTAMP,
+    BigInteger,
+    Boolean,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    text,
+)
 from sqlalchemy.dialects.postgresql import ENUM as EnumPG
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.utils.shared import Base, Language, Priority, Status, Type
+from app.utils.shared import Base, Language, Model, Priority, Speed, Status, Type
 
 
 class FilesModel(Base):
@@ -36,12 +46,73 @@ class FilesModel(Base):
         TIMESTAMP(timezone=True), default=None, nullable=True
     )
 
+    # Sha256 of the uploaded bytes, indexed to find identical uploads
+    content_hash: Mapped[str] = mapped_column(
+        String, default=None, nullable=True, index=True
+    )
+
+    # Id of the file whose optimized media was reused for this upload
+    source_id: Mapped[str] = mapped_column(String, default=None, nullable=True)
+
+    # Media metadata recorded at ingest, duration in seconds and size in bytes
+    duration: Mapped[float] = mapped_column(Float, default=None, nullable=True)
+    sample_rate: Mapped[int] = mapped_column(Integer, default=None, nullable=True)
+    channels: Mapped[int] = mapped_column(Integer, default=None, nullable=True)
+    codec: Mapped[str] = mapped_column(String, default=None, nullable=True)
+    size: Mapped[int] = mapped_column(BigInteger, default=None, nullable=True)
+
+    # Establish a relationship with FileChunksModel
+    chunks: Mapped[List["FileChunksModel"]] = relationship(
+        "FileChunksModel",
+        back_populates="file",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="FileChunksModel.index",
+    )
+
     # Establish a relationship with TranscriptionsModel
     transcription: Mapped["TranscriptionsModel"] = relationship(
         "TranscriptionsModel", back_populates="file", cascade="all, delete-orphan"
     )
 
 
+class FileChunksModel(Base):
+    __tablename__ = "file_chunks"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        index=True,
+        nullable=False,
+    )
+
+    # Index 0 is the whole optimized audio, the parts follow from index 1
+    index: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+
+    # Start offset in the whole audio and duration, in seconds
+    offset: Mapped[float] = mapped_column(Float, nullable=False)
+    duration: Mapped[float] = mapped_column(Float, nullable=False)
+
+    # Range of the whole audio owned by the chunk, narrower than the chunk
+    # itself when adjacent chunks overlap
+    keep_start: Mapped[float] = mapped_column(Float, nullable=False)
+    keep_end: Mapped[float] = mapped_column(Float, nullable=False)
+
+    # Foreign key to the file model and Index it for faster queries
+    file_id: Mapped[str] = mapped_column(
+        String, ForeignKey("files.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+
+    # Establish a relationship with FilesModel
+    file: Mapped["FilesModel"] = relationship(
+        "FilesModel",
+        back_populates="chunks",
+    )
+
+
 class TranscriptionsModel(Base):
     __tablename__ = "transcriptions"
 
@@ -59,6 +130,18 @@ class TranscriptionsModel(Base):
     priority: Mapped[Priority] = mapped_column(
         EnumPG(Priority), default=Priority.LOW, nullable=False
     )
+    model: Mapped[Model] = mapped_column(
+        EnumPG(Model), default=Model.SMALL, nullable=False
+    )
+    speed: Mapped[Speed] = mapped_column(
+        EnumPG(Speed), default=Speed.ACCURATE, nullable=False
+    )
+
+    # Run a quick draft pass before the final one
+    draft: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+    # Decoding parameters the speed preset resolved to when the job started
+    decoding: Mapped[dict] = mapped_column(JSONB, default=None, nullable=True)
     status: Mapped[Status] = mapped_column(
         EnumPG(Status), default=Status.QUEUE, index=True, nullable=False
     )
@@ -72,6 +155,15 @@ class TranscriptionsModel(Base):
     # Task ids of the celery tasks
     task_ids: Mapped[List[str]] = mapped_column(ARRAY(String), nullable=True)
 
+    # Containers frozen to hand their threads to a higher priority transcription
+    paused: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+    # Completed percentage of the running transcription, from the whisper output
+    progress: Mapped[float] = mapped_column(Float, default=None, nullable=True)
+
+    # Threads reserved from the node budget while the transcription is processing
+    threads: Mapped[int] = mapped_column(Integer, default=None, nullable=True)
+
     # Foreign key to the file model and Index it for faster queries
     file_id: Mapped[str] = mapped_column(
         String, ForeignKey("files.id"), nullable=False, index=True
@@ -82,3 +174,56 @@ class TranscriptionsModel(Base):
         "FilesModel",
         back_populates="transcription",
     )
+
+    # Establish a relationship with TranscriptionChunksModel
+    chunks: Mapped[List["TranscriptionChunksModel"]] = relationship(
+        "TranscriptionChunksModel",
+        back_populates="transcription",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="TranscriptionChunksModel.index",
+    )
+
+
+class TranscriptionChunksModel(Base):
+    __tablename__ = "transcription_chunks"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        index=True,
+        nullable=False,
+    )
+
+    # Position of the chunk in the transcription payload and its audio name
+    index: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+
+    # QUEUE until launched, PROCESSING while running, DONE once its transcript is
+    # checkpointed and ERROR after a failed attempt
+    status: Mapped[Status] = mapped_column(
+        EnumPG(Status), default=Status.QUEUE, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    # Container of the latest attempt
+    container_id: Mapped[str] = mapped_column(String, default=None, nullable=True)
+
+    # Sha256 of the chunk transcript, a rerun skips the chunk while it matches
+    output_hash: Mapped[str] = mapped_column(String, default=None, nullable=True)
+
+    # Foreign key to the transcription model and Index it for faster queries
+    transcription_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("transcriptions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Establish a relationship with TranscriptionsModel
+    transcription: Mapped["TranscriptionsModel"] = relationship(
+        "TranscriptionsModel",
+        back_populates="chunks",
+    )
@@ -1,9 +1,10 @@
 # Purpose: Files router for handling files related operations.
 # Path: backend\app\routers\files.py
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile
+from fastapi import APIRouter, Body, Depends, File, Form, Header, Request, UploadFile
 from sqlalchemy.orm import Session
 
+from app.schemas import ResumableUploadSchema
 from app.services.files import FileService
 from app.utils.db_client import db_client
 from app.utils.shared import Sort
@@ -31,8 +32,64 @@ async def upload(
     session: Session = Depends(db_client.get_db_session),
     file: UploadFile = File(...),
     name: str = Form(...),
+    decode: bool = False,
 ):
-    return await FileService(session=session).upload(name=name, file=file)
+    return await FileService(session=session).upload(
+        name=name, file=file, decode=decode
+    )
+
+
+@router.post("/stream", response_description="Stream upload file")
+async def upload_stream(
+    request: Request,
+    session: Session = Depends(db_client.get_db_session),
+    decode: bool = False,
+):
+    return await FileService(session=session).upload_stream(
+        request=request, decode=decode
+    )
+
+
+@router.post("/uploads", response_description="Create resumable upload")
+async def create_upload(
+    session: Session = Depends(db_client.get_db_session),
+    upload_details: ResumableUploadSchema = Body(...),
+):
+    return await FileService(session=session).create_upload(
+        upload_details=upload_details
+    )
+
+
+@router.get("/uploads/{upload_id}", response_description="Resumable upload status")
+async def get_upload(
+    upload_id: str, session: Session = Depends(db_client.get_db_session)
+):
+    return await FileService(session=session).get_upload(upload_id=upload_id)
+
+
+@router.patch("/uploads/{upload_id}", response_description="Upload chunk")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    session: Session = Depends(db_client.get_db_session),
+    upload_offset: int = Header(...),
+    upload_checksum: str | None = Header(None),
+):
+    return await FileService(session=session).upload_chunk(
+        upload_id=upload_id,
+        request=request,
+        offset=upload_offset,
+        checksum=upload_checksum,
+    )
+
+
+@router.post(
+    "/uploads/{upload_id}/finalize", response_description="Finalize resumable upload"
+)
+async def finalize_upload(
+    upload_id: str, session: Session = Depends(db_client.get_db_session)
+):
+    return await FileService(session=session).finalize_upload(upload_id=upload_id)
 
 
 @router.delete("/{file_id}", response_description="Delete file")
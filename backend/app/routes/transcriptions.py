@@ -37,9 +37,20 @@ async def transcribe(
     )
 
 
+@router.get("/{file_id}/queue", response_description="Get transcription queue position")
+async def queue(file_id: str, session: Session = Depends(db_client.get_db_session)):
+    return await TranscriptionService(session=session).queue(file_id=file_id)
+
+
 @router.get("/{file_id}/download", response_description="Download transcription")
-async def download(file_id: str, session: Session = Depends(db_client.get_db_session)):
-    return await TranscriptionService(session=session).download(file_id=file_id)
+async def download(
+    file_id: str,
+    partial: bool = False,
+    session: Session = Depends(db_client.get_db_session),
+):
+    return await TranscriptionService(session=session).download(
+        file_id=file_id, partial=partial
+    )
 
 
 @router.delete(
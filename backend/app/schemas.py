@@ -6,7 +6,7 @@ from typing import Optional
 from pydantic import BaseModel, Field
 
 from app.models import FilesModel, TranscriptionsModel
-from app.utils.shared import Language, Priority, Status, Type
+from app.utils.shared import Language, Model, Priority, Speed, Status, Type
 
 
 class TranscriptionSchema(BaseModel):
@@ -17,6 +17,15 @@ class TranscriptionSchema(BaseModel):
     priority: Priority = Field(
         Priority.LOW, description="Priority of the transcription job"
     )
+    model: Model = Field(
+        Model.SMALL, description="Whisper model used for the transcription"
+    )
+    speed: Speed = Field(
+        Speed.ACCURATE, description="Decoding preset trading accuracy for speed"
+    )
+    draft: bool = Field(
+        False, description="Publish a quick draft before the final transcription"
+    )
 
     class Config:
         json_schema_extra = {
@@ -24,6 +33,26 @@ class TranscriptionSchema(BaseModel):
                 "file_id": "XXXX-XXXX",
                 "language": "en",
                 "priority": "LOW",
+                "model": "small.en",
+                "speed": "ACCURATE",
+                "draft": False,
+            }
+        }
+
+
+class ResumableUploadSchema(BaseModel):
+    name: str = Field(..., description="Name of the file")
+    filename: str = Field(..., description="Original file name, including extension")
+    content_type: str = Field(..., description="Mime type of the file")
+    size: int = Field(..., gt=0, description="Total size of the file in bytes")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "name": "Interview",
+                "filename": "interview.mp4",
+                "content_type": "video/mp4",
+                "size": 4294967296,
             }
         }
 
@@ -36,7 +65,9 @@ class ConversionBackgroundJobPayloadSchema(BaseModel):
     output_path: str
     output_format: str
     delete_original_file: bool
-    parts_count: int
+
+    # Planned from the audio duration and worker cores when not set
+    parts_count: Optional[int] = None
 
     class Config:
         allow_population_by_field_name: True
@@ -46,9 +77,21 @@ class ConversionBackgroundJobPayloadSchema(BaseModel):
 class TranscriptionBackgroundJobPayloadSchema(BaseModel):
     id: str
     container_config: dict
-    detach: bool
-    remove: bool
+    priority: Priority
+    threads: int
+    model: Model
+    decoding: dict
+    draft: bool
+    language: str
     commands: list[str]
+    files: list[str]
+    outputs: list[str]
+    batches: list[list[int]]
+    offsets: list[float]
+    windows: list[tuple[float, float]]
+
+    # Containers of the chunks, assigned when the job starts
+    container_ids: list[str] = []
 
     class Config:
         allow_population_by_field_name: True
@@ -61,6 +104,7 @@ class FileResponse:
         self.name: str = data.name
         self.type: Type = data.type
         self.status: Status = data.status
+        self.duration: Optional[float] = data.duration
         self.created_at: str = data.created_at.isoformat()
         self.completed_at: Optional[str] = (
             data.completed_at.isoformat() if data.completed_at else None
@@ -72,6 +116,7 @@ class FileResponse:
             "name": self.name,
             "type": self.type,
             "status": self.status,
+            "duration": self.duration,
             "created_at": self.created_at,
             "completed_at": self.completed_at,
         }
@@ -83,7 +128,12 @@ class TranscriptionResponse:
         self.task_ids: Optional[list[str]] = data.task_ids
         self.language: str = data.language
         self.priority: Priority = data.priority
+        self.model: Model = data.model
+        self.speed: Speed = data.speed
+        self.decoding: Optional[dict] = data.decoding
+        self.draft: bool = data.draft
         self.status: Status = data.status
+        self.progress: Optional[float] = data.progress
         self.created_at: str = data.created_at.isoformat()
         self.completed_at: Optional[str] = (
             data.completed_at.isoformat() if data.completed_at else None
@@ -95,7 +145,12 @@ class TranscriptionResponse:
             "task_ids": self.task_ids,
             "language": self.language,
             "priority": self.priority,
+            "model": self.model,
+            "speed": self.speed,
+            "decoding": self.decoding,
+            "draft": self.draft,
             "status": self.status,
+            "progress": self.progress,
             "created_at": self.created_at,
             "completed_at": self.completed_at,
         }
@@ -116,7 +171,12 @@ class DataResponse:
             "task_ids": self.transcription["task_ids"],
             "language": self.transcription["language"],
             "priority": self.transcription["priority"],
+            "model": self.transcription["model"],
+            "speed": self.transcription["speed"],
+            "decoding": self.transcription["decoding"],
+            "draft": self.transcription["draft"],
             "status": self.transcription["status"],
+            "progress": self.transcription["progress"],
             "created_at": self.transcription["created_at"],
             "completed_at": self.transcription["completed_at"],
         }
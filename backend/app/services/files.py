@@ -3,20 +3,35 @@
 
 
 import asyncio
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Coroutine
 
 import aiofiles
-from fastapi import File, HTTPException, UploadFile, status
+from fastapi import File, HTTPException, Request, UploadFile, status
+from loguru import logger
 from sqlalchemy.orm import Session
 
-from app.background_tasks.optimization import (
-    change_audio_sample_rate,
-    convert_video_to_audio,
+from app.background_tasks.optimization import optimize_media, split_audio_into_parts
+from app.config import settings
+from app.models import FileChunksModel, FilesModel, TranscriptionsModel
+from app.schemas import (
+    ConversionBackgroundJobPayloadSchema,
+    FileResponse,
+    ResumableUploadSchema,
 )
-from app.models import FilesModel, TranscriptionsModel
-from app.schemas import ConversionBackgroundJobPayloadSchema, FileResponse
+from app.services.sse.notifications import NotificationsService
+from app.utils.ffmpeg_manager import StreamDecoder
 from app.utils.file_manager import file_manager
-from app.utils.responses import OK, Accepted
-from app.utils.shared import Sort, Type
+from app.utils.responses import OK, Accepted, Created
+from app.utils.shared import Channels, NotificationType, Sort, Status, Task, Type
+from app.utils.upload_manager import (
+    UploadChecksum,
+    UploadEvent,
+    UploadManager,
+    UploadMetrics,
+)
 
 
 class FileService:
@@ -28,29 +43,380 @@ class FileService:
         """
 
         self.session: Session = session
-        self.upload_data_chunks_queue: asyncio.Queue = asyncio.Queue()
+        self.upload_chunk_size: int = settings.upload_chunk_size
+        self.upload_data_chunks_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=settings.upload_queue_size
+        )
+        self.upload_metrics: UploadMetrics = UploadMetrics()
+        self.upload_hash = hashlib.sha256()
+        self.upload_decoder: StreamDecoder | None = None
 
     async def _async_file_reader(self, file: UploadFile = File(...)):
         while True:
-            chunk = await file.read(1024 * 1024 * 100)
+            chunk = await file.read(self.upload_chunk_size)
             if not chunk:
                 break
             await self.upload_data_chunks_queue.put(chunk)
 
-    async def _async_file_writer(self, file_path: str):
-        async with aiofiles.open(file_path, "wb") as f:
+    async def _async_stream_reader(
+        self,
+        events: AsyncGenerator[tuple[UploadEvent, object], None],
+        fields: dict[str, str],
+    ):
+        buffer: bytearray = bytearray()
+
+        async for event, value in events:
+            if event == UploadEvent.FILE_DATA:
+                buffer += value
+                if len(buffer) >= self.upload_chunk_size:
+                    await self.upload_data_chunks_queue.put(bytes(buffer))
+                    buffer.clear()
+
+            elif event == UploadEvent.FILE_END and buffer:
+                await self.upload_data_chunks_queue.put(bytes(buffer))
+                buffer.clear()
+
+            elif event == UploadEvent.FIELD:
+                fields[value[0]] = value[1]
+
+            elif event == UploadEvent.FILE_BEGIN:
+                raise Exception(
+                    {
+                        "status_code": status.HTTP_400_BAD_REQUEST,
+                        "detail": "Error: Only a single file can be uploaded",
+                    }
+                )
+
+    async def _async_request_reader(
+        self, request: Request, checksum: UploadChecksum | None, limit: int
+    ):
+        received: int = 0
+
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+
+            received += len(chunk)
+            if received > limit:
+                raise Exception(
+                    {
+                        "status_code": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        "detail": "Error: Chunk exceeds the upload size",
+                    }
+                )
+
+            if checksum is not None:
+                checksum.update(chunk)
+
+            await self.upload_data_chunks_queue.put(chunk)
+
+    async def _async_file_writer(self, file_path: str, offset: int | None = None):
+        async with aiofiles.open(file_path, "wb" if offset is None else "r+b") as f:
+            if offset is not None:
+                await f.seek(offset)
+
             while True:
                 chunk = await self.upload_data_chunks_queue.get()
                 if not chunk:
                     break
-                await f.write(chunk)
+                if self.upload_decoder is not None:
+                    # Tee the chunk into ffmpeg while it is written to disk
+                    await asyncio.gather(
+                        f.write(chunk), self.upload_decoder.write(chunk)
+                    )
+                else:
+                    await f.write(chunk)
+
+                self.upload_metrics.update(len(chunk))
+
+                # Offset writes are partial, their hash is computed on finalize
+                if offset is None:
+                    self.upload_hash.update(chunk)
+
+    async def _async_pipe(
+        self, reader: Coroutine, file_path: str, offset: int | None = None
+    ) -> None:
+        """
+        Run a reader against the file writer through the bounded queue, a full
+        queue suspends the reader until the writer catches up
+        :param -> reader: Coroutine, file_path: str, offset: int | None
+        :return -> None
+        """
+
+        reader_task: asyncio.Task = asyncio.create_task(reader)
+        writer_task: asyncio.Task = asyncio.create_task(
+            self._async_file_writer(file_path, offset)
+        )
+        sentinel_task: asyncio.Task | None = None
+
+        try:
+            done, _ = await asyncio.wait(
+                {reader_task, writer_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            # The writer only stops early on failure, which also stops the reader
+            if writer_task in done:
+                writer_task.result()
+
+            # A failed reader still lets the writer flush what was already received,
+            # the end of the data is raced against a writer failing on a full queue
+            sentinel_task = asyncio.create_task(self.upload_data_chunks_queue.put(None))
+            await asyncio.wait(
+                {sentinel_task, writer_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            await writer_task
+            reader_task.result()
+
+        finally:
+            tasks: list[asyncio.Task] = [reader_task, writer_task]
+
+            if sentinel_task is not None:
+                tasks.append(sentinel_task)
+
+            [task.cancel() for task in tasks if not task.done()]
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _async_multipart_events(
+        self, request: Request
+    ) -> AsyncGenerator[tuple[UploadEvent, object], None]:
+        upload_manager = UploadManager(
+            content_type=request.headers.get("content-type", "")
+        )
+
+        async for chunk in request.stream():
+            for event in upload_manager.feed(chunk):
+                yield event
+
+        for event in upload_manager.finalize():
+            yield event
+
+    async def _start_decoder(self, file_id: str) -> None:
+        """
+        Start decoding the upload into 16 kHz mono wav while it is still arriving
+        :param -> file_id: str
+        :return -> None
+        """
+
+        decoder: StreamDecoder = StreamDecoder(
+            output_path=file_manager.get_partial_file_path(
+                file_id=file_id, file_extension=".wav"
+            ),
+            sample_rate=16000,  # 16 kHz
+        )
+
+        if await decoder.start():
+            self.upload_decoder = decoder
+
+    async def _finish_decoder(self) -> str | None:
+        """
+        Wait for the streaming decode, returns the decoded file path if it succeeded
+        :return -> str | None
+        """
+
+        if self.upload_decoder is None:
+            return None
+
+        decoded_path: str = self.upload_decoder.output_path
+
+        if await self.upload_decoder.finish():
+            return decoded_path
+
+        if file_manager.validate_file_path(decoded_path):
+            file_manager.delete_file(decoded_path)
+
+        return None
+
+    async def _abort_decoder(self) -> None:
+        """
+        Stop the streaming decode and discard its output
+        :return -> None
+        """
+
+        if self.upload_decoder is None:
+            return
+
+        await self.upload_decoder.abort()
+
+        if file_manager.validate_file_path(self.upload_decoder.output_path):
+            file_manager.delete_file(self.upload_decoder.output_path)
+
+    def _deduplicate(
+        self, file_id: str, name: str, file_path: str, content_hash: str
+    ) -> FilesModel | None:
+        """
+        Link the upload to the optimized media, and finished transcription, of an
+        already processed file with identical content
+        :param -> file_id: str, name: str, file_path: str, content_hash: str
+        :return -> FilesModel | None
+        """
+
+        source: FilesModel | None = (
+            self.session.query(FilesModel)
+            .filter(
+                FilesModel.content_hash == content_hash,
+                FilesModel.status == Status.DONE,
+                FilesModel.id != file_id,
+            )
+            .order_by(FilesModel.created_at.asc())
+            .first()
+        )
+
+        if source is None or not file_manager.validate_file_path(source.path):
+            return None
+
+        # Replace the uploaded bytes with links to the optimized media
+        file_manager.delete_file(file_path)
+        file_manager.link_optimized_files(source_id=source.id, file_id=file_id)
+
+        completed_at = datetime.now(timezone.utc)
+        file_model: FilesModel = FilesModel(
+            id=file_id,
+            name=name,
+            type=source.type,
+            path=file_manager.get_folder_path(file_id=file_id),
+            status=Status.DONE,
+            completed_at=completed_at,
+            content_hash=content_hash,
+            source_id=source.id,
+            duration=source.duration,
+            sample_rate=source.sample_rate,
+            channels=source.channels,
+            codec=source.codec,
+            size=source.size,
+            chunks=[
+                FileChunksModel(
+                    index=chunk.index,
+                    name=chunk.name,
+                    offset=chunk.offset,
+                    duration=chunk.duration,
+                    keep_start=chunk.keep_start,
+                    keep_end=chunk.keep_end,
+                )
+                for chunk in source.chunks
+            ],
+        )
+        self.session.add(file_model)
+        self.session.flush()
+
+        transcription: TranscriptionsModel | None = source.transcription
+        if transcription is not None and transcription.status == Status.DONE:
+            file_manager.link_transcriptions(source_id=source.id, file_id=file_id)
+            self.session.add(
+                TranscriptionsModel(
+                    file_id=file_id,
+                    language=transcription.language,
+                    priority=transcription.priority,
+                    model=transcription.model,
+                    speed=transcription.speed,
+                    decoding=transcription.decoding,
+                    status=Status.DONE,
+                    completed_at=completed_at,
+                )
+            )
+
+        self.session.commit()
+        self.session.close()
+
+        NotificationsService().publish(
+            channel=Channels.NOTIFICATIONS,
+            message=json.dumps(
+                {
+                    "id": file_id,
+                    "status": Status.DONE,
+                    "type": NotificationType.SUCCESS,
+                    "task": Task.OPTIMIZATION,
+                    "message": "successfully reused optimized media of identical file",
+                    "completed_at": completed_at.isoformat(),
+                }
+            ),
+        )
+
+        return source
+
+    def _optimize(
+        self,
+        file_id: str,
+        name: str,
+        file_path: str,
+        file_extension: str,
+        content_hash: str,
+        decoded_path: str | None = None,
+    ) -> str | None:
+        """
+        Save the file details and queue the media optimization tasks, unless an
+        identical file was already processed
+        :param -> file_id: str, name: str, file_path: str, file_extension: str, content_hash: str, decoded_path: str | None
+        :return -> str | None, id of the reused file
+        """
+
+        source: FilesModel | None = self._deduplicate(
+            file_id=file_id,
+            name=name,
+            file_path=file_path,
+            content_hash=content_hash,
+        )
+
+        if source is not None:
+            if decoded_path is not None:
+                file_manager.delete_file(decoded_path)
+
+            return source.id
+
+        # Create a FilesModel instance to save the file details in the database
+        file_model: FilesModel = FilesModel(
+            id=file_id, name=name, path=file_path, content_hash=content_hash
+        )
+
+        data: dict = (
+            ConversionBackgroundJobPayloadSchema(
+                id=file_id,
+                current_path=file_path,
+                current_format=file_extension[1:],
+                sample_rate=16000,  # 16 kHz
+                output_path=file_manager.get_file_path(
+                    file_id=file_id, file_extension=".wav"
+                ),
+                output_format="wav",
+                delete_original_file=True,
+            )
+        ).model_dump()
+
+        # Update default Audio type to Video
+        if file_manager.is_video_file_extension(file_extension[1:]):
+            file_model.type = Type.VIDEO
+
+        if decoded_path is not None:
+            # The upload was decoded while it arrived, only the split is left
+            if file_path != data["output_path"]:
+                file_manager.delete_file(file_path)
+            file_manager.move_file(decoded_path, data["output_path"])
+
+            file_model.path = data["output_path"]
+            self.session.add(file_model)
+            self.session.commit()
+            self.session.refresh(file_model)
+            self.session.close()
+
+            data["current_path"] = data["output_path"]
+            data["current_format"] = data["output_format"]
+            split_audio_into_parts.delay(data=data)
+
+        else:
+            self.session.add(file_model)
+            self.session.commit()
+            self.session.refresh(file_model)
+            self.session.close()
+
+            optimize_media.delay(data=data)
+
+        return None
 
     async def upload(
-        self, name: str, file: UploadFile = File(...)
+        self, name: str, file: UploadFile = File(...), decode: bool = False
     ) -> None | HTTPException:
         """
         Upload file
-        :param -> name: str, file: UploadFile = File(...)
+        :param -> name: str, file: UploadFile = File(...), decode: bool
         :return -> Accepted | HTTPException
         """
 
@@ -71,58 +437,419 @@ class FileService:
         )
 
         try:
-            # Start file reader and writer tasks
-            async_reader_task = asyncio.create_task(self._async_file_reader(file))
-            async_writer_task = asyncio.create_task(self._async_file_writer(file_path))
-
-            # Wait for the reader task to complete and signal the writer task
-            await asyncio.gather(async_reader_task)
-            await self.upload_data_chunks_queue.put(None)
-
-            # Wait for the writer task to complete
-            await asyncio.gather(async_writer_task)
-
-            # Create a FilesModel instance to save the file details in the database
-            file_model: FilesModel = FilesModel(id=file_id, name=name, path=file_path)
-
-            data: dict = (
-                ConversionBackgroundJobPayloadSchema(
-                    id=file_id,
-                    current_path=file_path,
-                    current_format=file_extension[1:],
-                    sample_rate=16000,  # 16 kHz
-                    output_path=file_path.replace(file_extension[1:], "wav"),
-                    output_format="wav",
-                    delete_original_file=True,
-                    parts_count=2,
+            if decode:
+                await self._start_decoder(file_id=file_id)
+
+            await self._async_pipe(self._async_file_reader(file), file_path)
+
+            source_id: str | None = self._optimize(
+                file_id=file_id,
+                name=name,
+                file_path=file_path,
+                file_extension=file_extension,
+                content_hash=self.upload_hash.hexdigest(),
+                decoded_path=await self._finish_decoder(),
+            )
+
+            metrics: dict = self.upload_metrics.summary()
+            logger.info(f"Success: File {file_id} uploaded {metrics}")
+
+            return Accepted(
+                content={
+                    "file_id": file_id,
+                    "duplicate_of": source_id,
+                    "detail": "Success: File uploaded successfully",
+                    "metrics": metrics,
+                }
+            )
+
+        except Exception as e:
+            await self._abort_decoder()
+
+            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            detail = "Error: Upload service is not available"
+
+            if e.args and isinstance(e.args[0], dict):
+                status_code = e.args[0].get("status_code")
+                detail = e.args[0].get("detail")
+
+            raise HTTPException(status_code=status_code, detail=detail) from e
+
+    async def upload_stream(
+        self, request: Request, decode: bool = False
+    ) -> None | HTTPException:
+        """
+        Upload file by parsing the multipart request body directly into its final
+        path, without spooling it to a temporary file first
+        :param -> request: Request, decode: bool
+        :return -> Accepted | HTTPException
+        """
+
+        file_id: str = file_manager.get_unique_file_id()
+        fields: dict[str, str] = {}
+        file_path: str | None = None
+
+        try:
+            events = self._async_multipart_events(request)
+
+            # Collect the leading form fields until the file part begins
+            async for event, value in events:
+                if event == UploadEvent.FIELD:
+                    fields[value[0]] = value[1]
+
+                elif event == UploadEvent.FILE_BEGIN:
+                    break
+
+            else:
+                raise Exception(
+                    {
+                        "status_code": status.HTTP_400_BAD_REQUEST,
+                        "detail": "Error: File is missing",
+                    }
+                )
+
+            file_extension: str = file_manager.get_file_extension(
+                file_name=value["filename"]
+            )
+
+            if (
+                value["field"] != "file"
+                or not file_manager.validate_payload_file_type(value["content_type"])
+                or not file_extension
+            ):
+                raise Exception(
+                    {
+                        "status_code": status.HTTP_400_BAD_REQUEST,
+                        "detail": "Error: Invalid file type",
+                    }
                 )
-            ).model_dump()
 
-            if file_manager.is_audio_file_extension(file_extension[1:]):
-                self.session.add(file_model)
-                self.session.commit()
-                self.session.refresh(file_model)
-                self.session.close()
+            file_path = file_manager.generate_file_path(
+                file_name=file_id, file_extension=file_extension
+            )
 
-                change_audio_sample_rate.delay(data=data)
+            if decode:
+                await self._start_decoder(file_id=file_id)
 
-            elif file_manager.is_video_file_extension(file_extension[1:]):
-                # Update default Audio type to Video
-                file_model.type = Type.VIDEO
-                self.session.add(file_model)
-                self.session.commit()
-                self.session.refresh(file_model)
-                self.session.close()
+            await self._async_pipe(self._async_stream_reader(events, fields), file_path)
 
-                convert_video_to_audio.delay(data=data)
+            if not fields.get("name"):
+                raise Exception(
+                    {
+                        "status_code": status.HTTP_400_BAD_REQUEST,
+                        "detail": "Error: File name is missing",
+                    }
+                )
+
+            source_id: str | None = self._optimize(
+                file_id=file_id,
+                name=fields["name"],
+                file_path=file_path,
+                file_extension=file_extension,
+                content_hash=self.upload_hash.hexdigest(),
+                decoded_path=await self._finish_decoder(),
+            )
+
+            metrics: dict = self.upload_metrics.summary()
+            logger.info(f"Success: File {file_id} uploaded {metrics}")
 
             return Accepted(
                 content={
                     "file_id": file_id,
+                    "duplicate_of": source_id,
                     "detail": "Success: File uploaded successfully",
+                    "metrics": metrics,
                 }
             )
 
+        except Exception as e:
+            await self._abort_decoder()
+
+            if file_path is not None:
+                file_manager.delete_folder(
+                    folder_path=file_manager.get_folder_path(file_id=file_id)
+                )
+
+            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            detail = "Error: Upload service is not available"
+
+            if e.args and isinstance(e.args[0], dict):
+                status_code = e.args[0].get("status_code")
+                detail = e.args[0].get("detail")
+
+            raise HTTPException(status_code=status_code, detail=detail) from e
+
+    async def create_upload(
+        self, upload_details: ResumableUploadSchema
+    ) -> Created | HTTPException:
+        """
+        Create resumable upload session
+        :param -> upload_details: ResumableUploadSchema
+        :return -> Created | HTTPException
+        """
+
+        file_id: str = file_manager.get_unique_file_id()
+        file_extension: str = file_manager.get_file_extension(
+            file_name=upload_details.filename
+        )
+
+        if not file_manager.validate_payload_file_type(
+            upload_details.content_type
+        ) or not file_manager.is_valid_file_extension(file_extension[1:]):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Error: Invalid file type",
+            )
+
+        try:
+            file_manager.generate_file_path(
+                file_name=file_id, file_extension=file_extension
+            )
+
+            async with aiofiles.open(
+                file_manager.get_partial_file_path(
+                    file_id=file_id, file_extension=file_extension
+                ),
+                "wb",
+            ):
+                pass
+
+            file_manager.create_upload_lock(file_id=file_id)
+            file_manager.write_upload_state(
+                file_id=file_id,
+                state={
+                    "name": upload_details.name,
+                    "file_extension": file_extension,
+                    "size": upload_details.size,
+                    "offset": 0,
+                },
+            )
+
+            return Created(
+                content={
+                    "upload_id": file_id,
+                    "offset": 0,
+                    "size": upload_details.size,
+                    "detail": "Success: Upload session created successfully",
+                },
+                headers={
+                    "Upload-Offset": "0",
+                    "Upload-Length": str(upload_details.size),
+                },
+            )
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error: Upload service is not available",
+            ) from e
+
+    async def get_upload(self, upload_id: str) -> OK | HTTPException:
+        """
+        Get resumable upload session status
+        :param -> upload_id: str
+        :return -> OK | HTTPException
+        """
+
+        try:
+            if not file_manager.validate_file_id(upload_id):
+                raise FileNotFoundError()
+
+            state: dict = file_manager.read_upload_state(file_id=upload_id)
+
+            return OK(
+                content={
+                    "upload_id": upload_id,
+                    "offset": state["offset"],
+                    "size": state["size"],
+                    "detail": "Success: Upload session fetched successfully",
+                },
+                headers={
+                    "Upload-Offset": str(state["offset"]),
+                    "Upload-Length": str(state["size"]),
+                },
+            )
+
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Error: Upload not found",
+            ) from e
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error: Upload service is not available",
+            ) from e
+
+    async def upload_chunk(
+        self,
+        upload_id: str,
+        request: Request,
+        offset: int,
+        checksum: str | None = None,
+    ) -> OK | HTTPException:
+        """
+        Write a chunk of a resumable upload at the given offset, a chunk with a
+        checksum is applied entirely or not at all, a chunk without one keeps
+        whatever was received before the connection dropped
+        :param -> upload_id: str, request: Request, offset: int, checksum: str | None
+        :return -> OK | HTTPException
+        """
+
+        try:
+            if not file_manager.validate_file_id(upload_id):
+                raise FileNotFoundError()
+
+            with file_manager.lock_upload(file_id=upload_id):
+                state: dict = file_manager.read_upload_state(file_id=upload_id)
+
+                if offset != state["offset"]:
+                    raise Exception(
+                        {
+                            "status_code": status.HTTP_409_CONFLICT,
+                            "detail": "Error: Upload offset mismatch",
+                        }
+                    )
+
+                upload_checksum: UploadChecksum | None = (
+                    UploadChecksum(header=checksum) if checksum else None
+                )
+                partial_file_path: str = file_manager.get_partial_file_path(
+                    file_id=upload_id, file_extension=state["file_extension"]
+                )
+
+                try:
+                    await self._async_pipe(
+                        self._async_request_reader(
+                            request=request,
+                            checksum=upload_checksum,
+                            limit=state["size"] - offset,
+                        ),
+                        partial_file_path,
+                        offset=offset,
+                    )
+
+                    if upload_checksum is not None and not upload_checksum.verify():
+                        raise Exception(
+                            {
+                                "status_code": status.HTTP_400_BAD_REQUEST,
+                                "detail": "Error: Chunk checksum mismatch",
+                            }
+                        )
+
+                except Exception as e:
+                    if upload_checksum is not None:
+                        file_manager.truncate_file(partial_file_path, offset)
+                    else:
+                        state["offset"] = offset + self.upload_metrics.bytes_written
+                        file_manager.write_upload_state(file_id=upload_id, state=state)
+
+                    raise e
+
+                state["offset"] = offset + self.upload_metrics.bytes_written
+                file_manager.write_upload_state(file_id=upload_id, state=state)
+
+            return OK(
+                content={
+                    "upload_id": upload_id,
+                    "offset": state["offset"],
+                    "size": state["size"],
+                    "detail": "Success: Chunk uploaded successfully",
+                },
+                headers={
+                    "Upload-Offset": str(state["offset"]),
+                    "Upload-Length": str(state["size"]),
+                },
+            )
+
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Error: Upload not found",
+            ) from e
+
+        except BlockingIOError as e:
+            raise HTTPException(
+                status_code=status.HTTP_423_LOCKED,
+                detail="Error: Upload is already in progress",
+            ) from e
+
+        except Exception as e:
+            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            detail = "Error: Upload service is not available"
+
+            if e.args and isinstance(e.args[0], dict):
+                status_code = e.args[0].get("status_code")
+                detail = e.args[0].get("detail")
+
+            raise HTTPException(status_code=status_code, detail=detail) from e
+
+    async def finalize_upload(self, upload_id: str) -> Accepted | HTTPException:
+        """
+        Finalize resumable upload and queue the media optimization tasks
+        :param -> upload_id: str
+        :return -> Accepted | HTTPException
+        """
+
+        try:
+            if not file_manager.validate_file_id(upload_id):
+                raise FileNotFoundError()
+
+            with file_manager.lock_upload(file_id=upload_id):
+                state: dict = file_manager.read_upload_state(file_id=upload_id)
+
+                if state["offset"] != state["size"]:
+                    raise Exception(
+                        {
+                            "status_code": status.HTTP_400_BAD_REQUEST,
+                            "detail": "Error: Upload is not completed yet",
+                        }
+                    )
+
+                file_path: str = file_manager.get_file_path(
+                    file_id=upload_id, file_extension=state["file_extension"]
+                )
+                file_manager.move_file(
+                    file_manager.get_partial_file_path(
+                        file_id=upload_id, file_extension=state["file_extension"]
+                    ),
+                    file_path,
+                )
+                file_manager.delete_upload_state(file_id=upload_id)
+
+            content_hash: str = await asyncio.to_thread(
+                file_manager.get_file_hash, file_path
+            )
+
+            source_id: str | None = self._optimize(
+                file_id=upload_id,
+                name=state["name"],
+                file_path=file_path,
+                file_extension=state["file_extension"],
+                content_hash=content_hash,
+            )
+
+            return Accepted(
+                content={
+                    "file_id": upload_id,
+                    "duplicate_of": source_id,
+                    "detail": "Success: File uploaded successfully",
+                }
+            )
+
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Error: Upload not found",
+            ) from e
+
+        except BlockingIOError as e:
+            raise HTTPException(
+                status_code=status.HTTP_423_LOCKED,
+                detail="Error: Upload is already in progress",
+            ) from e
+
         except Exception as e:
             status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
             detail = "Error: Upload service is not available"
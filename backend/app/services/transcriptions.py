@@ -2,38 +2,43 @@
 # Path: backend\app\services\transcriptions.py
 
 import io
-import re
+import json
+import tempfile
 import zipfile
+from datetime import datetime, timezone
 from io import BytesIO
 from pathlib import Path
 
-import psutil
 from fastapi import HTTPException, status
 from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
 from app.background_tasks.transcription import (
-    generate_transcription,
+    schedule_transcriptions,
     terminate_transcription,
 )
-from app.config import settings
 from app.models import FilesModel, TranscriptionsModel
-from app.schemas import (
-    DataResponse,
-    TranscriptionBackgroundJobPayloadSchema,
-    TranscriptionSchema,
-)
+from app.schemas import DataResponse, TranscriptionSchema
+from app.services.sse.notifications import NotificationsService
 from app.utils.file_manager import file_manager
 from app.utils.responses import OK
-from app.utils.shared import Language, Priority, Sort, Status
+from app.utils.shared import (
+    Channels,
+    Language,
+    Model,
+    NotificationType,
+    Priority,
+    Sort,
+    Speed,
+    Status,
+    Task,
+)
+from app.utils.subtitle_manager import SubtitleManager
+from app.utils.whisper_manager import WhisperManager
 
 
 class TranscriptionService:
-    local_storage_base_path: str = settings.local_storage_base_path
-
-    image: str = "transcription-service"
-    container_base_path: str = "home/data"
-    model: str = "ggml-small.en.bin"
     arcname: str = "transcription"
 
     def __init__(
@@ -48,115 +53,6 @@ class TranscriptionService:
 
         self.session: Session = session
 
-    @classmethod
-    def _get_container_config(
-        cls,
-        file_id: str,
-    ) -> dict:
-        """
-        Generate docker container config
-        :return -> dict
-        """
-
-        bind_volume_path: str = cls.local_storage_base_path + "/" + file_id
-
-        container_config: dict = {
-            "image": cls.image,
-            "volumes": {
-                bind_volume_path: {
-                    "bind": f"/{cls.container_base_path}",
-                    "mode": "rw",
-                }
-            },
-        }
-
-        return container_config
-
-    @classmethod
-    def _get_file_path(
-        cls,
-        file_name,
-    ) -> str:
-        """
-        Generate relative file path for the audio file
-        :return -> str
-        """
-
-        return f"/{cls.container_base_path}/{file_name}.wav"
-
-    @classmethod
-    def _get_output_folder_path(
-        cls,
-        file_name: str,
-    ) -> str:
-        """
-        Generate relative output folder path for the audio file
-        :return -> str
-        """
-
-        return f"/{cls.container_base_path}/{file_name}"
-
-    @classmethod
-    def _get_model_path(cls) -> str:
-        """
-        Generate relative model path
-        :return -> str
-        """
-
-        return f"/root/models/{cls.model}"
-
-    @classmethod
-    def _get_thread_count(
-        cls,
-        priority: Priority,
-    ) -> int:
-        """
-        Generate thread count based on priority
-        :param -> priority: Priority
-        :return -> int
-        """
-
-        threads_count: int = psutil.cpu_count(logical=True)
-
-        if priority == Priority.LOW:
-            return max(threads_count // 4, 1)
-
-        elif priority == Priority.MEDIUM:
-            return max(threads_count // 2, 1)
-
-        return max(threads_count // 2 - 1, 1)
-
-    @classmethod
-    def _get_spoken_language(
-        cls,
-        langauge: Language,
-    ) -> str:
-        """
-        Generate spoken language
-        :param -> langauge: Language
-        :return -> str
-        """
-
-        return langauge.value
-
-    @classmethod
-    def _get_command(
-        cls,
-        langauge: Language,
-        priority: Priority,
-        file_name: str,
-    ) -> str:
-        """
-        Generate docker command
-        :param -> langauge: Language, priority: Priority
-        :return -> str
-        """
-
-        # TODO:- Add support for multiple languages
-        # TODO:- Add support for multiple models
-
-        return f"whisper -t {cls._get_thread_count(priority=priority)} -l {cls._get_spoken_language(langauge=langauge)} -m {cls._get_model_path()} -f {cls._get_file_path(file_name=file_name)} -osrt -of {cls._get_output_folder_path(file_name=file_name)}"
-
     @classmethod
     async def _generate_zip(
         cls,
@@ -181,6 +77,99 @@ class TranscriptionService:
         except Exception as e:
             raise e
 
+    def _get_queue_position(self, transcription: TranscriptionsModel) -> int | None:
+        """
+        Get the 1-based position of a queued transcription, in admission order
+        :param -> transcription: TranscriptionsModel
+        :return -> int | None
+        """
+
+        if transcription.status != Status.QUEUE:
+            return None
+
+        ahead: int = (
+            self.session.query(TranscriptionsModel)
+            .filter(
+                TranscriptionsModel.status == Status.QUEUE,
+                or_(
+                    TranscriptionsModel.priority > transcription.priority,
+                    and_(
+                        TranscriptionsModel.priority == transcription.priority,
+                        TranscriptionsModel.created_at < transcription.created_at,
+                    ),
+                ),
+            )
+            .count()
+        )
+
+        return ahead + 1
+
+    def _deduplicate(
+        self, file: FilesModel, language: Language, model: Model, speed: Speed
+    ) -> bool:
+        """
+        Link the finished transcription of a file with identical content
+        :param -> file: FilesModel, language: Language, model: Model, speed: Speed
+        :return -> bool
+        """
+
+        if file.content_hash is None:
+            return False
+
+        source: TranscriptionsModel | None = (
+            self.session.query(TranscriptionsModel)
+            .join(FilesModel, FilesModel.id == TranscriptionsModel.file_id)
+            .filter(
+                FilesModel.content_hash == file.content_hash,
+                FilesModel.id != file.id,
+                TranscriptionsModel.status == Status.DONE,
+                TranscriptionsModel.language == language,
+                TranscriptionsModel.model == model,
+                TranscriptionsModel.speed == speed,
+            )
+            .order_by(TranscriptionsModel.completed_at.asc())
+            .first()
+        )
+
+        if source is None:
+            return False
+
+        try:
+            file_manager.link_transcriptions(source_id=source.file_id, file_id=file.id)
+        except FileNotFoundError:
+            return False
+
+        completed_at = datetime.now(timezone.utc)
+        self.session.add(
+            TranscriptionsModel(
+                file_id=file.id,
+                language=language,
+                priority=source.priority,
+                model=model,
+                speed=source.speed,
+                decoding=source.decoding,
+                status=Status.DONE,
+                completed_at=completed_at,
+            )
+        )
+        self.session.commit()
+
+        NotificationsService().publish(
+            channel=Channels.NOTIFICATIONS,
+            message=json.dumps(
+                {
+                    "id": file.id,
+                    "status": Status.DONE,
+                    "type": NotificationType.SUCCESS,
+                    "task": Task.TRANSCRIPTION,
+                    "message": "successfully reused transcription of identical file",
+                    "completed_at": completed_at.isoformat(),
+                }
+            ),
+        )
+
+        return True
+
     async def list(
         self,
         limit: int,
@@ -243,6 +232,9 @@ class TranscriptionService:
         file_id: str = transcription_details.file_id
         language: Language = transcription_details.language
         priority: Priority = transcription_details.priority
+        model: Model = transcription_details.model
+        speed: Speed = transcription_details.speed
+        draft: bool = transcription_details.draft
 
         try:
             file: FilesModel = (
@@ -286,7 +278,7 @@ class TranscriptionService:
 
                 elif (
                     file.transcription.status == Status.PROCESSING
-                    or file.transcription.status == Status.QUEUED
+                    or file.transcription.status == Status.QUEUE
                 ):
                     raise Exception(
                         {
@@ -295,146 +287,132 @@ class TranscriptionService:
                         }
                     )
 
-            # Get the currently executing high priority tasks count
-            currently_executing_tasks: list[TranscriptionsModel] = (
-                self.session.query(TranscriptionsModel)
-                .filter(TranscriptionsModel.status == Status.PROCESSING)
-                .order_by(None)
-                .all()
-            )
-
-            high_priority_tasks_count: int = 0
-            medium_priority_tasks_count: int = 0
-            low_priority_tasks_count: int = 0
-
-            for task in currently_executing_tasks:
-                if task.priority == Priority.HIGH:
-                    high_priority_tasks_count += 1
-
-                elif task.priority == Priority.MEDIUM:
-                    medium_priority_tasks_count += 1
+            # Identical content was already transcribed, reuse its artifacts
+            if file.transcription is None and self._deduplicate(
+                file=file, language=language, model=model, speed=speed
+            ):
+                self.session.close()
 
-                elif task.priority == Priority.LOW:
-                    low_priority_tasks_count += 1
-
-            if high_priority_tasks_count == 1:
-                raise Exception(
-                    {
-                        "status_code": status.HTTP_400_BAD_REQUEST,
-                        "detail": "Error: 1 high priority tasks in process",
+                return OK(
+                    content={
+                        "task_id": None,
+                        "detail": "Success: File is already transcribed",
                     }
                 )
 
-            elif medium_priority_tasks_count == 2:
-                raise Exception(
-                    {
-                        "status_code": status.HTTP_400_BAD_REQUEST,
-                        "detail": "Error: 2 medium priority tasks in process",
-                    }
-                )
+            if len(file.chunks) == 0:
+                raise FileNotFoundError()
 
-            elif medium_priority_tasks_count == 1 and low_priority_tasks_count == 2:
-                raise Exception(
-                    {
-                        "status_code": status.HTTP_400_BAD_REQUEST,
-                        "detail": "Error: 1 medium priority task and 2 low priority tasks in process",
-                    }
+            # Wait in the queue, the scheduler admits it once threads are idle
+            transcription_model: TranscriptionsModel | None = file.transcription
+
+            if transcription_model is None:
+                transcription_model = TranscriptionsModel(
+                    file_id=file_id,
+                    language=language,
+                    priority=priority,
+                    model=model,
+                    speed=speed,
+                    draft=draft,
+                    status=Status.QUEUE,
                 )
+                self.session.add(transcription_model)
 
-            elif low_priority_tasks_count == 4:
-                raise Exception(
-                    {
-                        "status_code": status.HTTP_400_BAD_REQUEST,
-                        "detail": f"Error: 4 low priority tasks in process, {priority} priority tasks can't be executed at this time",
-                    }
-                )
+            else:
+                # Rerun of a failed transcription, its finished chunks are reused
+                # unless the language, the model or the speed changed
+                if (
+                    transcription_model.language != language
+                    or transcription_model.model != model
+                    or transcription_model.speed != speed
+                ):
+                    transcription_model.chunks = []
+
+                transcription_model.language = language
+                transcription_model.model = model
+                transcription_model.speed = speed
+                transcription_model.draft = draft
+                transcription_model.priority = priority
+                transcription_model.status = Status.QUEUE
+                transcription_model.completed_at = None
+                transcription_model.threads = None
+                transcription_model.progress = None
+                transcription_model.paused = False
+
+            self.session.commit()
+            self.session.refresh(transcription_model)
+
+            position: int = self._get_queue_position(transcription=transcription_model)
+            self.session.close()
+
+            task = schedule_transcriptions.delay()
 
-            total_tasks_count: int = (
-                high_priority_tasks_count
-                + medium_priority_tasks_count
-                + low_priority_tasks_count
+            return OK(
+                content={
+                    "task_id": task.id,
+                    "position": position,
+                    "detail": "Success: File is added to transcription queue",
+                }
             )
 
-            if priority == Priority.HIGH and total_tasks_count != 0:
-                raise Exception(
-                    {
-                        "status_code": status.HTTP_400_BAD_REQUEST,
-                        "detail": f"Error: {total_tasks_count} tasks in process, high priority tasks can't be executed at this time",
-                    }
-                )
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+            ) from e
 
-            elif priority == Priority.MEDIUM and low_priority_tasks_count > 2:
-                raise Exception(
-                    {
-                        "status_code": status.HTTP_400_BAD_REQUEST,
-                        "detail": f"Error: {low_priority_tasks_count} low priority tasks in process, medium priority tasks can't be executed at this time",
-                    }
-                )
+        except Exception as e:
+            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            detail = "Error: Transcription service is not available"
 
-            elif priority == Priority.LOW and low_priority_tasks_count > 3:
-                raise Exception(
-                    {
-                        "status_code": status.HTTP_400_BAD_REQUEST,
-                        "detail": f"Error: {low_priority_tasks_count} low priority tasks in process, low priority tasks can't be executed at this time",
-                    }
-                )
+            if e.args and isinstance(e.args[0], dict):
+                status_code = e.args[0].get("status_code")
+                detail = e.args[0].get("detail")
 
-            file_names: list[str] = file_manager.get_transcription_input_files(
-                file_id=file_id
-            )
+            raise HTTPException(status_code=status_code, detail=detail) from e
 
-            if priority == Priority.HIGH:
-                file_names = [
-                    file_name for file_name in file_names if re.search("\d", file_name)
-                ]
-            else:
-                file_names = [
-                    file_name
-                    for file_name in file_names
-                    if not re.search("\d", file_name)
-                ]
-
-            data = TranscriptionBackgroundJobPayloadSchema(
-                id=file_id,
-                container_config=self._get_container_config(file_id=file_id),
-                detach=False,
-                remove=True,
-                commands=[
-                    self._get_command(
-                        langauge=language,
-                        priority=priority,
-                        file_name=file_name,
-                    )
-                    for file_name in file_names
-                ],
-            ).model_dump()
+    async def queue(
+        self,
+        file_id: str,
+    ) -> OK | HTTPException:
+        """
+        Get transcription status and queue position
+        :param -> file_id: str
+        :return -> OK | HTTPException
+        """
 
-            transcription_model: TranscriptionsModel = TranscriptionsModel(
-                file_id=file_id, language=language, priority=priority
+        try:
+            transcription: TranscriptionsModel = (
+                self.session.query(TranscriptionsModel)
+                .filter_by(file_id=file_id)
+                .first()
             )
 
-            self.session.add(transcription_model)
-            self.session.commit()
-            self.session.refresh(transcription_model)
-            self.session.close()
+            if not transcription:
+                raise FileNotFoundError()
 
-            task = generate_transcription.delay(data=data)
+            position: int | None = self._get_queue_position(transcription=transcription)
+            self.session.close()
 
             return OK(
                 content={
-                    "task_id": task.id,
-                    "detail": "Success: File is added to transcription queue",
+                    "detail": "Success: Transcription queue position fetched successfully",
+                    "data": {
+                        "status": transcription.status,
+                        "position": position,
+                        "progress": transcription.progress,
+                    },
                 }
             )
 
         except FileNotFoundError as e:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Error: Transcription not found",
             ) from e
 
         except Exception as e:
             status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-            detail = "Error: Transcription service is not available"
+            detail = "Error: Queue service is not available"
 
             if e.args and isinstance(e.args[0], dict):
                 status_code = e.args[0].get("status_code")
@@ -442,13 +420,58 @@ class TranscriptionService:
 
             raise HTTPException(status_code=status_code, detail=detail) from e
 
+    async def _download_segments(
+        self, transcription: TranscriptionsModel
+    ) -> StreamingResponse | Exception:
+        """
+        Download the merged segments of the chunks finished so far
+        :param -> transcription: TranscriptionsModel
+        :return -> StreamingResponse | Exception
+        """
+
+        try:
+            segment_files: list[Path] = file_manager.get_published_segments(
+                file_id=transcription.file_id
+            )
+
+        except FileNotFoundError as e:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "detail": "Error: No partial transcription available yet",
+                }
+            ) from e
+
+        # Segments are already shifted to the whole audio
+        with tempfile.TemporaryDirectory() as output_directory:
+            SubtitleManager(input_files=segment_files).generate_files(
+                output_folder=output_directory, offsets=[0.0] * len(segment_files)
+            )
+
+            output_files: list[Path] = file_manager.get_generated_transcriptions(
+                output_directory
+            )
+
+            zip_stream: BytesIO = await self._generate_zip(
+                arcname=self.arcname + ".partial", files=output_files
+            )
+
+        return StreamingResponse(
+            io.BytesIO(zip_stream.getvalue()),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": f"attachment; filename={transcription.file.name}.partial.zip",
+            },
+        )
+
     async def download(
         self,
         file_id: str,
+        partial: bool = False,
     ) -> StreamingResponse | HTTPException:
         """
-        Download file
-        :param -> file_id: str
+        Download file, the finished chunks of an unfinished transcription when partial
+        :param -> file_id: str, partial: bool
         :return -> StreamingResponse | HTTPException
         """
 
@@ -462,7 +485,16 @@ class TranscriptionService:
             if not transcription:
                 raise FileNotFoundError()
 
-            if transcription.status != Status.DONE:
+            if partial and transcription.status != Status.DONE:
+                return await self._download_segments(transcription=transcription)
+
+            # The draft of a running transcription is served until the final
+            # transcription replaces it
+            draft: bool = (
+                transcription.status == Status.PROCESSING and transcription.draft
+            )
+
+            if transcription.status != Status.DONE and not draft:
                 raise Exception(
                     {
                         "status_code": status.HTTP_400_BAD_REQUEST,
@@ -474,13 +506,27 @@ class TranscriptionService:
                 file_manager.get_folder_path(file_id=file_id) + "/transcriptions"
             )
 
-            output_files: list[Path] = file_manager.get_generated_transcriptions(
-                output_directory
-            )
+            try:
+                output_files: list[Path] = file_manager.get_generated_transcriptions(
+                    output_directory
+                )
+
+            except FileNotFoundError as e:
+                if not draft:
+                    raise e
+
+                raise Exception(
+                    {
+                        "status_code": status.HTTP_400_BAD_REQUEST,
+                        "detail": "Error: Transcription is not completed yet",
+                    }
+                ) from e
+
+            suffix: str = WhisperManager.draft_suffix if draft else ""
 
             # Generate the ZIP archive asynchronously
             zip_stream: BytesIO = await self._generate_zip(
-                arcname=self.arcname, files=output_files
+                arcname=self.arcname + suffix, files=output_files
             )
 
             # Serve the ZIP archive as a downloadable file
@@ -488,7 +534,7 @@ class TranscriptionService:
                 io.BytesIO(zip_stream.getvalue()),
                 media_type="application/zip",
                 headers={
-                    "Content-Disposition": f"attachment; filename={transcription.file.name}.zip",
+                    "Content-Disposition": f"attachment; filename={transcription.file.name}{suffix}.zip",
                 },
             )
 
@@ -523,6 +569,19 @@ class TranscriptionService:
                 .first()
             )
 
+            if transcription and transcription.status == Status.QUEUE:
+                # Not admitted yet, nothing is running
+                self.session.delete(transcription)
+                self.session.commit()
+                self.session.close()
+
+                return OK(
+                    content={
+                        "task_id": None,
+                        "detail": "Success: Transcription task is cancelled",
+                    }
+                )
+
             if not transcription or transcription.status != Status.PROCESSING:
                 raise Exception(
                     {
@@ -532,7 +591,17 @@ class TranscriptionService:
                 )
 
             task = terminate_transcription.delay(
-                file_id=file_id, container_ids=transcription.task_ids
+                file_id=file_id,
+                container_ids=list(
+                    {
+                        *(transcription.task_ids or []),
+                        *(
+                            chunk.container_id
+                            for chunk in transcription.chunks
+                            if chunk.status == Status.PROCESSING and chunk.container_id
+                        ),
+                    }
+                ),
             )
 
             return OK(
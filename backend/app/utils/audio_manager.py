@@ -1,20 +1,42 @@
 # Purpose: AudioManager utility class for handling audio related tasks.
 # Path: backend\app\utils\audio_manager.py
 
+import mmap
+import struct
+
+import numpy as np
 from fastapi import status
-from pydub import AudioSegment
 
 from app.utils.file_manager import file_manager
 
 
 class AudioManager:
+    # PCM and WAVE_FORMAT_EXTENSIBLE format tags
+    pcm_format_tags: list[int] = [0x0001, 0xFFFE]
+
+    # Sub format of WAVE_FORMAT_EXTENSIBLE pcm, float and compressed data differ
+    # in its leading format code
+    pcm_sub_format: bytes = (
+        b"\x01\x00\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+    )
+
+    # Bytes copied per write when exporting parts
+    copy_block_size: int = 4 * 1024 * 1024
+
+    # Sample formats the energy analysis can read
+    sample_dtypes: dict[int, str] = {16: "<i2", 32: "<i4"}
+
+    # Split points move up to this many seconds to the quietest analysis frame
+    silence_tolerance: float = 2.0
+    analysis_frame_duration: float = 0.02
+
     def __init__(
         self,
         path: str,
         format: str,
     ) -> None | Exception:
         """
-        AudioManager Utility
+        AudioManager Utility, memory maps a pcm wav file instead of decoding it
         :param -> path: str, format: str
         :return -> None | Exception
         """
@@ -38,104 +60,315 @@ class AudioManager:
                 }
             )
 
-        self.audio = AudioSegment.from_file(
-            file=self.path,
-            format=self.format,
-        )
+        if self.format != "wav":
+            raise Exception(
+                {
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "detail": "Error: Only pcm wav audio is supported",
+                }
+            )
 
-    def change_sample_rate(
-        self,
-        sample_rate: str,
-        output_path: str,
-        output_format: str,
-        delete_original_file: bool = False,
-    ) -> None | Exception:
+        self.pcm: memoryview | None = None
+
+        with open(self.path, "rb") as f:
+            self.audio: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._parse_header()
+        except Exception as e:
+            self.close()
+            raise e
+
+    def __enter__(self) -> "AudioManager":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmap the file, the views over the pcm data must be released first
+        :return -> None
         """
-        Changes audio sample rate
-        :param -> sample_rate: str, output_path: str, output_format: str, delete_original_file: bool
+
+        if self.pcm is not None:
+            self.pcm.release()
+            self.pcm = None
+
+        self.audio.close()
+
+    def _parse_header(self) -> None | Exception:
+        """
+        Parse the RIFF chunks for the pcm format and the data range
         :return -> None | Exception
         """
 
-        if not file_manager.is_audio_file_extension(output_format):
+        if (
+            len(self.audio) < 12
+            or self.audio[0:4] != b"RIFF"
+            or self.audio[8:12] != b"WAVE"
+        ):
             raise Exception(
                 {
                     "status_code": status.HTTP_400_BAD_REQUEST,
-                    "detail": "Error: Invalid audio format",
+                    "detail": "Error: Invalid wav file",
                 }
             )
 
-        try:
-            self.audio.export(
-                out_f=output_path,
-                format=output_format,
-                parameters=[
-                    "-ac",
-                    "1",
-                    "-ar",
-                    str(sample_rate),
-                    "-acodec",
-                    "pcm_s16le",
-                ],
+        position: int = 12
+        fmt: tuple | None = None
+
+        while position + 8 <= len(self.audio):
+            chunk_id: bytes = self.audio[position : position + 4]
+            (chunk_size,) = struct.unpack_from("<I", self.audio, position + 4)
+            position += 8
+
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack_from("<HHIIHH", self.audio, position)
+
+                # Extensible wav files are only read as pcm when their sub format
+                # is pcm, the parts are labelled as plain pcm
+                if fmt[0] == self.pcm_format_tags[1] and (
+                    chunk_size < 40
+                    or self.audio[position + 24 : position + 40] != self.pcm_sub_format
+                ):
+                    fmt = None
+                    break
+
+            elif chunk_id == b"data":
+                # Streamed wav files may carry a placeholder data size
+                available: int = len(self.audio) - position
+                self.data_offset: int = position
+                self.data_size: int = (
+                    chunk_size if 0 < chunk_size <= available else available
+                )
+                break
+
+            # Chunks are padded to an even size
+            position += chunk_size + (chunk_size & 1)
+
+        else:
+            fmt = None
+
+        if fmt is None or fmt[0] not in self.pcm_format_tags:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "detail": "Error: Invalid wav file",
+                }
             )
 
-            if delete_original_file and output_path != self.path:
-                try:
-                    file_manager.delete_file(self.path)
-                except Exception as e:
-                    raise Exception(
-                        {
-                            "status_code": status.HTTP_404_NOT_FOUND,
-                            "detail": "Error: File not found",
-                        }
-                    ) from e
+        (
+            self.format_tag,
+            self.channels,
+            self.sample_rate,
+            _,
+            self.block_align,
+            self.bits_per_sample,
+        ) = fmt
 
-        except Exception as e:
-            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-            detail = "Error: Internal server error"
+        # Drop a trailing partial frame
+        self.data_size -= self.data_size % self.block_align
+        self.frames_count: int = self.data_size // self.block_align
+        self.pcm: memoryview = memoryview(self.audio)[
+            self.data_offset : self.data_offset + self.data_size
+        ]
 
-            if isinstance(e.args[0], dict):
-                status_code = e.args[0].get("status_code")
-                detail = e.args[0].get("detail")
+    def _get_header(self, data_size: int) -> bytes:
+        """
+        Generate a canonical 44 bytes pcm wav header
+        :param -> data_size: int
+        :return -> bytes
+        """
 
-            raise Exception({"status_code": status_code, "detail": detail}) from e
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",
+            36 + data_size,
+            b"WAVE",
+            b"fmt ",
+            16,
+            1,
+            self.channels,
+            self.sample_rate,
+            self.sample_rate * self.block_align,
+            self.block_align,
+            self.bits_per_sample,
+            b"data",
+            data_size,
+        )
 
-    def get_audio_split_offset(self, parts_count: int) -> float:
+    def get_duration(self) -> float:
         """
-        Get audio split offset in seconds
-        :param -> parts_count: int
+        Get audio duration in seconds from the header, without decoding
         :return -> float
         """
 
-        return round(((len(self.audio) // parts_count) / 1000), 3)
+        return self.frames_count / self.sample_rate
+
+    def is_optimized(self, sample_rate: int) -> bool:
+        """
+        Check if the audio is already mono pcm_s16le at the sample rate
+        :param -> sample_rate: int
+        :return -> bool
+        """
+
+        return (
+            self.format_tag == self.pcm_format_tags[0]
+            and self.channels == 1
+            and self.bits_per_sample == 16
+            and self.sample_rate == sample_rate
+        )
+
+    def get_media_info(self) -> dict:
+        """
+        Get duration, size and pcm stream details from the header
+        :return -> dict
+        """
+
+        return {
+            "duration": self.get_duration(),
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "codec": f"pcm_s{self.bits_per_sample}le",
+            "size": len(self.audio),
+        }
+
+    def _get_samples(self) -> np.ndarray | None:
+        """
+        Zero copy (frames, channels) view over the mapped pcm data
+        :return -> np.ndarray | None
+        """
+
+        dtype: str | None = self.sample_dtypes.get(self.bits_per_sample)
+
+        if dtype is None:
+            return None
+
+        return np.frombuffer(self.pcm, dtype=dtype).reshape(-1, self.channels)
+
+    def _get_quiet_frame(self, samples: np.ndarray, frame: int) -> int:
+        """
+        Snap a split frame to the lowest energy gap within the tolerance window,
+        scoring each analysis frame by its rms weighted by the zero crossing rate
+        :param -> samples: np.ndarray, frame: int
+        :return -> int
+        """
+
+        hop: int = max(int(self.analysis_frame_duration * self.sample_rate), 1)
+        window: int = int(self.silence_tolerance * self.sample_rate)
+
+        start: int = max(frame - window, 0)
+        count: int = (min(frame + window, self.frames_count) - start) // hop
+
+        if count < 2:
+            return frame
+
+        # Only the window pages are read from the mapped file
+        block: np.ndarray = (
+            samples[start : start + count * hop, 0]
+            .astype(np.float32)
+            .reshape(count, hop)
+        )
+
+        rms: np.ndarray = np.sqrt(np.mean(np.square(block), axis=1))
+        signs: np.ndarray = np.signbit(block)
+        zcr: np.ndarray = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        centers: np.ndarray = start + np.arange(count) * hop + hop // 2
+        score: np.ndarray = rms * (1.0 + zcr)
+
+        # Prefer the nominal split point between equally quiet frames
+        score = score / (score.max() + 1e-9) + 0.05 * np.abs(centers - frame) / window
+
+        return int(centers[int(np.argmin(score))])
+
+    def get_split_frames(self, parts_count: int, snap: bool = True) -> list[int]:
+        """
+        Get the start frame of every part, snapped to silence when possible
+        :param -> parts_count: int, snap: bool
+        :return -> list[int]
+        """
+
+        part_frames: int = self.frames_count // parts_count
+        frames: list[int] = [part * part_frames for part in range(parts_count)]
+
+        samples: np.ndarray | None = self._get_samples() if snap else None
+
+        if samples is None or part_frames == 0:
+            return frames
+
+        for part in range(1, parts_count):
+            frames[part] = self._get_quiet_frame(samples=samples, frame=frames[part])
+
+        # Keep the parts ordered and non empty
+        for part in range(1, parts_count):
+            frames[part] = min(
+                max(frames[part], frames[part - 1] + 1),
+                self.frames_count - (parts_count - part),
+            )
+
+        return frames
+
+    def export(self, output_path: str, start_frame: int, end_frame: int) -> None:
+        """
+        Export a frame range as a new wav file by copying the pcm bytes
+        :param -> output_path: str, start_frame: int, end_frame: int
+        :return -> None
+        """
+
+        start: int = start_frame * self.block_align
+        end: int = end_frame * self.block_align
+
+        with open(output_path, "wb") as f:
+            f.write(self._get_header(data_size=end - start))
+
+            for offset in range(start, end, self.copy_block_size):
+                f.write(self.pcm[offset : min(offset + self.copy_block_size, end)])
 
     def split_audio(
         self,
         parts_count: int,
         delete_original_file: bool = False,
-    ) -> None | Exception:
+        snap: bool = True,
+        overlap: float = 0.0,
+    ) -> list[dict] | Exception:
         """
-        Split audio into multiple parts
-        :param -> parts_count: int, delete_original_file: bool
-        :return -> None | Exception
+        Split audio into multiple parts, cutting in silence when snap is enabled and
+        extending every part by overlap seconds into its neighbours
+        :param -> parts_count: int, delete_original_file: bool, snap: bool, overlap: float
+        :return -> list[dict] | Exception
         """
 
         try:
-            duration = len(self.audio)
-            part_duration = duration // parts_count
             original_file_name = self.path.replace("." + self.format, "")
+            frames: list[int] = self.get_split_frames(
+                parts_count=parts_count, snap=snap
+            ) + [self.frames_count]
+            overlap_frames: int = int(overlap * self.sample_rate)
+            parts: list[dict] = []
 
             for part in range(parts_count):
-                start_duration = part * part_duration
-                end_duration = (part + 1) * part_duration
-
-                # Check if this is the last part and add any leftover duration
-                if part == parts_count - 1:
-                    end_duration = duration
+                start_frame: int = max(frames[part] - overlap_frames, 0)
+                end_frame: int = min(
+                    frames[part + 1] + overlap_frames, self.frames_count
+                )
 
                 # export audio part
-                self.audio[start_duration:end_duration].export(
-                    f"{original_file_name}{part + 1}.{self.format}",
-                    format=self.format,
+                self.export(
+                    output_path=f"{original_file_name}{part + 1}.{self.format}",
+                    start_frame=start_frame,
+                    end_frame=end_frame,
+                )
+
+                parts.append(
+                    {
+                        "name": f"{original_file_name.rsplit('/', 1)[-1]}{part + 1}",
+                        "offset": round(start_frame / self.sample_rate, 3),
+                        "duration": (end_frame - start_frame) / self.sample_rate,
+                        "keep_start": round(frames[part] / self.sample_rate, 3),
+                        "keep_end": round(frames[part + 1] / self.sample_rate, 3),
+                    }
                 )
 
             if delete_original_file:
@@ -149,11 +382,13 @@ class AudioManager:
                         }
                     ) from e
 
+            return parts
+
         except Exception as e:
             status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
             detail = "Error: Internal server error"
 
-            if isinstance(e.args[0], dict):
+            if e.args and isinstance(e.args[0], dict):
                 status_code = e.args[0].get("status_code")
                 detail = e.args[0].get("detail")
 
@@ -17,6 +17,9 @@ class CeleryClient:
     broker: str = settings.celery_broker
     worker_concurrency: str = settings.worker_concurrency
 
+    # Message priorities of the transcription queue, higher is consumed first
+    max_priority: int = 10
+
     logger.configure(
         handlers=[
             dict(sink=sys.stdout, level="INFO", colorize=True),
@@ -51,6 +54,10 @@ class CeleryClient:
                 # Tasks tracking
                 cls.client.conf.task_track_started = True
 
+                # Reserve one message per worker thread, so queued high priority
+                # tasks are not stuck behind prefetched ones
+                cls.client.conf.worker_prefetch_multiplier = 1
+
                 # Connection retry on startup
                 cls.client.conf.broker_connection_retry_on_startup = True
 
@@ -66,11 +73,23 @@ class CeleryClient:
                         exchange=Exchange("optimization_task_queue", type="direct"),
                         routing_key="optimization_task_queue",
                     ),
+                    # Queue of earlier versions, declared as it was so brokers that
+                    # already have it accept it and its messages are still consumed
                     Queue(
                         "transcription_task_queue",
                         exchange=Exchange("transcription_task_queue", type="direct"),
                         routing_key="transcription_task_queue",
                     ),
+                    # RabbitMQ rejects adding priorities to an existing queue, the
+                    # priority queue is declared under a new name
+                    Queue(
+                        "transcription_priority_task_queue",
+                        exchange=Exchange(
+                            "transcription_priority_task_queue", type="direct"
+                        ),
+                        routing_key="transcription_priority_task_queue",
+                        queue_arguments={"x-max-priority": cls.max_priority},
+                    ),
                 ]
 
                 logger.info("Success: Celery client connected")
@@ -0,0 +1,210 @@
+# Purpose: ChunkManager utility class for planning chunks and whisper threads.
+# Path: backend\app\utils\chunk_manager.py
+
+import psutil
+
+from app.config import settings
+from app.utils.node_manager import NodeManager
+from app.utils.shared import Priority
+
+
+class ChunkManager:
+    # Whisper cost model, seconds of single thread compute per second of audio,
+    # fixed startup (model load) per invocation and the parallel fraction of the
+    # work for Amdahl's law
+    real_time_factor: float = 1.5
+    startup_seconds: float = 2.0
+    parallel_fraction: float = 0.9
+
+    # Chunks shorter than one whisper window waste compute, more than
+    # max_parts_count only add seams
+    min_chunk_duration: float = 30.0
+    max_parts_count: int = 16
+
+    # Share of the node a transcription may use, by priority
+    priority_shares: dict[Priority, float] = {
+        Priority.LOW: 0.25,
+        Priority.MEDIUM: 0.5,
+        Priority.HIGH: 1.0,
+    }
+
+    @classmethod
+    def get_cores_count(cls) -> int:
+        """
+        Get logical cores count of the worker node
+        :return -> int
+        """
+
+        return psutil.cpu_count(logical=True) or 1
+
+    @classmethod
+    def get_threads_capacity(cls) -> int:
+        """
+        Get the whisper threads budget of the worker node
+        :return -> int
+        """
+
+        return settings.transcription_threads or cls.get_cores_count()
+
+    @classmethod
+    def get_cluster_capacity(cls) -> int:
+        """
+        Get the whisper threads of the live worker nodes, this node alone until
+        their watchers announce them
+        :return -> int
+        """
+
+        return sum(NodeManager.get_capacities().values()) or cls.get_threads_capacity()
+
+    @classmethod
+    def get_threads_budget(cls, priority: Priority, idle_threads: int) -> int:
+        """
+        Get the threads a transcription may use, its priority share of the node
+        capped by the idle threads
+        :param -> priority: Priority, idle_threads: int
+        :return -> int
+        """
+
+        return max(
+            min(
+                int(cls.get_threads_capacity() * cls.priority_shares[priority]),
+                idle_threads,
+            ),
+            1,
+        )
+
+    @classmethod
+    def _get_speedup(cls, threads: int) -> float:
+        """
+        Amdahl speedup of a single whisper process
+        :param -> threads: int
+        :return -> float
+        """
+
+        return 1.0 / (
+            (1.0 - cls.parallel_fraction) + cls.parallel_fraction / max(threads, 1)
+        )
+
+    @classmethod
+    def estimate(cls, durations: list[float], threads: int, cores_count: int) -> float:
+        """
+        Estimate the wall clock time of transcribing the chunks concurrently
+        :param -> durations: list[float], threads: int, cores_count: int
+        :return -> float
+        """
+
+        # Processes beyond the available cores time share them
+        oversubscription: float = max(len(durations) * threads / cores_count, 1.0)
+
+        return (
+            cls.startup_seconds
+            + max(durations) * cls.real_time_factor / cls._get_speedup(threads)
+        ) * oversubscription
+
+    @classmethod
+    def plan(
+        cls, duration: float, cores_count: int | None = None, overlap: float = 0.0
+    ) -> int:
+        """
+        Choose the parts count minimizing the estimated transcription time of the
+        audio on an idle worker node, fewer parts win ties
+        :param -> duration: float, cores_count: int | None, overlap: float
+        :return -> int
+        """
+
+        cores_count = cores_count or cls.get_threads_capacity()
+        max_parts_count: int = max(
+            min(int(duration // cls.min_chunk_duration), cls.max_parts_count), 1
+        )
+
+        return min(
+            range(1, max_parts_count + 1),
+            key=lambda parts_count: (
+                round(
+                    cls.estimate(
+                        durations=[
+                            duration / parts_count
+                            + (2 * overlap if parts_count > 1 else 0)
+                        ]
+                        * parts_count,
+                        threads=max(cores_count // parts_count, 1),
+                        cores_count=cores_count,
+                    ),
+                    1,
+                ),
+                parts_count,
+            ),
+        )
+
+    @classmethod
+    def batch(
+        cls, durations: list[float], threads: int, threads_budget: int, batch_size: int
+    ) -> list[list[int]]:
+        """
+        Group the chunks into whisper invocations of at most batch_size chunks, the
+        chunks beyond the invocations the budget runs at once share a model load
+        instead of time sharing the cores, longest first onto the lightest group
+        :param -> durations: list[float], threads: int, threads_budget: int, batch_size: int
+        :return -> list[list[int]]
+        """
+
+        batch_size = max(batch_size, 1)
+        count: int = max(
+            min(max(threads_budget // threads, 1), len(durations)),
+            -(-len(durations) // batch_size),
+        )
+        batches: list[list[int]] = [[] for _ in range(count)]
+        loads: list[float] = [0.0] * count
+
+        for index in sorted(
+            range(len(durations)), key=lambda index: durations[index], reverse=True
+        ):
+            position: int = min(
+                (
+                    position
+                    for position in range(count)
+                    if len(batches[position]) < batch_size
+                ),
+                key=lambda position: loads[position],
+            )
+            batches[position].append(index)
+            loads[position] += durations[index]
+
+        return [sorted(batch) for batch in batches if batch]
+
+    @classmethod
+    def select(cls, layouts: list[list[float]], threads_budget: int) -> tuple[int, int]:
+        """
+        Choose the chunk layout and the threads per chunk minimizing the estimated
+        transcription time within the threads budget
+        :param -> layouts: list[list[float]], threads_budget: int
+        :return -> tuple[int, int]
+        """
+
+        candidates: list[tuple[float, int, int]] = []
+
+        # Layouts with more chunks than threads would exceed the budget
+        fitting: list[int] = [
+            index
+            for index, durations in enumerate(layouts)
+            if len(durations) <= threads_budget
+        ] or list(range(len(layouts)))
+
+        for index in fitting:
+            durations: list[float] = layouts[index]
+            threads: int = max(threads_budget // len(durations), 1)
+            candidates.append(
+                (
+                    cls.estimate(
+                        durations=durations,
+                        threads=threads,
+                        cores_count=threads_budget,
+                    ),
+                    index,
+                    threads,
+                )
+            )
+
+        _, index, threads = min(candidates)
+
+        return index, threads
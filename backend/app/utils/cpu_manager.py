@@ -0,0 +1,147 @@
+# Purpose: CpuManager utility class for pinning transcription jobs to cores.
+# Path: backend\app\utils\cpu_manager.py
+
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+from app.utils.executors import executor
+from app.utils.job_manager import JobManager
+from app.utils.redis_client import redis_client
+
+
+class CpuManager:
+    # NUMA nodes of the docker host, a single node when the topology is unknown
+    node_path: str = "/sys/devices/system/node"
+    topology: dict[int, list[int]] | None = None
+
+    # Allocations on a host are serialized until the job started,
+    # the lock expiry frees the hosts of crashed tasks
+    lock_key: str = "cpuset_lock:"
+    lock_timeout: int = 60
+    host_id: str | None = None
+
+    @classmethod
+    def _parse_cpu_list(cls, cpu_list: str) -> list[int]:
+        """
+        Parse a cpu list such as 0-3,8,10-11
+        :param -> cpu_list: str
+        :return -> list[int]
+        """
+
+        cores: list[int] = []
+
+        for part in cpu_list.strip().split(","):
+            if not part:
+                continue
+
+            start, _, end = part.partition("-")
+            cores.extend(range(int(start), int(end or start) + 1))
+
+        return cores
+
+    @classmethod
+    def get_topology(cls) -> dict[int, list[int]]:
+        """
+        Get the cores of every NUMA node of the host
+        :return -> dict[int, list[int]]
+        """
+
+        if cls.topology is not None:
+            return cls.topology
+
+        topology: dict[int, list[int]] = {}
+
+        try:
+            for name in os.listdir(cls.node_path):
+                if not name.startswith("node") or not name[4:].isdigit():
+                    continue
+
+                with open(f"{cls.node_path}/{name}/cpulist") as f:
+                    cores: list[int] = cls._parse_cpu_list(f.read())
+
+                if cores:
+                    topology[int(name[4:])] = cores
+
+        except OSError:
+            topology = {}
+
+        cls.topology = topology or {0: list(range(os.cpu_count() or 1))}
+
+        return cls.topology
+
+    @classmethod
+    def _get_used_cores(cls) -> set[int]:
+        """
+        Get the cores pinned by the running transcription jobs, exited jobs
+        release their cores
+        :return -> set[int]
+        """
+
+        used: set[int] = set()
+
+        for cpuset in executor.get_used_cpusets(label=JobManager.file_label):
+            used.update(cls._parse_cpu_list(cpuset))
+
+        return used
+
+    @classmethod
+    def allocate(cls, threads: int) -> dict:
+        """
+        Choose idle cores for a job, within a single NUMA node when one has
+        enough of them, fewer cores than its threads when not enough are idle,
+        and limit it to its threads when none are idle
+        :param -> threads: int
+        :return -> dict
+        """
+
+        used: set[int] = cls._get_used_cores()
+        idle: dict[int, list[int]] = {
+            node: [core for core in cores if core not in used]
+            for node, cores in cls.get_topology().items()
+        }
+
+        # The fullest node that fits keeps the emptier ones for larger chunks
+        for node in sorted(idle, key=lambda node: (len(idle[node]), node)):
+            if len(idle[node]) >= threads:
+                return {
+                    "cpuset_cpus": ",".join(map(str, idle[node][:threads])),
+                    "cpuset_mems": str(node),
+                }
+
+        spread: list[int] = sorted(core for cores in idle.values() for core in cores)
+
+        if len(spread) > 0:
+            return {"cpuset_cpus": ",".join(map(str, spread[:threads]))}
+
+        return {"nano_cpus": threads * 10**9}
+
+    @classmethod
+    def get_threads(cls, resources: dict, threads: int) -> int:
+        """
+        Get the whisper threads of a job, one per reserved core
+        :param -> resources: dict, threads: int
+        :return -> int
+        """
+
+        if "cpuset_cpus" not in resources:
+            return threads
+
+        return len(cls._parse_cpu_list(resources["cpuset_cpus"]))
+
+    @classmethod
+    @contextmanager
+    def reserve(cls, threads: int) -> Iterator[dict]:
+        """
+        Allocate cores and hold them until the job is started in the block
+        :param -> threads: int
+        :return -> Iterator[dict]
+        """
+
+        if cls.host_id is None:
+            cls.host_id = executor.get_host_id()
+
+        with redis_client.get_sync_client().lock(
+            cls.lock_key + cls.host_id, timeout=cls.lock_timeout
+        ):
+            yield cls.allocate(threads=threads)
@@ -3,11 +3,11 @@
 import sys
 
 from loguru import logger
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
-from app.models import Base
+from app.models import Base, TranscriptionsModel
 
 
 class DBClient:
@@ -19,6 +19,30 @@ class DBClient:
     postgres_password: str = settings.postgres_password
     postgres_port: int = settings.postgres_port
 
+    # Postgres advisory lock key held while upgrading, every process upgrades on
+    # connect
+    upgrade_lock_key: int = 7302
+
+    # Columns added to the tables of earlier versions, create_all never alters an
+    # existing table
+    upgrade_statements: list[str] = [
+        "ALTER TABLE files ADD COLUMN IF NOT EXISTS content_hash VARCHAR",
+        "CREATE INDEX IF NOT EXISTS ix_files_content_hash ON files (content_hash)",
+        "ALTER TABLE files ADD COLUMN IF NOT EXISTS source_id VARCHAR",
+        "ALTER TABLE files ADD COLUMN IF NOT EXISTS duration FLOAT",
+        "ALTER TABLE files ADD COLUMN IF NOT EXISTS sample_rate INTEGER",
+        "ALTER TABLE files ADD COLUMN IF NOT EXISTS channels INTEGER",
+        "ALTER TABLE files ADD COLUMN IF NOT EXISTS codec VARCHAR",
+        "ALTER TABLE files ADD COLUMN IF NOT EXISTS size BIGINT",
+        "ALTER TABLE transcriptions ADD COLUMN IF NOT EXISTS model model NOT NULL DEFAULT 'SMALL'",
+        "ALTER TABLE transcriptions ADD COLUMN IF NOT EXISTS speed speed NOT NULL DEFAULT 'ACCURATE'",
+        "ALTER TABLE transcriptions ADD COLUMN IF NOT EXISTS draft BOOLEAN NOT NULL DEFAULT false",
+        "ALTER TABLE transcriptions ADD COLUMN IF NOT EXISTS decoding JSONB",
+        "ALTER TABLE transcriptions ADD COLUMN IF NOT EXISTS paused BOOLEAN NOT NULL DEFAULT false",
+        "ALTER TABLE transcriptions ADD COLUMN IF NOT EXISTS progress FLOAT",
+        "ALTER TABLE transcriptions ADD COLUMN IF NOT EXISTS threads INTEGER",
+    ]
+
     logger.configure(
         handlers=[
             dict(sink=sys.stdout, level="INFO", colorize=True),
@@ -65,12 +89,28 @@ class DBClient:
     def create_tables(cls) -> None | Exception:
         try:
             Base.metadata.create_all(bind=cls.engine)
+            cls.upgrade_tables()
             logger.info("Success: Database tables created successfully")
 
         except Exception as e:
             logger.critical("Error: Database tables could not be created")
             raise e
 
+    @classmethod
+    def upgrade_tables(cls) -> None | Exception:
+        with cls.engine.begin() as connection:
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"),
+                {"key": cls.upgrade_lock_key},
+            )
+
+            # Enum types of the added columns are only created with new tables
+            for column in (TranscriptionsModel.model, TranscriptionsModel.speed):
+                column.type.create(bind=connection, checkfirst=True)
+
+            for statement in cls.upgrade_statements:
+                connection.execute(text(statement))
+
     @classmethod
     def get_db_session(cls) -> Session:
         session = cls.Session()
@@ -56,6 +56,7 @@ class DockerClient:
         detach: bool,
         remove: bool,
         name: str,
+        labels: dict | None = None,
     ) -> None | Exception:
         try:
             return cls.client.containers.run(
@@ -64,6 +65,7 @@ class DockerClient:
                 remove=remove,
                 name=name,
                 command=command,
+                labels=labels or {},
             )
 
         except Exception as e:
@@ -98,5 +100,105 @@ class DockerClient:
                 }
             ) from e
 
+    @classmethod
+    def pause_container(cls, container_id: str) -> None | Exception:
+        try:
+            cls.client.containers.get(container_id=container_id).pause()
+
+        except docker.errors.NotFound as e:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "detail": "Error: Docker container could not be found",
+                }
+            ) from e
+
+        except Exception as e:
+            logger.critical("Error: Docker container could not be paused ", e)
+            raise Exception(
+                {
+                    "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "detail": "Error: Docker container could not be paused",
+                }
+            ) from e
+
+    @classmethod
+    def unpause_container(cls, container_id: str) -> None | Exception:
+        try:
+            cls.client.containers.get(container_id=container_id).unpause()
+
+        except docker.errors.NotFound as e:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "detail": "Error: Docker container could not be found",
+                }
+            ) from e
+
+        except Exception as e:
+            logger.critical("Error: Docker container could not be resumed ", e)
+            raise Exception(
+                {
+                    "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "detail": "Error: Docker container could not be resumed",
+                }
+            ) from e
+
+    @classmethod
+    def remove_container(cls, container_id: str) -> None | Exception:
+        try:
+            cls.client.containers.get(container_id=container_id).remove(force=True)
+
+        except docker.errors.NotFound as e:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "detail": "Error: Docker container could not be found",
+                }
+            ) from e
+
+        except Exception as e:
+            logger.critical("Error: Docker container could not be removed ", e)
+            raise Exception(
+                {
+                    "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "detail": "Error: Docker container could not be removed",
+                }
+            ) from e
+
+    @classmethod
+    def get_containers(cls, label: str, state: str) -> list | Exception:
+        try:
+            return cls.client.containers.list(
+                all=True, filters={"label": label, "status": state}
+            )
+
+        except Exception as e:
+            logger.critical("Error: Docker containers could not be listed ", e)
+            raise Exception(
+                {
+                    "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "detail": "Error: Docker containers could not be listed",
+                }
+            ) from e
+
+    @classmethod
+    def get_events(cls, label: str, events: list[str], since: int):
+        return cls.client.events(
+            since=since,
+            decode=True,
+            filters={"type": "container", "event": events, "label": label},
+        )
+
+    @classmethod
+    def wait_container(cls, container_id: str) -> int:
+        return cls.client.containers.get(container_id=container_id).wait()["StatusCode"]
+
+    @classmethod
+    def get_logs(cls, container_id: str):
+        return cls.client.containers.get(container_id=container_id).logs(
+            stream=True, follow=True, stdout=True, stderr=True
+        )
+
 
 docker_client = DockerClient()
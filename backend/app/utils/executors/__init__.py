@@ -0,0 +1,17 @@
+# Purpose: Executor selected for running the whisper jobs of transcription chunks.
+# Path: backend\app\utils\executors\__init__.py
+
+from app.config import settings
+from app.utils.executors.base import Executor
+
+# Docker is only imported when it runs the jobs, so the subprocess executor works
+# on hosts without it
+if settings.transcription_executor == "subprocess":
+    from app.utils.executors.subprocess_executor import SubprocessExecutor
+
+    executor: Executor = SubprocessExecutor()
+
+else:
+    from app.utils.executors.docker_executor import DockerExecutor
+
+    executor: Executor = DockerExecutor()
@@ -0,0 +1,115 @@
+# Purpose: Executor interface for running the whisper jobs of transcription chunks.
+# Path: backend\app\utils\executors\base.py
+
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+
+class Executor(ABC):
+    # Exits of the jobs are reported by the watcher process when set, otherwise
+    # the worker which started a job supervises it
+    watched: bool = True
+
+    @abstractmethod
+    def run(
+        self, config: dict, command: str, name: str, labels: dict, resources: dict
+    ) -> None | Exception:
+        """
+        Start a detached job
+        :param -> config: dict, command: str, name: str, labels: dict, resources: dict
+        :return -> None | Exception
+        """
+
+    @abstractmethod
+    def stop(self, name: str) -> None | Exception:
+        """
+        Stop a job
+        :param -> name: str
+        :return -> None | Exception
+        """
+
+    @abstractmethod
+    def pause(self, name: str) -> None | Exception:
+        """
+        Freeze a job
+        :param -> name: str
+        :return -> None | Exception
+        """
+
+    @abstractmethod
+    def resume(self, name: str) -> None | Exception:
+        """
+        Resume a frozen job
+        :param -> name: str
+        :return -> None | Exception
+        """
+
+    @abstractmethod
+    def remove(self, name: str) -> None | Exception:
+        """
+        Release the resources of an exited job
+        :param -> name: str
+        :return -> None | Exception
+        """
+
+    @abstractmethod
+    def get_output(self, name: str) -> Iterator[bytes]:
+        """
+        Stream the combined output of a job until it exits
+        :param -> name: str
+        :return -> Iterator[bytes]
+        """
+
+    @abstractmethod
+    def wait(self, name: str) -> int:
+        """
+        Wait for a job to exit
+        :param -> name: str
+        :return -> int
+        """
+
+    @abstractmethod
+    def get_used_cpusets(self, label: str) -> list[str]:
+        """
+        Get the cpusets of the running jobs carrying a label
+        :param -> label: str
+        :return -> list[str]
+        """
+
+    @abstractmethod
+    def get_host_id(self) -> str:
+        """
+        Get the id of the host the jobs run on
+        :return -> str
+        """
+
+    def get_control_id(self) -> str:
+        """
+        Get the id of the commands queue of the jobs started by this process, any
+        process of the host controls them by default
+        :return -> str
+        """
+
+        return self.get_host_id()
+
+    def get_jobs(self, label: str, state: str) -> list[tuple[str, dict, int]]:
+        """
+        Get the name, labels and exit code of the jobs carrying a label, only
+        watched executors list their jobs
+        :param -> label: str, state: str
+        :return -> list[tuple[str, dict, int]]
+        """
+
+        raise NotImplementedError
+
+    def get_events(
+        self, label: str, events: list[str], since: int
+    ) -> Iterator[tuple[str, str, dict, int]]:
+        """
+        Stream the action, name, labels and exit code of the events of the jobs
+        carrying a label, only watched executors stream their events
+        :param -> label: str, events: list[str], since: int
+        :return -> Iterator[tuple[str, str, dict, int]]
+        """
+
+        raise NotImplementedError
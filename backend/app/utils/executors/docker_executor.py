@@ -0,0 +1,70 @@
+# Purpose: Executor running the whisper jobs in detached docker containers.
+# Path: backend\app\utils\executors\docker_executor.py
+
+from typing import Iterator
+
+from app.utils.docker_client import docker_client
+from app.utils.executors.base import Executor
+
+
+class DockerExecutor(Executor):
+    # The watcher follows the docker events of the containers
+    watched: bool = True
+    host_id: str | None = None
+
+    def run(
+        self, config: dict, command: str, name: str, labels: dict, resources: dict
+    ) -> None | Exception:
+        docker_client.run_container(
+            {**config, **resources}, command, True, False, name, labels
+        )
+
+    def stop(self, name: str) -> None | Exception:
+        docker_client.stop_container(name)
+
+    def pause(self, name: str) -> None | Exception:
+        docker_client.pause_container(name)
+
+    def resume(self, name: str) -> None | Exception:
+        docker_client.unpause_container(name)
+
+    def remove(self, name: str) -> None | Exception:
+        docker_client.remove_container(name)
+
+    def get_output(self, name: str) -> Iterator[bytes]:
+        return docker_client.get_logs(name)
+
+    def wait(self, name: str) -> int:
+        return docker_client.wait_container(name)
+
+    def get_used_cpusets(self, label: str) -> list[str]:
+        return [
+            container.attrs["HostConfig"].get("CpusetCpus") or ""
+            for container in docker_client.get_containers(label=label, state="running")
+        ]
+
+    def get_host_id(self) -> str:
+        if self.host_id is None:
+            self.host_id = docker_client.get_client().info()["ID"]
+
+        return self.host_id
+
+    def get_jobs(self, label: str, state: str) -> list[tuple[str, dict, int]]:
+        return [
+            (container.name, container.labels, container.attrs["State"]["ExitCode"])
+            for container in docker_client.get_containers(label=label, state=state)
+        ]
+
+    def get_events(
+        self, label: str, events: list[str], since: int
+    ) -> Iterator[tuple[str, str, dict, int]]:
+        for event in docker_client.get_events(label=label, events=events, since=since):
+            # Containers are named after the chunk attempt they run
+            attributes: dict = event["Actor"]["Attributes"]
+
+            yield (
+                event["Action"],
+                attributes["name"],
+                attributes,
+                int(attributes.get("exitCode", 1)),
+            )
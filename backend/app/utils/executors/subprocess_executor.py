@@ -0,0 +1,285 @@
+# Purpose: Executor running the whisper jobs as local processes of the worker.
+# Path: backend\app\utils\executors\subprocess_executor.py
+
+import json
+import os
+import shlex
+import signal
+import socket
+import subprocess
+import time
+from typing import Iterator
+
+from fastapi import status
+from loguru import logger
+
+from app.config import settings
+from app.utils.executors.base import Executor
+from app.utils.file_manager import file_manager
+from app.utils.redis_client import redis_client
+from app.utils.whisper_manager import WhisperManager
+
+
+class SubprocessExecutor(Executor):
+    # The worker which started a process supervises it
+    watched: bool = False
+
+    # Whisper binary and bundled models of the host, the container paths of the
+    # commands are mapped onto the storage of the worker
+    binary: str = settings.whisper_binary
+    models_path: str = settings.whisper_models_path
+
+    # Running processes of every host, the pid, cpuset and labels by name
+    registry_key: str = "executor_processes:"
+
+    # Bytes read per output chunk
+    read_size: int = 4096
+
+    # Seconds a stopped process may take to exit before it is killed
+    stop_timeout: int = 10
+
+    def __init__(self) -> None:
+        self.processes: dict[str, subprocess.Popen] = {}
+
+    def _get_registry_key(self) -> str:
+        """
+        Get the registry key of the processes of this host
+        :return -> str
+        """
+
+        return self.registry_key + self.get_host_id()
+
+    def _get_mounts(self, config: dict) -> list[tuple[str, str]]:
+        """
+        Map the container paths of the mounts to local paths, longest first
+        :param -> config: dict
+        :return -> list[tuple[str, str]]
+        """
+
+        mounts: list[tuple[str, str]] = [
+            (WhisperManager.bundled_path, self.models_path)
+        ]
+
+        for host_path, volume in config.get("volumes", {}).items():
+            mounts.append(
+                (
+                    volume["bind"],
+                    file_manager.directory
+                    + host_path.removeprefix(settings.local_storage_base_path),
+                )
+            )
+
+        return sorted(mounts, key=lambda mount: len(mount[0]), reverse=True)
+
+    def _get_arguments(self, config: dict, command: str) -> list[str]:
+        """
+        Translate a container command into the arguments of a local process
+        :param -> config: dict, command: str
+        :return -> list[str]
+        """
+
+        mounts: list[tuple[str, str]] = self._get_mounts(config=config)
+        arguments: list[str] = []
+
+        for argument in shlex.split(command):
+            for container_path, local_path in mounts:
+                if argument == container_path or argument.startswith(
+                    container_path + "/"
+                ):
+                    argument = local_path + argument[len(container_path) :]
+                    break
+
+            arguments.append(argument)
+
+        arguments[0] = self.binary
+
+        return arguments
+
+    def _get_pid(self, name: str) -> int | Exception:
+        """
+        Get the pid of a registered process
+        :param -> name: str
+        :return -> int | Exception
+        """
+
+        entry: bytes | None = redis_client.get_sync_client().hget(
+            self._get_registry_key(), name
+        )
+
+        if entry is None:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "detail": "Error: Process could not be found",
+                }
+            )
+
+        return json.loads(entry)["pid"]
+
+    def _signal(self, name: str, signal_number: int) -> None | Exception:
+        """
+        Signal the process group of a registered process
+        :param -> name: str, signal_number: int
+        :return -> None | Exception
+        """
+
+        try:
+            # Every process leads its own group, helpers of whisper included
+            os.killpg(self._get_pid(name=name), signal_number)
+
+        except ProcessLookupError as e:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "detail": "Error: Process could not be found",
+                }
+            ) from e
+
+    def run(
+        self, config: dict, command: str, name: str, labels: dict, resources: dict
+    ) -> None | Exception:
+        # Processes are pinned to the allocated cores, and otherwise only limited
+        # by their whisper threads
+        cpuset: str = resources.get("cpuset_cpus", "")
+        cores: list[int] = [int(core) for core in cpuset.split(",") if core]
+
+        try:
+            process: subprocess.Popen = subprocess.Popen(
+                self._get_arguments(config=config, command=command),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+
+        except OSError as e:
+            logger.critical("Error: Process could not be started ", e)
+            raise Exception(
+                {
+                    "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "detail": "Error: Process could not be started",
+                }
+            ) from e
+
+        # Pinned from the worker, a preexec_fn may deadlock the fork of a threaded
+        # worker, whisper starts its compute threads after loading the model
+        if cores:
+            try:
+                os.sched_setaffinity(process.pid, cores)
+            except OSError:
+                pass
+
+        self.processes[name] = process
+        redis_client.get_sync_client().hset(
+            self._get_registry_key(),
+            name,
+            json.dumps({"pid": process.pid, "cpuset": cpuset, "labels": labels}),
+        )
+
+    def _is_running(self, name: str, pid: int) -> bool:
+        """
+        Check if a process has not exited, children of this worker are reaped
+        :param -> name: str, pid: int
+        :return -> bool
+        """
+
+        process: subprocess.Popen | None = self.processes.get(name)
+
+        if process is not None:
+            return process.poll() is None
+
+        try:
+            os.killpg(pid, 0)
+        except ProcessLookupError:
+            return False
+
+        return True
+
+    def stop(self, name: str) -> None | Exception:
+        pid: int = self._get_pid(name=name)
+
+        # A paused process only handles the termination once it is resumed
+        self._signal(name=name, signal_number=signal.SIGTERM)
+        self._signal(name=name, signal_number=signal.SIGCONT)
+
+        deadline: float = time.monotonic() + self.stop_timeout
+        while time.monotonic() < deadline:
+            if not self._is_running(name=name, pid=pid):
+                return
+
+            time.sleep(0.1)
+
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def _set_paused(self, name: str, paused: bool) -> None:
+        """
+        Record whether a registered process is frozen, its cores are idle then
+        :param -> name: str, paused: bool
+        :return -> None
+        """
+
+        client = redis_client.get_sync_client()
+        entry: bytes | None = client.hget(self._get_registry_key(), name)
+
+        if entry is None:
+            return
+
+        client.hset(
+            self._get_registry_key(),
+            name,
+            json.dumps({**json.loads(entry), "paused": paused}),
+        )
+
+    def pause(self, name: str) -> None | Exception:
+        self._signal(name=name, signal_number=signal.SIGSTOP)
+        self._set_paused(name=name, paused=True)
+
+    def resume(self, name: str) -> None | Exception:
+        self._signal(name=name, signal_number=signal.SIGCONT)
+        self._set_paused(name=name, paused=False)
+
+    def remove(self, name: str) -> None | Exception:
+        process: subprocess.Popen | None = self.processes.pop(name, None)
+
+        if process is not None:
+            process.stdout.close()
+
+        redis_client.get_sync_client().hdel(self._get_registry_key(), name)
+
+    def get_output(self, name: str) -> Iterator[bytes]:
+        process: subprocess.Popen = self.processes[name]
+
+        return iter(lambda: process.stdout.read1(self.read_size), b"")
+
+    def wait(self, name: str) -> int:
+        return self.processes[name].wait()
+
+    def get_used_cpusets(self, label: str) -> list[str]:
+        cpusets: list[str] = []
+
+        for entry in redis_client.get_sync_client().hvals(self._get_registry_key()):
+            process: dict = json.loads(entry)
+
+            # Frozen processes hand their cores to the preempting jobs
+            if label not in process["labels"] or process.get("paused"):
+                continue
+
+            # Entries of processes lost with a crashed worker are skipped
+            try:
+                os.kill(process["pid"], 0)
+            except ProcessLookupError:
+                continue
+
+            cpusets.append(process["cpuset"])
+
+        return cpusets
+
+    def get_host_id(self) -> str:
+        return socket.gethostname()
+
+    def get_control_id(self) -> str:
+        # Only the worker process which started a process can signal and reap it,
+        # other processes of the host may not share its pid namespace
+        return f"{self.get_host_id()}:{os.getpid()}"
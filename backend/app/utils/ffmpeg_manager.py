@@ -0,0 +1,275 @@
+# Purpose: FFmpegManager utility classes for handling ffmpeg processes.
+# Path: backend\app\utils\ffmpeg_manager.py
+
+import asyncio
+import json
+import subprocess
+
+from fastapi import status
+from loguru import logger
+
+
+class StreamDecoder:
+    def __init__(self, output_path: str, sample_rate: int = 16000) -> None:
+        """
+        StreamDecoder Utility, decodes media written to ffmpeg stdin into mono pcm_s16le wav
+        :param -> output_path: str, sample_rate: int
+        :return -> None
+        """
+
+        self.output_path: str = output_path
+        self.sample_rate: int = sample_rate
+        self.process: asyncio.subprocess.Process | None = None
+        self.failed: bool = False
+
+        # ffmpeg may log an error per packet of a corrupt upload, stderr is drained
+        # as it is written so a full pipe never blocks the decoder, keeping the tail
+        self.stderr_task: asyncio.Task | None = None
+        self.stderr_limit: int = 4096
+
+    async def start(self) -> bool:
+        """
+        Start the ffmpeg process
+        :return -> bool
+        """
+
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-i",
+                "pipe:0",
+                "-vn",
+                "-ac",
+                "1",
+                "-ar",
+                str(self.sample_rate),
+                "-acodec",
+                "pcm_s16le",
+                "-f",
+                "wav",
+                self.output_path,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+
+        except OSError as e:
+            logger.critical("Error: ffmpeg could not be started ", e)
+            self.failed = True
+
+            return False
+
+        self.stderr_task = asyncio.create_task(self._read_stderr())
+
+        return True
+
+    async def _read_stderr(self) -> bytes:
+        """
+        Read ffmpeg stderr until it exits
+        :return -> bytes
+        """
+
+        stderr: bytes = b""
+
+        while chunk := await self.process.stderr.read(self.stderr_limit):
+            stderr = (stderr + chunk)[-self.stderr_limit :]
+
+        return stderr
+
+    async def write(self, chunk: bytes) -> None:
+        """
+        Feed a chunk of the media to ffmpeg, a failed decoder ignores further chunks
+        :param -> chunk: bytes
+        :return -> None
+        """
+
+        if self.failed or self.process is None:
+            return
+
+        try:
+            self.process.stdin.write(chunk)
+            await self.process.stdin.drain()
+
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg exited early, e.g. the container is not streamable
+            self.failed = True
+
+    async def finish(self) -> bool:
+        """
+        Close ffmpeg stdin and wait for the decoding to complete
+        :return -> bool
+        """
+
+        if self.process is None:
+            return False
+
+        try:
+            self.process.stdin.close()
+            await self.process.stdin.wait_closed()
+        except (BrokenPipeError, ConnectionResetError):
+            self.failed = True
+
+        stderr: bytes = await self.stderr_task
+        return_code: int = await self.process.wait()
+
+        if return_code != 0:
+            logger.info(
+                f"Info: Streaming decode failed, {stderr.decode(errors='ignore').strip()}"
+            )
+            self.failed = True
+
+        return not self.failed
+
+    async def abort(self) -> None:
+        """
+        Kill the ffmpeg process
+        :return -> None
+        """
+
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+
+        if self.stderr_task is not None:
+            await self.stderr_task
+
+        self.failed = True
+
+
+class FFmpegManager:
+    @classmethod
+    def _run(cls, command: list[str]) -> str | Exception:
+        """
+        Run a ffmpeg/ffprobe command
+        :param -> command: list[str]
+        :return -> str | Exception
+        """
+
+        try:
+            result = subprocess.run(command, capture_output=True, check=True)
+            return result.stdout.decode("utf-8", errors="ignore")
+
+        except (OSError, subprocess.CalledProcessError) as e:
+            stderr: bytes = getattr(e, "stderr", None) or b""
+            logger.critical(
+                f"Error: {command[0]} failed {stderr.decode(errors='ignore').strip()}"
+            )
+            raise Exception(
+                {
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "detail": "Error: Media processing failed",
+                }
+            ) from e
+
+    @classmethod
+    def probe(cls, path: str) -> dict | Exception:
+        """
+        Probe media container and streams, reads headers only
+        :param -> path: str
+        :return -> dict | Exception
+        """
+
+        return json.loads(
+            cls._run(
+                [
+                    "ffprobe",
+                    "-v",
+                    "error",
+                    "-show_format",
+                    "-show_streams",
+                    "-of",
+                    "json",
+                    path,
+                ]
+            )
+        )
+
+    @classmethod
+    def get_duration(cls, probe: dict) -> float | None:
+        """
+        Get media duration in seconds from probe output
+        :param -> probe: dict
+        :return -> float | None
+        """
+
+        try:
+            return float(probe["format"]["duration"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @classmethod
+    def get_media_info(cls, probe: dict) -> dict:
+        """
+        Get duration, size and first audio stream details from probe output
+        :param -> probe: dict
+        :return -> dict
+        """
+
+        stream: dict = next(
+            (
+                stream
+                for stream in probe.get("streams", [])
+                if stream.get("codec_type") == "audio"
+            ),
+            {},
+        )
+
+        try:
+            size: int | None = int(probe["format"]["size"])
+        except (KeyError, TypeError, ValueError):
+            size = None
+
+        try:
+            sample_rate: int | None = int(stream["sample_rate"])
+        except (KeyError, TypeError, ValueError):
+            sample_rate = None
+
+        return {
+            "duration": cls.get_duration(probe),
+            "sample_rate": sample_rate,
+            "channels": stream.get("channels"),
+            "codec": stream.get("codec_name"),
+            "size": size,
+        }
+
+    @classmethod
+    def optimize(
+        cls,
+        input_path: str,
+        output_path: str,
+        sample_rate: int,
+    ) -> None | Exception:
+        """
+        Demux the first audio stream, downmix to mono, resample and write a
+        pcm_s16le wav, decoding the input exactly once
+        :param -> input_path: str, output_path: str, sample_rate: int
+        :return -> None | Exception
+        """
+
+        cls._run(
+            [
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-i",
+                input_path,
+                "-map",
+                "0:a:0",
+                "-vn",
+                "-ac",
+                "1",
+                "-ar",
+                str(sample_rate),
+                "-c:a",
+                "pcm_s16le",
+                "-f",
+                "wav",
+                output_path,
+            ]
+        )
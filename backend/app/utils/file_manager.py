@@ -1,8 +1,13 @@
 # Purpose: FileManager utility class for handling files related tasks.
 # Path: backend/app/utils/file_manager.py
 
+import fcntl
+import hashlib
+import json
 import os
+import re
 import shutil
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from uuid import uuid4
@@ -12,6 +17,14 @@ class FileManager:
     directory: str = "data"
     filename: str = "file"
     transcripted_files: str = "transcriptions"
+    segment_files: str = "segments"
+    file_id_regex = re.compile(
+        r"^\d{6}-\d{4}-\d{4}-[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+    )
+    upload_state_filename: str = "upload.json"
+    upload_lock_filename: str = "upload.lock"
+    manifest_filename: str = "manifest.json"
+    partial_file_extension: str = ".part"
 
     # file extensions
     audio_file_extensions: list[str] = [
@@ -190,6 +203,16 @@ class FileManager:
 
         return datetime.now().strftime("%Y%m-%d%H-%M%S-") + str(uuid4())
 
+    @classmethod
+    def validate_file_id(cls, file_id: str) -> bool:
+        """
+        Validate file id generated by get_unique_file_id
+        :param -> file_id: str
+        :return -> bool
+        """
+
+        return bool(cls.file_id_regex.match(file_id))
+
     @classmethod
     def get_file_extension(cls, file_name: str) -> str:
         """
@@ -213,26 +236,24 @@ class FileManager:
         return cls.directory + "/" + file_name + "/" + cls.filename + file_extension
 
     @classmethod
-    def get_transcription_input_files(
-        cls, file_id: str
-    ) -> list[str] | FileNotFoundError:
+    def get_generated_transcriptions(
+        cls, folder: str
+    ) -> list[Path] | FileNotFoundError:
         """
-        Get transcription input files path
-        :param -> file_id: str
+        Get generated transcriptions
+        :param -> folder: Path
         :return -> list[Path] | FileNotFoundError
         """
 
-        folder: Path = Path(cls.directory + "/" + file_id)
-
         if not cls.validate_file_path(file_path=folder):
             raise FileNotFoundError
 
-        files: list[str] = []
-        for file in folder.glob("**/*"):
-            if file.is_file() and cls.is_audio_file_extension(
+        files: list[Path] = []
+        for file in Path(folder).iterdir():
+            if file.is_file() and cls.is_transcription_file_extension(
                 file_extension=file.suffix[1:]
             ):
-                files.append(file.stem)
+                files.append(Path(file))
 
         if len(files) == 0:
             raise FileNotFoundError
@@ -240,64 +261,153 @@ class FileManager:
         return files
 
     @classmethod
-    def get_transcripted_files(cls, file_id: str) -> list[Path] | FileNotFoundError:
+    def get_file_path(cls, file_id: str, file_extension: str) -> str:
+        """
+        Get file path
+        :param -> file_name: str, file_extension: str
+        :return -> str
+        """
+
+        return cls.directory + "/" + file_id + "/" + cls.filename + file_extension
+
+    @classmethod
+    def get_partial_file_path(cls, file_id: str, file_extension: str) -> str:
+        """
+        Get partial file path of a resumable upload
+        :param -> file_id: str, file_extension: str
+        :return -> str
+        """
+
+        return (
+            cls.get_file_path(file_id=file_id, file_extension=file_extension)
+            + cls.partial_file_extension
+        )
+
+    @classmethod
+    def get_upload_state_path(cls, file_id: str) -> str:
         """
-        Get transcription files path
+        Get resumable upload state path
         :param -> file_id: str
-        :return -> list[Path] | FileNotFoundError
+        :return -> str
         """
 
-        folder: Path = Path(cls.directory + "/" + file_id)
+        return cls.directory + "/" + file_id + "/" + cls.upload_state_filename
 
-        if not cls.validate_file_path(file_path=folder):
-            raise FileNotFoundError
+    @classmethod
+    def delete_upload_state(cls, file_id: str) -> None:
+        """
+        Delete resumable upload state and lock files
+        :param -> file_id: str
+        :return -> None
+        """
 
-        files: list[Path] = []
-        for file in folder.iterdir():
-            if file.is_file() and cls.is_transcription_file_extension(
-                file_extension=file.suffix[1:]
-            ):
-                files.append(Path(file))
+        for filename in [cls.upload_state_filename, cls.upload_lock_filename]:
+            path: str = cls.directory + "/" + file_id + "/" + filename
+            if cls.validate_file_path(path):
+                os.remove(path)
 
-        if len(files) == 0:
+    @classmethod
+    def read_upload_state(cls, file_id: str) -> dict | FileNotFoundError:
+        """
+        Read resumable upload state
+        :param -> file_id: str
+        :return -> dict | FileNotFoundError
+        """
+
+        state_path: str = cls.get_upload_state_path(file_id=file_id)
+
+        if not cls.validate_file_path(file_path=state_path):
             raise FileNotFoundError
 
-        return files
+        with open(state_path, "r") as f:
+            return json.load(f)
 
     @classmethod
-    def get_generated_transcriptions(
-        cls, folder: str
-    ) -> list[Path] | FileNotFoundError:
+    def write_upload_state(cls, file_id: str, state: dict) -> None:
         """
-        Get generated transcriptions
-        :param -> folder: Path
-        :return -> list[Path] | FileNotFoundError
+        Atomically write resumable upload state
+        :param -> file_id: str, state: dict
+        :return -> None
         """
 
-        if not cls.validate_file_path(file_path=folder):
-            raise FileNotFoundError
+        state_path: str = cls.get_upload_state_path(file_id=file_id)
 
-        files: list[Path] = []
-        for file in Path(folder).iterdir():
-            if file.is_file() and cls.is_transcription_file_extension(
-                file_extension=file.suffix[1:]
-            ):
-                files.append(Path(file))
+        with open(state_path + ".tmp", "w") as f:
+            json.dump(state, f)
 
-        if len(files) == 0:
+        os.replace(state_path + ".tmp", state_path)
+
+    @classmethod
+    def get_manifest_path(cls, file_id: str) -> str:
+        """
+        Get split manifest path
+        :param -> file_id: str
+        :return -> str
+        """
+
+        return cls.directory + "/" + file_id + "/" + cls.manifest_filename
+
+    @classmethod
+    def read_manifest(cls, file_id: str) -> dict | FileNotFoundError:
+        """
+        Read split manifest
+        :param -> file_id: str
+        :return -> dict | FileNotFoundError
+        """
+
+        manifest_path: str = cls.get_manifest_path(file_id=file_id)
+
+        if not cls.validate_file_path(file_path=manifest_path):
             raise FileNotFoundError
 
-        return files
+        with open(manifest_path, "r") as f:
+            return json.load(f)
 
     @classmethod
-    def get_file_path(cls, file_id: str, file_extension: str) -> str:
+    def write_manifest(cls, file_id: str, manifest: dict) -> None:
         """
-        Get file path
-        :param -> file_name: str, file_extension: str
-        :return -> str
+        Atomically write split manifest
+        :param -> file_id: str, manifest: dict
+        :return -> None
         """
 
-        return cls.directory + "/" + file_id + "/" + cls.filename + file_extension
+        manifest_path: str = cls.get_manifest_path(file_id=file_id)
+
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    @classmethod
+    def create_upload_lock(cls, file_id: str) -> None:
+        """
+        Create the lock file of a new resumable upload
+        :param -> file_id: str
+        :return -> None
+        """
+
+        with open(cls.directory + "/" + file_id + "/" + cls.upload_lock_filename, "w"):
+            pass
+
+    @classmethod
+    @contextmanager
+    def lock_upload(cls, file_id: str):
+        """
+        Exclusively lock a resumable upload, raises BlockingIOError if already locked
+        and FileNotFoundError once it is finalized
+        :param -> file_id: str
+        :return -> None
+        """
+
+        lock_path: str = cls.directory + "/" + file_id + "/" + cls.upload_lock_filename
+
+        # Never created here, the lock of a finalized upload stays deleted
+        with open(lock_path, "rb") as f:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
 
     @classmethod
     def validate_file_path(cls, file_path) -> bool:
@@ -332,6 +442,163 @@ class FileManager:
 
         return os.remove(file_path)
 
+    @classmethod
+    def get_file_hash(cls, file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Get sha256 content hash of a file
+        :param -> file_path: str, chunk_size: int
+        :return -> str
+        """
+
+        content_hash = hashlib.sha256()
+
+        with open(file_path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                content_hash.update(chunk)
+
+        return content_hash.hexdigest()
+
+    @classmethod
+    def link_file(cls, source_path: str, destination_path: str) -> None:
+        """
+        Hard link file, falls back to a copy across devices
+        :param -> source_path: str, destination_path: str
+        :return -> None
+        """
+
+        if cls.validate_file_path(destination_path):
+            os.remove(destination_path)
+
+        try:
+            os.link(source_path, destination_path)
+        except OSError:
+            shutil.copy2(source_path, destination_path)
+
+    @classmethod
+    def link_optimized_files(
+        cls, source_id: str, file_id: str
+    ) -> None | FileNotFoundError:
+        """
+        Link optimized audio files of a source file into another file folder
+        :param -> source_id: str, file_id: str
+        :return -> None | FileNotFoundError
+        """
+
+        source_folder: Path = Path(cls.get_folder_path(file_id=source_id))
+
+        if not cls.validate_file_path(file_path=source_folder):
+            raise FileNotFoundError
+
+        destination_folder: str = cls.get_folder_path(file_id=file_id)
+        cls.make_directory(destination_folder)
+
+        for file in source_folder.iterdir():
+            if file.is_file() and (
+                cls.is_audio_file_extension(file_extension=file.suffix[1:])
+                or file.name == cls.manifest_filename
+            ):
+                cls.link_file(str(file), destination_folder + "/" + file.name)
+
+    @classmethod
+    def link_transcriptions(
+        cls, source_id: str, file_id: str
+    ) -> None | FileNotFoundError:
+        """
+        Link generated transcriptions of a source file into another file folder
+        :param -> source_id: str, file_id: str
+        :return -> None | FileNotFoundError
+        """
+
+        files: list[Path] = cls.get_generated_transcriptions(
+            cls.get_folder_path(file_id=source_id) + "/" + cls.transcripted_files
+        )
+
+        destination_folder: str = (
+            cls.get_folder_path(file_id=file_id) + "/" + cls.transcripted_files
+        )
+        cls.make_directory(destination_folder)
+
+        for file in files:
+            cls.link_file(str(file), destination_folder + "/" + file.name)
+
+    @classmethod
+    def get_segments_path(cls, file_id: str, index: int) -> str:
+        """
+        Get the path of the published segments of a transcription chunk
+        :param -> file_id: str, index: int
+        :return -> str
+        """
+
+        return (
+            cls.get_folder_path(file_id=file_id)
+            + "/"
+            + cls.segment_files
+            + f"/{index:05d}.srt"
+        )
+
+    @classmethod
+    def get_published_segments(cls, file_id: str) -> list[Path] | FileNotFoundError:
+        """
+        Get the published segments of a transcription, in chunk order
+        :param -> file_id: str
+        :return -> list[Path] | FileNotFoundError
+        """
+
+        return sorted(
+            cls.get_generated_transcriptions(
+                cls.get_folder_path(file_id=file_id) + "/" + cls.segment_files
+            )
+        )
+
+    @classmethod
+    def replace_transcriptions(
+        cls, file_id: str, source_folder: str
+    ) -> None | FileNotFoundError:
+        """
+        Replace the generated transcriptions of a file with the ones of a folder,
+        every file is swapped atomically
+        :param -> file_id: str, source_folder: str
+        :return -> None | FileNotFoundError
+        """
+
+        files: list[Path] = cls.get_generated_transcriptions(source_folder)
+
+        destination_folder: str = (
+            cls.get_folder_path(file_id=file_id) + "/" + cls.transcripted_files
+        )
+        cls.make_directory(destination_folder)
+
+        for file in files:
+            cls.move_file(str(file), destination_folder + "/" + file.name)
+
+    @classmethod
+    def move_file(
+        cls, source_path: str, destination_path: str
+    ) -> None | FileNotFoundError:
+        """
+        Atomically move file
+        :param -> source_path: str, destination_path: str
+        :return -> None | FileNotFoundError
+        """
+
+        if not cls.validate_file_path(source_path):
+            raise FileNotFoundError
+
+        return os.replace(source_path, destination_path)
+
+    @classmethod
+    def truncate_file(cls, file_path: str, size: int) -> None | FileNotFoundError:
+        """
+        Truncate file to the given size
+        :param -> file_path: str, size: int
+        :return -> None | FileNotFoundError
+        """
+
+        if not cls.validate_file_path(file_path):
+            raise FileNotFoundError
+
+        return os.truncate(file_path, size)
+
     @classmethod
     def delete_folder(cls, folder_path) -> None | FileNotFoundError:
         """
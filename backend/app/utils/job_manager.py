@@ -0,0 +1,198 @@
+# Purpose: JobManager utility class for tracking the chunks of detached transcriptions.
+# Path: backend\app\utils\job_manager.py
+
+import json
+
+from app.utils.redis_client import redis_client
+
+
+class JobManager:
+    # Labels identifying the chunk containers of a transcription
+    file_label: str = "soundscripter.file_id"
+    chunk_label: str = "soundscripter.chunk"
+
+    # A job is a hash of its payload and chunks count, with the set of completed
+    # chunks and the finalization flag next to it
+    job_key: str = "transcription_job:"
+    expiry: int = 7 * 24 * 60 * 60
+
+    # Progress events of a transcription are published at most this often
+    progress_interval: int = 2000
+
+    # Record the chunk atomically, the first failure or the last completion wins
+    # the finalization of the job, chunks of unknown jobs are ignored
+    complete_script: str = (
+        "if redis.call('exists', KEYS[1]) == 0 then return false end "
+        "redis.call('sadd', KEYS[2], ARGV[1]) "
+        "redis.call('expire', KEYS[2], ARGV[3]) "
+        "if ARGV[2] == '0' or redis.call('scard', KEYS[2]) >= "
+        "tonumber(redis.call('hget', KEYS[1], 'chunks')) then "
+        "if redis.call('set', KEYS[3], '1', 'NX', 'EX', ARGV[3]) then "
+        "return redis.call('hget', KEYS[1], 'payload') end end "
+        "return false"
+    )
+
+    @classmethod
+    def _get_keys(cls, file_id: str) -> list[str]:
+        """
+        Get the job, completed chunks and finalization keys of a transcription
+        :param -> file_id: str
+        :return -> list[str]
+        """
+
+        key: str = cls.job_key + str(file_id)
+
+        return [key, key + ":chunks", key + ":finalized"]
+
+    @classmethod
+    def _get_progress_keys(cls, file_id: str) -> list[str]:
+        """
+        Get the chunks progress and the progress throttle keys of a transcription
+        :param -> file_id: str
+        :return -> list[str]
+        """
+
+        key: str = cls.job_key + str(file_id)
+
+        return [key + ":progress", key + ":throttle"]
+
+    @classmethod
+    def get_labels(cls, file_id: str, indices: list[int]) -> dict:
+        """
+        Get the container labels of the chunks of a transcription job
+        :param -> file_id: str, indices: list[int]
+        :return -> dict
+        """
+
+        return {
+            cls.file_label: str(file_id),
+            cls.chunk_label: ",".join(map(str, indices)),
+        }
+
+    @classmethod
+    def get_indices(cls, labels: dict) -> list[int]:
+        """
+        Get the chunks of a transcription job from its container labels
+        :param -> labels: dict
+        :return -> list[int]
+        """
+
+        return [int(index) for index in labels[cls.chunk_label].split(",")]
+
+    @classmethod
+    def start(cls, data: dict) -> None:
+        """
+        Track a transcription before its chunks are launched
+        :param -> data: dict
+        :return -> None
+        """
+
+        keys: list[str] = cls._get_keys(file_id=data["id"])
+
+        pipeline = redis_client.get_sync_client().pipeline()
+        pipeline.delete(*keys, *cls._get_progress_keys(file_id=data["id"]))
+        pipeline.hset(
+            keys[0],
+            mapping={
+                "payload": json.dumps(data, default=str),
+                "chunks": len(data["commands"]),
+                # Chunks weigh by the audio they own in the merged transcript
+                "weights": json.dumps([end - start for start, end in data["windows"]]),
+            },
+        )
+        pipeline.expire(keys[0], cls.expiry)
+        pipeline.execute()
+
+    @classmethod
+    def get(cls, file_id: str) -> dict | None:
+        """
+        Get the payload of a tracked transcription
+        :param -> file_id: str
+        :return -> dict | None
+        """
+
+        payload: bytes | None = redis_client.get_sync_client().hget(
+            cls._get_keys(file_id=file_id)[0], "payload"
+        )
+
+        return json.loads(payload) if payload else None
+
+    @classmethod
+    def complete(cls, file_id: str, index: int, success: bool) -> dict | None:
+        """
+        Record an exited chunk, returns the job payload when it has to be finalized
+        :param -> file_id: str, index: int, success: bool
+        :return -> dict | None
+        """
+
+        payload: bytes | None = redis_client.get_sync_client().eval(
+            cls.complete_script,
+            3,
+            *cls._get_keys(file_id=file_id),
+            index,
+            int(success),
+            cls.expiry,
+        )
+
+        return json.loads(payload) if payload else None
+
+    @classmethod
+    def is_tracked(cls, file_id: str) -> bool:
+        """
+        Check if a transcription is still waiting for its chunks
+        :param -> file_id: str
+        :return -> bool
+        """
+
+        keys: list[str] = cls._get_keys(file_id=file_id)
+
+        return bool(
+            redis_client.get_sync_client().exists(keys[0])
+            and not redis_client.get_sync_client().exists(keys[2])
+        )
+
+    @classmethod
+    def set_progress(cls, file_id: str, index: int, fraction: float) -> float | None:
+        """
+        Record the completed fraction of a chunk, returns the transcription progress
+        percentage unless a progress event was published within the interval
+        :param -> file_id: str, index: int, fraction: float
+        :return -> float | None
+        """
+
+        key: str = cls._get_keys(file_id=file_id)[0]
+        progress_key, throttle_key = cls._get_progress_keys(file_id=file_id)
+
+        pipeline = redis_client.get_sync_client().pipeline()
+        pipeline.hget(key, "weights")
+        pipeline.hset(progress_key, str(index), fraction)
+        pipeline.expire(progress_key, cls.expiry)
+        pipeline.hgetall(progress_key)
+        weights, _, _, fractions = pipeline.execute()
+
+        if weights is None:
+            return None
+
+        if not redis_client.get_sync_client().set(
+            throttle_key, 1, nx=True, px=cls.progress_interval
+        ):
+            return None
+
+        weights = json.loads(weights)
+        done: float = sum(
+            weights[int(chunk)] * float(value) for chunk, value in fractions.items()
+        )
+
+        return round(100 * done / (sum(weights) or 1), 1)
+
+    @classmethod
+    def clear(cls, file_id: str) -> None:
+        """
+        Stop tracking a transcription, late chunks are ignored afterwards
+        :param -> file_id: str
+        :return -> None
+        """
+
+        redis_client.get_sync_client().delete(
+            *cls._get_keys(file_id=file_id), *cls._get_progress_keys(file_id=file_id)
+        )
@@ -0,0 +1,150 @@
+# Purpose: ModelManager utility class for the on-disk whisper model registry.
+# Path: backend\app\utils\model_manager.py
+
+import os
+import shutil
+import tempfile
+import urllib.request
+
+from fastapi import status
+from loguru import logger
+
+from app.config import settings
+from app.utils.file_manager import file_manager
+from app.utils.redis_client import redis_client
+from app.utils.shared import Model
+
+
+class ModelManager:
+    # Registry folder in the storage, mounted read only into the containers
+    folder_name: str = "models"
+    directory: str = file_manager.directory + "/" + folder_name
+    max_size: int = settings.model_registry_size
+    base_url: str = settings.model_registry_url
+
+    # Downloads and evictions of the shared registry are serialized
+    lock_key: str = "model_registry_lock"
+    lock_timeout: int = 30 * 60
+
+    # Bytes copied per read when downloading a model, and seconds a stalled
+    # connection or read may block
+    chunk_size: int = 4 * 1024 * 1024
+    download_timeout: int = 60
+
+    @classmethod
+    def get_file_name(cls, model: Model) -> str:
+        """
+        Get the ggml file name of a model
+        :param -> model: Model
+        :return -> str
+        """
+
+        return f"ggml-{Model(model).value}.bin"
+
+    @classmethod
+    def get_size(cls) -> int:
+        """
+        Get the size of the registry in bytes
+        :return -> int
+        """
+
+        if not os.path.isdir(cls.directory):
+            return 0
+
+        return sum(entry.stat().st_size for entry in os.scandir(cls.directory))
+
+    @classmethod
+    def _download(cls, model: Model, path: str) -> None | Exception:
+        """
+        Download a model into the registry, atomically
+        :param -> model: Model, path: str
+        :return -> None | Exception
+        """
+
+        # A download outliving the lock never shares its file with the next one
+        partial_file = tempfile.NamedTemporaryFile(
+            dir=cls.directory,
+            prefix=cls.get_file_name(model=model),
+            suffix=file_manager.partial_file_extension,
+            delete=False,
+        )
+
+        try:
+            with urllib.request.urlopen(
+                f"{cls.base_url}/{cls.get_file_name(model=model)}",
+                timeout=cls.download_timeout,
+            ) as response, partial_file as f:
+                shutil.copyfileobj(response, f, cls.chunk_size)
+
+            os.replace(partial_file.name, path)
+
+        except OSError as e:
+            partial_file.close()
+
+            if os.path.exists(partial_file.name):
+                os.remove(partial_file.name)
+
+            logger.critical(
+                f"Error: Model {Model(model).value} could not be downloaded"
+            )
+            raise Exception(
+                {
+                    "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "detail": "Error: Model could not be downloaded",
+                }
+            ) from e
+
+    @classmethod
+    def evict(cls, in_use: set[Model]) -> None:
+        """
+        Delete the least recently used models until the registry fits its size
+        limit, models in use are kept
+        :param -> in_use: set[Model]
+        :return -> None
+        """
+
+        entries: list[os.DirEntry] = sorted(
+            (
+                entry
+                for entry in os.scandir(cls.directory)
+                if entry.name.endswith(".bin")
+            ),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        kept: set[str] = {cls.get_file_name(model=model) for model in in_use}
+        size: int = cls.get_size()
+
+        for entry in entries:
+            if size <= cls.max_size:
+                break
+
+            if entry.name in kept:
+                continue
+
+            size -= entry.stat().st_size
+            os.remove(entry.path)
+            logger.info(f"Info: Model {entry.name} evicted from the registry")
+
+    @classmethod
+    def ensure(cls, model: Model, in_use: set[Model]) -> None | Exception:
+        """
+        Make a model available in the registry and mark it as recently used
+        :param -> model: Model, in_use: set[Model]
+        :return -> None | Exception
+        """
+
+        path: str = f"{cls.directory}/{cls.get_file_name(model=model)}"
+
+        if os.path.exists(path):
+            os.utime(path)
+            return
+
+        file_manager.make_directory(cls.directory)
+
+        with redis_client.get_sync_client().lock(
+            cls.lock_key, timeout=cls.lock_timeout
+        ):
+            if not os.path.exists(path):
+                cls._download(model=model, path=path)
+
+            cls.evict(in_use={*in_use, model})
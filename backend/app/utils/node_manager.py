@@ -0,0 +1,97 @@
+# Purpose: NodeManager utility class for the worker nodes running transcription jobs.
+# Path: backend\app\utils\node_manager.py
+
+import json
+
+from app.utils.job_manager import JobManager
+from app.utils.redis_client import redis_client
+
+
+class NodeManager:
+    # Worker nodes announce their whisper threads while their watcher runs
+    node_key: str = "transcription_node:"
+    node_expiry: int = 60
+
+    # Commands queue of every started container, its host or the worker process
+    # which started it, only they can apply the commands
+    container_key: str = "container_host:"
+    command_key: str = "container_commands:"
+
+    @classmethod
+    def register(cls, host_id: str, capacity: int) -> None:
+        """
+        Announce the whisper threads of a worker node until the expiry
+        :param -> host_id: str, capacity: int
+        :return -> None
+        """
+
+        redis_client.get_sync_client().set(
+            cls.node_key + host_id, capacity, ex=cls.node_expiry
+        )
+
+    @classmethod
+    def get_capacities(cls) -> dict[str, int]:
+        """
+        Get the whisper threads of the live worker nodes
+        :return -> dict[str, int]
+        """
+
+        client = redis_client.get_sync_client()
+        keys: list[bytes] = list(client.scan_iter(match=cls.node_key + "*"))
+
+        return {
+            key.decode().removeprefix(cls.node_key): int(capacity)
+            for key, capacity in zip(keys, client.mget(keys) if keys else [])
+            if capacity is not None
+        }
+
+    @classmethod
+    def set_host(cls, container_id: str, host_id: str) -> None:
+        """
+        Record the commands queue of a container, before it is started
+        :param -> container_id: str, host_id: str
+        :return -> None
+        """
+
+        redis_client.get_sync_client().set(
+            cls.container_key + container_id, host_id, ex=JobManager.expiry
+        )
+
+    @classmethod
+    def send(cls, container_id: str, action: str) -> bool:
+        """
+        Queue an action for a container on its host, unknown containers never
+        started
+        :param -> container_id: str, action: str
+        :return -> bool
+        """
+
+        client = redis_client.get_sync_client()
+        host_id: bytes | None = client.get(cls.container_key + container_id)
+
+        if host_id is None:
+            return False
+
+        client.rpush(
+            cls.command_key + host_id.decode(),
+            json.dumps({"container_id": container_id, "action": action}),
+        )
+
+        return True
+
+    @classmethod
+    def receive(cls, host_id: str, timeout: int) -> dict | None:
+        """
+        Wait for the next command queued for a host
+        :param -> host_id: str, timeout: int
+        :return -> dict | None
+        """
+
+        command: tuple[bytes, bytes] | None = redis_client.get_sync_client().blpop(
+            [cls.command_key + host_id], timeout=timeout
+        )
+
+        if command is None:
+            return None
+
+        return json.loads(command[1])
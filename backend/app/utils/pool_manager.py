@@ -0,0 +1,149 @@
+# Purpose: PoolManager utility class for the warm whisper server workers.
+# Path: backend\app\utils\pool_manager.py
+
+import http.client
+import itertools
+import os
+import random
+from urllib.parse import urlparse
+from uuid import uuid4
+
+from fastapi import status
+
+from app.config import settings
+from app.utils.redis_client import redis_client
+
+
+class PoolManager:
+    workers: list[str] = settings.transcription_workers
+    timeout: int = settings.transcription_worker_timeout
+
+    # A worker is busy while its lease key exists, the expiry frees the workers
+    # of crashed tasks
+    lease_key: str = "transcription_worker:"
+    release_script: str = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) end return 0"
+    )
+
+    # Bytes streamed per write when sending audio
+    chunk_size: int = 1024 * 1024
+
+    @classmethod
+    def acquire(cls) -> tuple[str, str] | None:
+        """
+        Lease an idle worker
+        :return -> tuple[str, str] | None
+        """
+
+        token: str = str(uuid4())
+
+        for url in random.sample(cls.workers, len(cls.workers)):
+            if redis_client.get_sync_client().set(
+                cls.lease_key + url, token, nx=True, ex=cls.timeout
+            ):
+                return url, token
+
+        return None
+
+    @classmethod
+    def release(cls, url: str, token: str) -> None:
+        """
+        Release a leased worker, unless the lease already expired
+        :param -> url: str, token: str
+        :return -> None
+        """
+
+        redis_client.get_sync_client().eval(
+            cls.release_script, 1, cls.lease_key + url, token
+        )
+
+    @classmethod
+    def transcribe(
+        cls,
+        url: str,
+        input_path: str,
+        output_path: str,
+        language: str,
+        decoding: dict | None = None,
+    ) -> None | Exception:
+        """
+        Stream a wav file to the worker inference endpoint and save the srt response
+        :param -> url: str, input_path: str, output_path: str, language: str, decoding: dict | None
+        :return -> None | Exception
+        """
+
+        boundary: str = uuid4().hex
+        fields: dict = {"language": language, "response_format": "srt"}
+
+        # The server takes the search parameters per request, a zero temperature
+        # increment disables the fallback
+        if decoding is not None:
+            fields.update(
+                {
+                    "beam_size": decoding["beam_size"],
+                    "best_of": decoding["best_of"],
+                    "temperature_inc": 0.2 if decoding["temperature_fallback"] else 0.0,
+                }
+            )
+
+        preamble: bytes = (
+            b"".join(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+                for name, value in fields.items()
+            )
+            + (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="file"; filename="{os.path.basename(input_path)}"\r\n'
+                "Content-Type: audio/wav\r\n\r\n"
+            ).encode()
+        )
+        epilogue: bytes = f"\r\n--{boundary}--\r\n".encode()
+
+        worker = urlparse(url)
+        connection = http.client.HTTPConnection(
+            worker.hostname, worker.port or 80, timeout=cls.timeout
+        )
+
+        try:
+            with open(input_path, "rb") as f:
+                connection.request(
+                    "POST",
+                    worker.path.rstrip("/") + "/inference",
+                    body=itertools.chain(
+                        [preamble],
+                        iter(lambda: f.read(cls.chunk_size), b""),
+                        [epilogue],
+                    ),
+                    headers={
+                        "Content-Type": f"multipart/form-data; boundary={boundary}",
+                        "Content-Length": str(
+                            len(preamble) + os.path.getsize(input_path) + len(epilogue)
+                        ),
+                    },
+                )
+                response = connection.getresponse()
+                body: bytes = response.read()
+
+        except (OSError, http.client.HTTPException) as e:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "detail": "Error: Transcription worker is not available",
+                }
+            ) from e
+
+        finally:
+            connection.close()
+
+        # The server reports inference failures as a json error body
+        if response.status != 200 or body.lstrip().startswith(b'{"error"'):
+            raise Exception(
+                {
+                    "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "detail": "Error: Transcription worker failed",
+                }
+            )
+
+        with open(output_path, "wb") as f:
+            f.write(body)
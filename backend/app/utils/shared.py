@@ -45,6 +45,29 @@ class Language(str, Enum):
     ENGLISH = "en"
 
 
+@unique
+class Model(str, Enum):
+    TINY = "tiny.en"
+    TINY_Q5 = "tiny.en-q5_1"
+    TINY_Q8 = "tiny.en-q8_0"
+    BASE = "base.en"
+    BASE_Q5 = "base.en-q5_1"
+    BASE_Q8 = "base.en-q8_0"
+    SMALL = "small.en"
+    SMALL_Q5 = "small.en-q5_1"
+    SMALL_Q8 = "small.en-q8_0"
+    MEDIUM = "medium.en"
+    MEDIUM_Q5 = "medium.en-q5_0"
+    MEDIUM_Q8 = "medium.en-q8_0"
+
+
+@unique
+class Speed(str, Enum):
+    FAST = "FAST"
+    BALANCED = "BALANCED"
+    ACCURATE = "ACCURATE"
+
+
 @unique
 class Priority(str, Enum):
     LOW = "LOW"
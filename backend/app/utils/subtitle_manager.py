@@ -1,5 +1,7 @@
 import json
 import re
+import tempfile
+from difflib import SequenceMatcher
 from pathlib import Path
 
 import pysubs2
@@ -8,6 +10,11 @@ import pysubs2
 class SubtitleManager:
     number_pattern_regex = re.compile(r"^\s*\d+\s*$", re.MULTILINE)
 
+    # Events of adjacent chunks closer than the tolerance (ms) and at least this
+    # similar are the same speech transcribed twice in an overlap
+    duplicate_tolerance: int = 1000
+    duplicate_similarity: float = 0.6
+
     def __init__(self, input_files: list[Path]) -> None:
         for input_file in input_files:
             if input_file.suffix != ".srt":
@@ -32,6 +39,91 @@ class SubtitleManager:
                         finally:
                             outfile.write(line)
 
+    def _is_duplicate(self, event: pysubs2.SSAEvent, other: pysubs2.SSAEvent) -> bool:
+        if (
+            event.start > other.end + self.duplicate_tolerance
+            or other.start > event.end + self.duplicate_tolerance
+        ):
+            return False
+
+        return (
+            SequenceMatcher(
+                None, event.plaintext.lower().strip(), other.plaintext.lower().strip()
+            ).ratio()
+            >= self.duplicate_similarity
+        )
+
+    def _merge_windows_and_save(
+        self,
+        input_files: list[Path],
+        windows: list[tuple[float, float]],
+        output_file: str,
+    ) -> None:
+        merged: list[pysubs2.SSAEvent] = []
+        sources: list[int] = []
+
+        for index, (input_file, (keep_start, keep_end)) in enumerate(
+            zip(input_files, windows, strict=True)
+        ):
+            is_last: bool = index == len(input_files) - 1
+
+            for event in pysubs2.load(str(input_file)):
+                # Keep the events centred in the range owned by the chunk
+                middle: float = (event.start + event.end) / 2000
+                if middle < keep_start or (middle >= keep_end and not is_last):
+                    continue
+
+                # Drop the copy of an event already kept from the previous chunk,
+                # keeping the more complete text
+                duplicate: int | None = None
+                for position in range(len(merged) - 1, -1, -1):
+                    if merged[position].end + self.duplicate_tolerance < event.start:
+                        break
+
+                    if sources[position] != index and self._is_duplicate(
+                        event, merged[position]
+                    ):
+                        duplicate = position
+                        break
+
+                if duplicate is None:
+                    merged.append(event)
+                    sources.append(index)
+                elif len(event.plaintext) > len(merged[duplicate].plaintext):
+                    merged[duplicate] = event
+                    sources[duplicate] = index
+
+        subs = pysubs2.SSAFile()
+        subs.events = sorted(merged, key=lambda event: event.start)
+        subs.save(output_file, format_="srt", encoding="utf-8")
+
+    def generate_segments(
+        self,
+        output_file: str,
+        offset: float,
+        window: tuple[float, float] | None = None,
+        is_last: bool = True,
+    ) -> list[dict]:
+        subs = pysubs2.load(str(self.input_files[0]))
+        subs.shift(s=offset)
+
+        # Keep the events centred in the range owned by the chunk
+        if window is not None:
+            keep_start, keep_end = window
+            subs.events = [
+                event
+                for event in subs.events
+                if keep_start <= (event.start + event.end) / 2000
+                and ((event.start + event.end) / 2000 < keep_end or is_last)
+            ]
+
+        subs.save(output_file, format_="srt", encoding="utf-8")
+
+        return [
+            {"start": event.start, "end": event.end, "text": event.plaintext}
+            for event in subs.events
+        ]
+
     def _shift_srt(
         self, input_file: str, output_file: str, offset: float, encoding: str = "utf-8"
     ) -> None | ValueError:
@@ -60,18 +152,42 @@ class SubtitleManager:
 
                 f.write(f"{start},{end},{text}")
 
-    def generate_files(self, output_folder: str, offset: float) -> None:
+    def generate_files(
+        self,
+        output_folder: str,
+        offsets: list[float],
+        windows: list[tuple[float, float]] | None = None,
+    ) -> None:
         srt_output_file: str = output_folder + "/file.srt"
         vtt_output_file: str = output_folder + "/file.vtt"
         json_output_file: str = output_folder + "/file.json"
         csv_output_file: str = output_folder + "/file.csv"
 
-        for index, input_file in enumerate(self.input_files):
-            self._shift_srt(
-                input_file=input_file, output_file=input_file, offset=index * offset
-            )
+        # The inputs are shifted into copies, a rerun or a concurrent merge of the
+        # same chunk transcripts must find them untouched
+        with tempfile.TemporaryDirectory(dir=output_folder) as shifted_folder:
+            shifted_files: list[Path] = [
+                Path(f"{shifted_folder}/{position}.srt")
+                for position in range(len(self.input_files))
+            ]
+
+            for input_file, shifted_file, offset in zip(
+                self.input_files, shifted_files, offsets, strict=True
+            ):
+                self._shift_srt(
+                    input_file=str(input_file),
+                    output_file=str(shifted_file),
+                    offset=offset,
+                )
 
-        self._merge_srt_and_save(self.input_files, srt_output_file)
+            if windows is None:
+                self._merge_srt_and_save(shifted_files, srt_output_file)
+            else:
+                self._merge_windows_and_save(
+                    input_files=shifted_files,
+                    windows=windows,
+                    output_file=srt_output_file,
+                )
         self._convert_srt(input_file=srt_output_file, output_file=vtt_output_file)
         self._convert_srt(input_file=srt_output_file, output_file=json_output_file)
         self._convert_json_to_csv(
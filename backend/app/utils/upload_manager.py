@@ -0,0 +1,237 @@
+# Purpose: UploadManager utility class for streaming multipart uploads.
+# Path: backend\app\utils\upload_manager.py
+
+import base64
+import binascii
+import hashlib
+import time
+import zlib
+from enum import Enum, unique
+
+import psutil
+from fastapi import status
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+@unique
+class UploadEvent(str, Enum):
+    FIELD = "FIELD"
+    FILE_BEGIN = "FILE_BEGIN"
+    FILE_DATA = "FILE_DATA"
+    FILE_END = "FILE_END"
+
+
+class UploadManager:
+    def __init__(self, content_type: str) -> None | Exception:
+        """
+        UploadManager Utility, incrementally parses a multipart/form-data body
+        :param -> content_type: str
+        :return -> None | Exception
+        """
+
+        media_type, params = parse_options_header(content_type)
+
+        if media_type != b"multipart/form-data" or b"boundary" not in params:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "detail": "Error: Invalid multipart payload",
+                }
+            )
+
+        self.events: list[tuple[UploadEvent, object]] = []
+
+        self._header_field: bytes = b""
+        self._header_value: bytes = b""
+        self._headers: dict[bytes, bytes] = {}
+        self._field_name: str = ""
+        self._field_value: bytearray = bytearray()
+        self._is_file: bool = False
+
+        self.parser = MultipartParser(
+            params[b"boundary"],
+            callbacks={
+                "on_part_begin": self._on_part_begin,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+            },
+        )
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._field_name = ""
+        self._field_value = bytearray()
+        self._is_file = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+
+        self._field_name = options.get(b"name", b"").decode("latin-1")
+
+        if b"filename" in options:
+            self._is_file = True
+            self.events.append(
+                (
+                    UploadEvent.FILE_BEGIN,
+                    {
+                        "field": self._field_name,
+                        "filename": options[b"filename"].decode("latin-1"),
+                        "content_type": self._headers.get(b"content-type", b"").decode(
+                            "latin-1"
+                        ),
+                    },
+                )
+            )
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._is_file:
+            # Copy the slice, the parser reuses the underlying buffer
+            self.events.append((UploadEvent.FILE_DATA, bytes(data[start:end])))
+        else:
+            self._field_value += data[start:end]
+
+    def _on_part_end(self) -> None:
+        if self._is_file:
+            self.events.append((UploadEvent.FILE_END, self._field_name))
+        else:
+            self.events.append(
+                (
+                    UploadEvent.FIELD,
+                    (self._field_name, self._field_value.decode("utf-8")),
+                )
+            )
+
+    def feed(self, chunk: bytes) -> list[tuple[UploadEvent, object]]:
+        """
+        Feed a chunk of the request body to the parser
+        :param -> chunk: bytes
+        :return -> list[tuple[UploadEvent, object]]
+        """
+
+        self.parser.write(chunk)
+
+        events, self.events = self.events, []
+        return events
+
+    def finalize(self) -> list[tuple[UploadEvent, object]]:
+        """
+        Signal the end of the request body
+        :return -> list[tuple[UploadEvent, object]]
+        """
+
+        self.parser.finalize()
+
+        events, self.events = self.events, []
+        return events
+
+
+class UploadMetrics:
+    def __init__(self) -> None:
+        """
+        UploadMetrics Utility, tracks throughput and peak resident memory of an upload
+        :return -> None
+        """
+
+        self.process = psutil.Process()
+        self.started_at: float = time.perf_counter()
+        self.bytes_written: int = 0
+        self.peak_rss: int = self.process.memory_info().rss
+
+    def update(self, size: int) -> None:
+        """
+        Record a written chunk
+        :param -> size: int
+        :return -> None
+        """
+
+        self.bytes_written += size
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+
+    def summary(self) -> dict:
+        """
+        Upload summary, peak RSS is process wide and includes concurrent uploads
+        :return -> dict
+        """
+
+        elapsed: float = max(time.perf_counter() - self.started_at, 1e-6)
+
+        return {
+            "bytes": self.bytes_written,
+            "seconds": round(elapsed, 3),
+            "throughput_mb_s": round(self.bytes_written / (1024 * 1024) / elapsed, 2),
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 2),
+        }
+
+
+class UploadChecksum:
+    algorithms: list[str] = ["crc32", "sha1", "sha256"]
+
+    def __init__(self, header: str) -> None | Exception:
+        """
+        UploadChecksum Utility, verifies an "Upload-Checksum: <algorithm> <base64 digest>" header
+        :param -> header: str
+        :return -> None | Exception
+        """
+
+        try:
+            algorithm, digest = header.strip().split(" ", 1)
+            self.algorithm: str = algorithm.lower()
+            self.expected: bytes = base64.b64decode(digest.strip(), validate=True)
+
+        except (ValueError, binascii.Error) as e:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "detail": "Error: Invalid checksum header",
+                }
+            ) from e
+
+        if self.algorithm not in self.algorithms:
+            raise Exception(
+                {
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "detail": "Error: Unsupported checksum algorithm",
+                }
+            )
+
+        self.crc: int = 0
+        self.hash = hashlib.new(self.algorithm) if self.algorithm != "crc32" else None
+
+    def update(self, chunk: bytes) -> None:
+        """
+        Update the running checksum
+        :param -> chunk: bytes
+        :return -> None
+        """
+
+        if self.hash is None:
+            self.crc = zlib.crc32(chunk, self.crc)
+        else:
+            self.hash.update(chunk)
+
+    def verify(self) -> bool:
+        """
+        Compare the running checksum with the expected digest
+        :return -> bool
+        """
+
+        digest: bytes = (
+            self.crc.to_bytes(4, "big") if self.hash is None else self.hash.digest()
+        )
+
+        return digest == self.expected
@@ -0,0 +1,276 @@
+# Purpose: WhisperManager utility class for building whisper invocations.
+# Path: backend\app\utils\whisper_manager.py
+
+import re
+from pathlib import Path
+
+from app.config import settings
+from app.utils.model_manager import ModelManager
+from app.utils.shared import Language, Model, Speed
+
+
+class WhisperManager:
+    local_storage_base_path: str = settings.local_storage_base_path
+
+    image: str = "transcription-service"
+    container_base_path: str = "home/data"
+
+    # Model bundled in the image and served by the warm workers, the others are
+    # read from the registry mount
+    model: Model = Model.SMALL
+    bundled_path: str = "/root/models"
+    registry_path: str = "/root/registry"
+
+    # Model and preset of the draft pass, transcripts are written next to the
+    # final ones with the draft suffix
+    draft_model: Model = Model.TINY
+    draft_speed: Speed = Speed.FAST
+    draft_suffix: str = ".draft"
+
+    # Decoding parameters of the speed presets, greedy decoding without
+    # temperature fallback and past context is several times cheaper than the
+    # beam search whisper.cpp runs by default
+    speed_presets: dict[Speed, dict] = {
+        Speed.FAST: {
+            "beam_size": 1,
+            "best_of": 1,
+            "temperature_fallback": False,
+            "max_context": 0,
+            "audio_ctx": 0,
+        },
+        Speed.BALANCED: {
+            "beam_size": 1,
+            "best_of": 2,
+            "temperature_fallback": True,
+            "max_context": 64,
+            "audio_ctx": 0,
+        },
+        Speed.ACCURATE: {
+            "beam_size": 5,
+            "best_of": 5,
+            "temperature_fallback": True,
+            "max_context": -1,
+            "audio_ctx": 0,
+        },
+    }
+
+    # Input announced before each file of an invocation, progress lines printed
+    # with -pp, and the end timestamp of emitted segments
+    input_pattern: re.Pattern = re.compile(r"processing '([^']+)'")
+    progress_pattern: re.Pattern = re.compile(r"progress =\s*(\d+)%")
+    segment_pattern: re.Pattern = re.compile(
+        r"^\[[\d:.]+ --> (\d+):(\d+):(\d+(?:\.\d+)?)\]"
+    )
+
+    @classmethod
+    def get_container_config(
+        cls,
+        file_id: str,
+    ) -> dict:
+        """
+        Generate docker container config
+        :return -> dict
+        """
+
+        bind_volume_path: str = cls.local_storage_base_path + "/" + file_id
+        registry_volume_path: str = (
+            cls.local_storage_base_path + "/" + ModelManager.folder_name
+        )
+
+        container_config: dict = {
+            "image": cls.image,
+            "volumes": {
+                bind_volume_path: {
+                    "bind": f"/{cls.container_base_path}",
+                    "mode": "rw",
+                },
+                registry_volume_path: {
+                    "bind": cls.registry_path,
+                    "mode": "ro",
+                },
+            },
+        }
+
+        return container_config
+
+    @classmethod
+    def _get_file_path(
+        cls,
+        file_name,
+    ) -> str:
+        """
+        Generate relative file path for the audio file
+        :return -> str
+        """
+
+        return f"/{cls.container_base_path}/{file_name}.wav"
+
+    @classmethod
+    def _get_output_folder_path(
+        cls,
+        file_name: str,
+    ) -> str:
+        """
+        Generate relative output folder path for the audio file
+        :return -> str
+        """
+
+        return f"/{cls.container_base_path}/{file_name}"
+
+    @classmethod
+    def is_bundled(cls, model: Model) -> bool:
+        """
+        Check if the model ships with the transcription image
+        :param -> model: Model
+        :return -> bool
+        """
+
+        return Model(model) == cls.model
+
+    @classmethod
+    def _get_model_path(cls, model: Model) -> str:
+        """
+        Generate relative model path
+        :param -> model: Model
+        :return -> str
+        """
+
+        if cls.is_bundled(model=model):
+            return f"{cls.bundled_path}/{ModelManager.get_file_name(model=model)}"
+
+        return f"{cls.registry_path}/{ModelManager.get_file_name(model=model)}"
+
+    @classmethod
+    def get_spoken_language(
+        cls,
+        langauge: Language,
+    ) -> str:
+        """
+        Generate spoken language
+        :param -> langauge: Language
+        :return -> str
+        """
+
+        return langauge.value
+
+    @classmethod
+    def get_decoding(cls, speed: Speed) -> dict:
+        """
+        Get the decoding parameters of a speed preset
+        :param -> speed: Speed
+        :return -> dict
+        """
+
+        return dict(cls.speed_presets[Speed(speed)])
+
+    @classmethod
+    def _get_decoding_arguments(cls, decoding: dict) -> str:
+        """
+        Generate whisper-cli decoding arguments
+        :param -> decoding: dict
+        :return -> str
+        """
+
+        arguments: str = (
+            f"-bs {decoding['beam_size']} -bo {decoding['best_of']} "
+            f"-mc {decoding['max_context']} -ac {decoding['audio_ctx']}"
+        )
+
+        if not decoding["temperature_fallback"]:
+            arguments += " -nf"
+
+        return arguments
+
+    @classmethod
+    def get_command(
+        cls,
+        langauge: Language,
+        threads: int,
+        file_name: str,
+        model: Model = Model.SMALL,
+        speed: Speed = Speed.ACCURATE,
+        output_name: str | None = None,
+    ) -> str:
+        """
+        Generate docker command
+        :param -> langauge: Language, threads: int, file_name: str, model: Model, speed: Speed, output_name: str | None
+        :return -> str
+        """
+
+        return cls.get_batch_command(
+            langauge=langauge,
+            threads=threads,
+            file_names=[file_name],
+            output_names=[output_name or file_name],
+            model=model,
+            decoding=cls.get_decoding(speed=speed),
+        )
+
+    @classmethod
+    def get_batch_command(
+        cls,
+        langauge: Language,
+        threads: int,
+        file_names: list[str],
+        output_names: list[str],
+        model: Model,
+        decoding: dict,
+    ) -> str:
+        """
+        Generate docker command transcribing the files in turn with a single model
+        load, whisper-cli writes the output of the n-th -f to the n-th -of
+        :param -> langauge: Language, threads: int, file_names: list[str], output_names: list[str], model: Model, decoding: dict
+        :return -> str
+        """
+
+        # TODO:- Add support for multiple languages
+
+        inputs: str = " ".join(
+            f"-f {cls._get_file_path(file_name=file_name)}" for file_name in file_names
+        )
+        outputs: str = " ".join(
+            f"-of {cls._get_output_folder_path(file_name=output_name)}"
+            for output_name in output_names
+        )
+
+        return f"whisper -t {threads} -l {cls.get_spoken_language(langauge=langauge)} -m {cls._get_model_path(model=model)} {cls._get_decoding_arguments(decoding=decoding)} -pp {inputs} -osrt {outputs}"
+
+    @classmethod
+    def parse_input(cls, line: str) -> str | None:
+        """
+        Parse the name of the file an invocation starts transcribing from a whisper
+        output line
+        :param -> line: str
+        :return -> str | None
+        """
+
+        match = cls.input_pattern.search(line)
+
+        if match is None:
+            return None
+
+        return Path(match.group(1)).stem
+
+    @classmethod
+    def parse_progress(cls, line: str, start: float, duration: float) -> float | None:
+        """
+        Parse the completed fraction of a chunk from a whisper output line, segment
+        timestamps count from start seconds into the chunk up to duration
+        :param -> line: str, start: float, duration: float
+        :return -> float | None
+        """
+
+        match = cls.progress_pattern.search(line)
+
+        if match:
+            return min(int(match.group(1)) / 100, 1.0)
+
+        match = cls.segment_pattern.match(line.strip())
+
+        if match is None or duration <= 0:
+            return None
+
+        hours, minutes, seconds = match.groups()
+        end: float = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+        return min(max((end - start) / duration, 0.0), 1.0)
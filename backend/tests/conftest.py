@@ -0,0 +1,92 @@
+# Purpose: Shared pytest configuration of the backend unit tests.
+# Path: backend\tests\conftest.py
+
+import os
+import struct
+
+import numpy as np
+import pytest
+
+# Settings the app reads at import, the unit tests never reach these services,
+# and the subprocess executor keeps docker out of the imports
+for name, value in {
+    "WORKER_CONCURRENCY": "1",
+    "CELERY_BACKEND": "rpc://",
+    "CELERY_BROKER": "memory://",
+    "LOCAL_STORAGE_BASE_PATH": "/tmp/data",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_PORT": "5432",
+    "TRANSCRIPTION_EXECUTOR": "subprocess",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+def _write_wav(
+    path: str,
+    samples: np.ndarray,
+    sample_rate: int = 16000,
+    format_tag: int = 0x0001,
+    sub_format: bytes | None = None,
+    extra_chunk: bytes | None = None,
+    data_size: int | None = None,
+) -> str:
+    """
+    Write a 16 bit wav file, optionally extensible, with an extra chunk before the
+    data or a placeholder data size
+    :param -> path: str, samples: np.ndarray, sample_rate: int, format_tag: int, sub_format: bytes | None, extra_chunk: bytes | None, data_size: int | None
+    :return -> str
+    """
+
+    samples = samples.astype("<i2").reshape(len(samples), -1)
+    channels: int = samples.shape[1]
+    data: bytes = samples.tobytes()
+
+    fmt: bytes = struct.pack(
+        "<HHIIHH",
+        format_tag,
+        channels,
+        sample_rate,
+        sample_rate * channels * 2,
+        channels * 2,
+        16,
+    )
+    if sub_format is not None:
+        fmt += struct.pack("<HHI", 22, 16, 0) + sub_format
+
+    body: bytes = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+
+    if extra_chunk is not None:
+        body += b"LIST" + struct.pack("<I", len(extra_chunk)) + extra_chunk
+        body += b"\0" * (len(extra_chunk) & 1)
+
+    body += b"data" + struct.pack("<I", len(data) if data_size is None else data_size)
+    body += data
+
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+    return path
+
+
+@pytest.fixture
+def tone() -> np.ndarray:
+    """
+    Two seconds of a 16 kHz tone
+    :return -> np.ndarray
+    """
+
+    return (np.sin(np.arange(32000) * 0.3) * 8000).astype(np.int16)
+
+
+@pytest.fixture
+def write_wav():
+    """
+    Writer of test wav files
+    :return -> Callable
+    """
+
+    return _write_wav
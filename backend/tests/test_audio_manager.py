@@ -0,0 +1,158 @@
+# Purpose: Unit tests of the AudioManager wav parsing and splitting.
+# Path: backend\tests\test_audio_manager.py
+
+from itertools import pairwise
+
+import numpy as np
+import pytest
+
+from app.utils.audio_manager import AudioManager
+
+FLOAT_SUB_FORMAT: bytes = b"\x03" + AudioManager.pcm_sub_format[1:]
+
+
+def test_header(tmp_path, write_wav, tone):
+    path: str = write_wav(str(tmp_path / "file.wav"), tone)
+
+    with AudioManager(path=path, format="wav") as audio:
+        assert (audio.channels, audio.sample_rate, audio.bits_per_sample) == (
+            1,
+            16000,
+            16,
+        )
+        assert audio.frames_count == len(tone)
+        assert audio.get_duration() == 2.0
+        assert audio.is_optimized(sample_rate=16000)
+        assert not audio.is_optimized(sample_rate=8000)
+        assert audio.get_media_info()["codec"] == "pcm_s16le"
+
+
+def test_header_skips_odd_sized_chunks(tmp_path, write_wav, tone):
+    path: str = write_wav(str(tmp_path / "file.wav"), tone, extra_chunk=b"abc")
+
+    with AudioManager(path=path, format="wav") as audio:
+        assert audio.frames_count == len(tone)
+        assert bytes(audio.pcm[:2]) == tone[:1].astype("<i2").tobytes()
+
+
+def test_header_streamed_data_size(tmp_path, write_wav, tone):
+    path: str = write_wav(str(tmp_path / "file.wav"), tone, data_size=0xFFFFFFFF)
+
+    with AudioManager(path=path, format="wav") as audio:
+        assert audio.frames_count == len(tone)
+
+
+def test_header_extensible_pcm(tmp_path, write_wav, tone):
+    path: str = write_wav(
+        str(tmp_path / "file.wav"),
+        tone,
+        format_tag=0xFFFE,
+        sub_format=AudioManager.pcm_sub_format,
+    )
+
+    with AudioManager(path=path, format="wav") as audio:
+        assert audio.frames_count == len(tone)
+        assert not audio.is_optimized(sample_rate=16000)
+
+
+@pytest.mark.parametrize(
+    "format_tag, sub_format", [(0xFFFE, FLOAT_SUB_FORMAT), (0x0003, None)]
+)
+def test_header_rejects_non_pcm(tmp_path, write_wav, tone, format_tag, sub_format):
+    path: str = write_wav(
+        str(tmp_path / "file.wav"), tone, format_tag=format_tag, sub_format=sub_format
+    )
+
+    with pytest.raises(Exception) as e:
+        AudioManager(path=path, format="wav")
+
+    assert e.value.args[0]["detail"] == "Error: Invalid wav file"
+
+
+def test_rejects_other_formats(tmp_path):
+    path = tmp_path / "file.mp3"
+    path.write_bytes(b"ID3")
+
+    with pytest.raises(Exception) as e:
+        AudioManager(path=str(path), format="mp3")
+
+    assert e.value.args[0]["status_code"] == 400
+
+
+def test_close_unmaps(tmp_path, write_wav, tone):
+    path: str = write_wav(str(tmp_path / "file.wav"), tone)
+
+    audio: AudioManager = AudioManager(path=path, format="wav")
+    audio.get_split_frames(parts_count=2)
+    audio.close()
+
+    assert audio.audio.closed
+    assert audio.pcm is None
+
+
+def test_get_header_round_trip(tmp_path, write_wav):
+    stereo: np.ndarray = np.arange(2000, dtype=np.int16).reshape(1000, 2)
+    path: str = write_wav(str(tmp_path / "file.wav"), stereo, sample_rate=8000)
+
+    with AudioManager(path=path, format="wav") as audio:
+        header: bytes = audio._get_header(data_size=400)
+        audio.export(str(tmp_path / "part.wav"), start_frame=100, end_frame=200)
+
+    assert len(header) == 44
+
+    with AudioManager(path=str(tmp_path / "part.wav"), format="wav") as part:
+        assert (part.format_tag, part.channels, part.sample_rate) == (1, 2, 8000)
+        assert part.block_align == 4
+        assert part.frames_count == 100
+        assert bytes(part.pcm) == stereo[100:200].tobytes()
+
+
+def test_split_audio_covers_the_whole_audio(tmp_path, write_wav, tone):
+    path: str = write_wav(str(tmp_path / "file.wav"), tone)
+
+    with AudioManager(path=path, format="wav") as audio:
+        parts: list[dict] = audio.split_audio(parts_count=4, snap=False)
+
+    assert [part["name"] for part in parts] == ["file1", "file2", "file3", "file4"]
+    assert parts[0]["keep_start"] == 0.0
+    assert parts[-1]["keep_end"] == 2.0
+    assert all(
+        previous["keep_end"] == part["keep_start"] for previous, part in pairwise(parts)
+    )
+
+    frames: int = 0
+    for index, part in enumerate(parts, start=1):
+        with AudioManager(path=str(tmp_path / f"file{index}.wav"), format="wav") as a:
+            assert a.get_duration() == part["duration"]
+            frames += a.frames_count
+
+    assert frames == len(tone)
+
+
+def test_split_audio_overlaps_the_parts(tmp_path, write_wav, tone):
+    path: str = write_wav(str(tmp_path / "file.wav"), tone)
+
+    with AudioManager(path=path, format="wav") as audio:
+        parts: list[dict] = audio.split_audio(parts_count=2, snap=False, overlap=0.25)
+
+    assert parts[0] | {"name": None} == {
+        "name": None,
+        "offset": 0.0,
+        "duration": 1.25,
+        "keep_start": 0.0,
+        "keep_end": 1.0,
+    }
+    assert (parts[1]["offset"], parts[1]["duration"]) == (0.75, 1.25)
+
+
+def test_split_audio_snaps_to_silence(tmp_path, write_wav, tone):
+    # Silence from 1.3s to 1.5s, the nominal split point is at 1s
+    samples: np.ndarray = tone.copy()
+    samples[20800:24000] = 0
+    path: str = write_wav(str(tmp_path / "file.wav"), samples)
+
+    with AudioManager(path=path, format="wav") as audio:
+        parts: list[dict] = audio.split_audio(parts_count=2)
+
+    assert 1.3 <= parts[0]["keep_end"] <= 1.5
+    assert parts[1]["keep_start"] == parts[0]["keep_end"]
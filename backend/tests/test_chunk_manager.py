@@ -0,0 +1,98 @@
+# Purpose: Unit tests of the ChunkManager planning, batching and thread budgets.
+# Path: backend\tests\test_chunk_manager.py
+
+import pytest
+
+from app.config import settings
+from app.utils.chunk_manager import ChunkManager
+from app.utils.shared import Priority
+
+
+@pytest.fixture
+def capacity(monkeypatch):
+    monkeypatch.setattr(settings, "transcription_threads", 8)
+    return 8
+
+
+def test_plan_keeps_short_audio_whole():
+    assert ChunkManager.plan(duration=45.0, cores_count=8) == 1
+
+
+def test_plan_splits_long_audio_within_limits():
+    parts_count: int = ChunkManager.plan(duration=3600.0, cores_count=8)
+
+    assert 1 < parts_count <= ChunkManager.max_parts_count
+
+
+def test_plan_with_overlap_never_adds_parts():
+    assert ChunkManager.plan(duration=600.0, cores_count=8, overlap=5.0) <= (
+        ChunkManager.plan(duration=600.0, cores_count=8)
+    )
+
+
+def test_batch_assigns_every_chunk_once():
+    durations: list[float] = [30.0, 10.0, 25.0, 5.0, 40.0, 15.0, 20.0]
+
+    batches = ChunkManager.batch(
+        durations=durations, threads=2, threads_budget=4, batch_size=3
+    )
+
+    assert sorted(index for batch in batches for index in batch) == list(
+        range(len(durations))
+    )
+    assert all(len(batch) <= 3 for batch in batches)
+    assert all(batch == sorted(batch) for batch in batches)
+
+
+def test_batch_balances_longest_first():
+    batches = ChunkManager.batch(
+        durations=[10.0, 9.0, 1.0, 1.0], threads=1, threads_budget=2, batch_size=2
+    )
+
+    assert batches == [[0, 3], [1, 2]]
+
+
+def test_batch_of_one_runs_every_chunk_alone():
+    batches = ChunkManager.batch(
+        durations=[1.0, 2.0, 3.0], threads=1, threads_budget=1, batch_size=1
+    )
+
+    assert sorted(batches) == [[0], [1], [2]]
+
+
+def test_select_fits_the_budget():
+    layouts: list[list[float]] = [[600.0], [300.0, 300.0], [150.0] * 4, [75.0] * 8]
+
+    index, threads = ChunkManager.select(layouts=layouts, threads_budget=4)
+
+    assert len(layouts[index]) <= 4
+    assert threads * len(layouts[index]) <= 4
+
+
+def test_select_prefers_parallel_layouts_on_many_threads():
+    layouts: list[list[float]] = [[600.0], [150.0] * 4]
+
+    assert ChunkManager.select(layouts=layouts, threads_budget=16) == (1, 4)
+
+
+def test_select_falls_back_when_no_layout_fits():
+    index, threads = ChunkManager.select(layouts=[[60.0] * 4], threads_budget=2)
+
+    assert (index, threads) == (0, 1)
+
+
+@pytest.mark.parametrize(
+    "priority, idle_threads, expected",
+    [
+        (Priority.LOW, 8, 2),
+        (Priority.MEDIUM, 8, 4),
+        (Priority.HIGH, 8, 8),
+        (Priority.HIGH, 3, 3),
+        (Priority.LOW, 0, 1),
+    ],
+)
+def test_threads_budget(capacity, priority, idle_threads, expected):
+    assert (
+        ChunkManager.get_threads_budget(priority=priority, idle_threads=idle_threads)
+        == expected
+    )
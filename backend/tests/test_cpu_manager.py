@@ -0,0 +1,97 @@
+# Purpose: Unit tests of the CpuManager cpu lists and core allocation.
+# Path: backend\tests\test_cpu_manager.py
+
+import pytest
+
+from app.utils.cpu_manager import CpuManager
+
+
+@pytest.fixture
+def host(monkeypatch):
+    """
+    Two NUMA nodes of four cores, with the used cores set by the test
+    :return -> set[int]
+    """
+
+    used: set[int] = set()
+
+    monkeypatch.setattr(CpuManager, "topology", {0: [0, 1, 2, 3], 1: [4, 5, 6, 7]})
+    monkeypatch.setattr(CpuManager, "_get_used_cores", classmethod(lambda cls: used))
+
+    return used
+
+
+@pytest.mark.parametrize(
+    "cpu_list, expected",
+    [
+        ("0-3,8,10-11", [0, 1, 2, 3, 8, 10, 11]),
+        ("5", [5]),
+        ("0-1\n", [0, 1]),
+        ("", []),
+    ],
+)
+def test_parse_cpu_list(cpu_list, expected):
+    assert CpuManager._parse_cpu_list(cpu_list) == expected
+
+
+def test_allocate_within_a_node(host):
+    assert CpuManager.allocate(threads=4) == {
+        "cpuset_cpus": "0,1,2,3",
+        "cpuset_mems": "0",
+    }
+
+
+def test_allocate_prefers_the_fullest_node_that_fits(host):
+    host.update({0, 1})
+
+    assert CpuManager.allocate(threads=2) == {"cpuset_cpus": "2,3", "cpuset_mems": "0"}
+    assert CpuManager.allocate(threads=3) == {
+        "cpuset_cpus": "4,5,6",
+        "cpuset_mems": "1",
+    }
+
+
+def test_allocate_spreads_across_nodes(host):
+    host.update({0, 1, 4, 5})
+
+    assert CpuManager.allocate(threads=3) == {"cpuset_cpus": "2,3,6"}
+
+
+def test_allocate_shrinks_to_the_idle_cores(host):
+    host.update({0, 1, 2, 3, 4, 5})
+
+    resources: dict = CpuManager.allocate(threads=4)
+
+    assert resources == {"cpuset_cpus": "6,7"}
+    assert CpuManager.get_threads(resources=resources, threads=4) == 2
+
+
+def test_allocate_limits_without_idle_cores(host):
+    host.update(range(8))
+
+    resources: dict = CpuManager.allocate(threads=2)
+
+    assert resources == {"nano_cpus": 2 * 10**9}
+    assert CpuManager.get_threads(resources=resources, threads=2) == 2
+
+
+def test_topology_falls_back_to_a_single_node(monkeypatch, tmp_path):
+    monkeypatch.setattr(CpuManager, "topology", None)
+    monkeypatch.setattr(CpuManager, "node_path", str(tmp_path / "missing"))
+
+    topology: dict[int, list[int]] = CpuManager.get_topology()
+
+    assert list(topology) == [0]
+    assert topology[0][0] == 0
+
+
+def test_topology_reads_the_nodes(monkeypatch, tmp_path):
+    for node, cpu_list in [("node0", "0-1"), ("node1", "2-3")]:
+        (tmp_path / node).mkdir()
+        (tmp_path / node / "cpulist").write_text(cpu_list + "\n")
+    (tmp_path / "possible").write_text("0-1\n")
+
+    monkeypatch.setattr(CpuManager, "topology", None)
+    monkeypatch.setattr(CpuManager, "node_path", str(tmp_path))
+
+    assert CpuManager.get_topology() == {0: [0, 1], 1: [2, 3]}
@@ -0,0 +1,124 @@
+# Purpose: Unit tests of the SubtitleManager merges of chunk transcripts.
+# Path: backend\tests\test_subtitle_manager.py
+
+from pathlib import Path
+
+import pysubs2
+import pytest
+
+from app.utils.subtitle_manager import SubtitleManager
+
+
+def write_srt(path: Path, events: list[tuple[float, float, str]]) -> Path:
+    subs = pysubs2.SSAFile()
+    subs.events = [
+        pysubs2.SSAEvent(start=int(start * 1000), end=int(end * 1000), text=text)
+        for start, end, text in events
+    ]
+    subs.save(str(path), format_="srt")
+
+    return path
+
+
+def read_srt(path: Path) -> list[tuple[int, int, str]]:
+    return [
+        (event.start, event.end, event.plaintext)
+        for event in pysubs2.load(str(path)).events
+    ]
+
+
+@pytest.fixture
+def chunks(tmp_path) -> list[Path]:
+    """
+    Two chunk transcripts already shifted to the whole audio, overlapping from 9s
+    to 11s with the owned ranges split at 10s
+    :return -> list[Path]
+    """
+
+    return [
+        write_srt(
+            tmp_path / "file1.srt",
+            [
+                (0.0, 4.0, "hello there"),
+                (8.0, 10.6, "this sentence spans"),
+                (10.6, 11.0, "the seam"),
+            ],
+        ),
+        write_srt(
+            tmp_path / "file2.srt",
+            [
+                (9.0, 9.4, "a cut"),
+                (8.6, 10.6, "this sentence spans the"),
+                (12.0, 14.0, "general kenobi"),
+            ],
+        ),
+    ]
+
+
+def test_merge_windows_keeps_owned_events(chunks, tmp_path):
+    output: Path = tmp_path / "file.srt"
+
+    SubtitleManager(input_files=chunks)._merge_windows_and_save(
+        input_files=chunks, windows=[(0.0, 10.0), (10.0, 20.0)], output_file=str(output)
+    )
+
+    texts: list[str] = [text for _, _, text in read_srt(output)]
+
+    assert texts[0] == "hello there"
+    assert texts[-1] == "general kenobi"
+    assert "a cut" not in texts
+
+
+def test_merge_windows_drops_duplicates_keeping_the_longer_text(chunks, tmp_path):
+    output: Path = tmp_path / "file.srt"
+
+    SubtitleManager(input_files=chunks)._merge_windows_and_save(
+        input_files=chunks, windows=[(0.0, 9.5), (9.5, 20.0)], output_file=str(output)
+    )
+
+    assert read_srt(output) == [
+        (0, 4000, "hello there"),
+        (8600, 10600, "this sentence spans the"),
+        (12000, 14000, "general kenobi"),
+    ]
+
+
+def test_merge_windows_keeps_distinct_neighbours(tmp_path):
+    files: list[Path] = [
+        write_srt(tmp_path / "file1.srt", [(9.0, 9.9, "first words")]),
+        write_srt(tmp_path / "file2.srt", [(10.0, 11.0, "entirely different")]),
+    ]
+    output: Path = tmp_path / "file.srt"
+
+    SubtitleManager(input_files=files)._merge_windows_and_save(
+        input_files=files, windows=[(0.0, 10.0), (10.0, 20.0)], output_file=str(output)
+    )
+
+    assert [text for _, _, text in read_srt(output)] == [
+        "first words",
+        "entirely different",
+    ]
+
+
+def test_generate_files_leaves_the_inputs_untouched(chunks, tmp_path):
+    output_folder: Path = tmp_path / "output"
+    output_folder.mkdir()
+    before: list[str] = [chunk.read_text() for chunk in chunks]
+
+    manager: SubtitleManager = SubtitleManager(input_files=chunks)
+    for _ in range(2):
+        manager.generate_files(output_folder=str(output_folder), offsets=[0.0, 5.0])
+
+    assert [chunk.read_text() for chunk in chunks] == before
+    assert sorted(path.name for path in output_folder.iterdir()) == [
+        "file.csv",
+        "file.json",
+        "file.srt",
+        "file.vtt",
+    ]
+    assert read_srt(output_folder / "file.srt")[-1] == (17000, 19000, "general kenobi")
+
+
+def test_rejects_other_inputs(tmp_path):
+    with pytest.raises(ValueError):
+        SubtitleManager(input_files=[tmp_path / "file.txt"])
@@ -0,0 +1,130 @@
+# Purpose: Unit tests of the UploadManager multipart parser and UploadChecksum.
+# Path: backend\tests\test_upload_manager.py
+
+import base64
+import hashlib
+import zlib
+
+import pytest
+
+from app.utils.upload_manager import UploadChecksum, UploadEvent, UploadManager
+
+BOUNDARY: str = "----boundary"
+CONTENT_TYPE: str = f"multipart/form-data; boundary={BOUNDARY}"
+PAYLOAD: bytes = bytes(range(256)) * 64
+
+
+def get_body(payload: bytes) -> bytes:
+    return (
+        (
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="name"\r\n\r\n'
+            "interview\r\n"
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="interview.wav"\r\n'
+            "Content-Type: audio/wav\r\n\r\n"
+        ).encode()
+        + payload
+        + f"\r\n--{BOUNDARY}--\r\n".encode()
+    )
+
+
+def parse(body: bytes, chunk_size: int) -> list[tuple[UploadEvent, object]]:
+    upload_manager: UploadManager = UploadManager(content_type=CONTENT_TYPE)
+    events: list[tuple[UploadEvent, object]] = []
+
+    for start in range(0, len(body), chunk_size):
+        events.extend(upload_manager.feed(body[start : start + chunk_size]))
+
+    return events + upload_manager.finalize()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024, 1 << 20])
+def test_events(chunk_size):
+    events = parse(get_body(PAYLOAD), chunk_size=chunk_size)
+
+    data: list[bytes] = [
+        value for event, value in events if event == UploadEvent.FILE_DATA
+    ]
+    others = [
+        (event, value) for event, value in events if event != UploadEvent.FILE_DATA
+    ]
+
+    assert others == [
+        (UploadEvent.FIELD, ("name", "interview")),
+        (
+            UploadEvent.FILE_BEGIN,
+            {
+                "field": "file",
+                "filename": "interview.wav",
+                "content_type": "audio/wav",
+            },
+        ),
+        (UploadEvent.FILE_END, "file"),
+    ]
+    assert b"".join(data) == PAYLOAD
+
+
+def test_events_are_emitted_while_streaming():
+    upload_manager: UploadManager = UploadManager(content_type=CONTENT_TYPE)
+    body: bytes = get_body(PAYLOAD)
+
+    events = upload_manager.feed(body[: len(body) // 2])
+
+    assert UploadEvent.FILE_BEGIN in [event for event, _ in events]
+    assert UploadEvent.FILE_END not in [event for event, _ in events]
+
+
+@pytest.mark.parametrize(
+    "content_type", ["application/json", "multipart/form-data", ""]
+)
+def test_rejects_invalid_content_types(content_type):
+    with pytest.raises(Exception) as e:
+        UploadManager(content_type=content_type)
+
+    assert e.value.args[0]["detail"] == "Error: Invalid multipart payload"
+
+
+def get_header(algorithm: str, digest: bytes) -> str:
+    return f"{algorithm} {base64.b64encode(digest).decode()}"
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        get_header("crc32", zlib.crc32(PAYLOAD).to_bytes(4, "big")),
+        get_header("sha1", hashlib.sha1(PAYLOAD).digest()),
+        get_header("SHA256", hashlib.sha256(PAYLOAD).digest()),
+    ],
+)
+def test_checksum_verifies_chunked_updates(header):
+    upload_checksum: UploadChecksum = UploadChecksum(header=header)
+
+    for start in range(0, len(PAYLOAD), 1000):
+        upload_checksum.update(PAYLOAD[start : start + 1000])
+
+    assert upload_checksum.verify()
+
+
+def test_checksum_detects_corruption():
+    upload_checksum: UploadChecksum = UploadChecksum(
+        header=get_header("sha256", hashlib.sha256(PAYLOAD).digest())
+    )
+    upload_checksum.update(PAYLOAD[:-1] + b"\0")
+
+    assert not upload_checksum.verify()
+
+
+@pytest.mark.parametrize(
+    "header, detail",
+    [
+        ("sha256", "Error: Invalid checksum header"),
+        ("sha256 not-base64!", "Error: Invalid checksum header"),
+        ("md5 AAAA", "Error: Unsupported checksum algorithm"),
+    ],
+)
+def test_checksum_rejects_invalid_headers(header, detail):
+    with pytest.raises(Exception) as e:
+        UploadChecksum(header=header)
+
+    assert e.value.args[0]["detail"] == detail
@@ -0,0 +1,106 @@
+# Purpose: Unit tests of the WhisperManager commands and output parsing.
+# Path: backend\tests\test_whisper_manager.py
+
+import pytest
+
+from app.utils.shared import Language, Model, Speed
+from app.utils.whisper_manager import WhisperManager
+
+
+def test_command():
+    command: str = WhisperManager.get_command(
+        langauge=Language.ENGLISH,
+        threads=4,
+        file_name="file1",
+        output_name="file1.draft",
+    )
+
+    assert command == (
+        "whisper -t 4 -l en -m /root/models/ggml-small.en.bin "
+        "-bs 5 -bo 5 -mc -1 -ac 0 -pp -f /home/data/file1.wav "
+        "-osrt -of /home/data/file1.draft"
+    )
+
+
+def test_command_reads_other_models_from_the_registry():
+    command: str = WhisperManager.get_command(
+        langauge=Language.ENGLISH, threads=1, file_name="file", model=Model.TINY_Q5
+    )
+
+    assert "-m /root/registry/ggml-tiny.en-q5_1.bin" in command
+
+
+@pytest.mark.parametrize(
+    "speed, arguments",
+    [
+        (Speed.FAST, "-bs 1 -bo 1 -mc 0 -ac 0 -nf"),
+        (Speed.BALANCED, "-bs 1 -bo 2 -mc 64 -ac 0 "),
+        (Speed.ACCURATE, "-bs 5 -bo 5 -mc -1 -ac 0 "),
+    ],
+)
+def test_command_decoding(speed, arguments):
+    command: str = WhisperManager.get_command(
+        langauge=Language.ENGLISH, threads=1, file_name="file", speed=speed
+    )
+
+    assert arguments in command
+
+
+def test_batch_command_pairs_inputs_and_outputs_in_order():
+    command: str = WhisperManager.get_batch_command(
+        langauge=Language.ENGLISH,
+        threads=2,
+        file_names=["file1", "file2"],
+        output_names=["file1", "file2"],
+        model=Model.SMALL,
+        decoding=WhisperManager.get_decoding(speed=Speed.FAST),
+    )
+
+    assert command.endswith(
+        "-f /home/data/file1.wav -f /home/data/file2.wav "
+        "-osrt -of /home/data/file1 -of /home/data/file2"
+    )
+
+
+def test_get_decoding_returns_a_copy():
+    WhisperManager.get_decoding(speed=Speed.FAST)["beam_size"] = 8
+
+    assert WhisperManager.speed_presets[Speed.FAST]["beam_size"] == 1
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (
+            "main: processing '/home/data/file2.wav' (160000 samples, 10.0 sec)",
+            "file2",
+        ),
+        ("whisper_init_from_file: loading model", None),
+    ],
+)
+def test_parse_input(line, expected):
+    assert WhisperManager.parse_input(line) == expected
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("whisper_print_progress_callback: progress =  42%", 0.42),
+        ("whisper_print_progress_callback: progress = 100%", 1.0),
+        ("[00:00:10.000 --> 00:00:15.000]   Hello there.", 0.5),
+        ("[00:00:10.000 --> 00:01:05.000]   Past the end.", 1.0),
+        ("[00:00:00.000 --> 00:00:02.000]   Before the start.", 0.0),
+        ("whisper_full_with_state: auto-detected language", None),
+    ],
+)
+def test_parse_progress(line, expected):
+    assert WhisperManager.parse_progress(line, start=5.0, duration=20.0) == expected
+
+
+def test_parse_progress_without_duration():
+    assert (
+        WhisperManager.parse_progress(
+            "[00:00:00.000 --> 00:00:05.000]   Hello.", start=0.0, duration=0.0
+        )
+        is None
+    )
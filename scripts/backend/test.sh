@@ -0,0 +1,20 @@
+#!/bin/bash
+
+# Navigate to the /backend directory
+cd backend/
+
+# Activate the virtual environment
+if [[ "$OSTYPE" == "mswin" || "$OSTYPE" == "cygwin" || "$OSTYPE" == "win32" || "$OSTYPE" == "win64" || "$OSTYPE" == "msys" ]]; then
+    source venv/Scripts/activate
+else
+    source venv/bin/activate
+fi
+
+# Check if pytest is already installed
+if ! pip3 show pytest &>/dev/null; then
+    echo "pytest is not installed. Installing now..."
+    pip3 install pytest
+fi
+
+# Run the unit tests
+pytest